@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark Log Parser Hot Loops
+Compare the legacy implementations with the current ones on a synthetic Deadside.log:
+- Line classification: multi-pass regex scan vs single-pass classifier
+- Timestamp parsing: strptime vs the fixed-format parser
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+from bot.parsers.unified_log_parser import UnifiedLogParser
+from bot.utils.timestamp_parser import parse_deadside_timestamp
+
+# Suppress logs for clean benchmark output
+logging.getLogger().setLevel(logging.CRITICAL)
+
+class MockBot:
+    """Mock bot for benchmarking"""
+    def __init__(self):
+        pass
+
+LINE_TEMPLATES = [
+    (30, "[{ts}][{n:3}]LogSFPS: [USFPSAICharacterManager::Tick] Active AI {n}"),
+    (20, "[{ts}][{n:3}]LogStreaming: Display: Flushing async loaders."),
+    (10, "[{ts}][{n:3}]LogSFPS: Mission GA_Airport_mis_0{m}_SFPSACMission switched to {state}"),
+    (6, "[{ts}][{n:3}]LogSFPS: [ASFPSGameMode::NewVehicle_Add] Add vehicle BP_SFPSVehicle_Sedan_C_{n}"),
+    (4, "[{ts}][{n:3}]LogSFPS: [ASFPSGameMode::NewVehicle_Del] Del vehicle BP_SFPSVehicle_Sedan_C_{n}"),
+    (5, "[{ts}][{n:3}]LogNet: Join request: /Game/Maps/world_1/World_1?Name=Player{n}&eosid=|{eos}&platformid=PS5:{n}"),
+    (5, "[{ts}][{n:3}]LogOnline: Warning: Player |{eos} successfully registered!"),
+    (5, "[{ts}][{n:3}]LogNet: UChannel::Close: Sending CloseBunch. ChIndex == 0. Name: [UChannel] UniqueId: EOS:|{eos}"),
+    (8, "[{ts}][{n:3}]LogNet: NotifyAcceptingConnection accepted from: 10.0.0.{m}:7777"),
+    (4, "[{ts}][{n:3}]LogSFPS: AirDrop switched to Flying"),
+    (2, "[{ts}][{n:3}]LogSFPS: Trader has arrived at Sawmill"),
+    (1, "[{ts}][{n:3}]LogInit: Command Line: -log -playersmaxcount=50"),
+]
+
+def build_synthetic_log(line_count: int, seed: int = 42) -> str:
+    """Build a synthetic Deadside.log with a realistic mix of line types"""
+    rng = random.Random(seed)
+    weights = [w for w, _ in LINE_TEMPLATES]
+    templates = [t for _, t in LINE_TEMPLATES]
+    states = ['INITIAL', 'READY', 'IN_PROGRESS', 'COMPLETED']
+
+    lines = []
+    for i in range(line_count):
+        template = rng.choices(templates, weights)[0]
+        seconds = i // 20
+        ts = f"2025.05.30-{(seconds // 3600) % 24:02d}.{(seconds // 60) % 60:02d}.{seconds % 60:02d}:{i % 1000:03d}"
+        lines.append(template.format(
+            ts=ts,
+            n=rng.randrange(1000),
+            m=rng.randrange(1, 5),
+            state=rng.choice(states),
+            eos=f"{rng.getrandbits(64):016x}"
+        ))
+    return "\n".join(lines) + "\n"
+
+def legacy_scan(parser: UnifiedLogParser, lines) -> int:
+    """Previous approach: every regex searched against every line across several passes"""
+    patterns = parser.patterns
+    hits = 0
+
+    for line in lines:
+        if patterns['max_player_count'].search(line):
+            hits += 1
+
+    for line in lines:
+        patterns['timestamp'].search(line)
+        for name in ('player_queue_join', 'player_registered', 'player_disconnect'):
+            if patterns[name].search(line):
+                hits += 1
+
+    for line in lines:
+        for name in ('mission_state_change', 'airdrop_flying', 'helicrash_event',
+                     'helicrash_crash', 'trader_arrival', 'vehicle_spawn', 'vehicle_delete'):
+            if patterns[name].search(line):
+                hits += 1
+
+    return hits
+
+def classifier_scan(parser: UnifiedLogParser, lines) -> int:
+    """Single-pass classifier"""
+    classify = parser._classify_line
+    return sum(1 for line in lines if classify(line))
+
+def legacy_timestamps(parser: UnifiedLogParser, stamps) -> int:
+    """Previous approach: strptime per timestamp"""
+    return sum(1 for stamp in stamps if datetime.strptime(stamp, "%Y.%m.%d-%H.%M.%S:%f"))
+
+def fast_timestamps(parser: UnifiedLogParser, stamps) -> int:
+    """Fixed-format slicing parser with per-second memo"""
+    return sum(1 for stamp in stamps if parse_deadside_timestamp(stamp))
+
+def measure(label: str, scan, parser: UnifiedLogParser, lines, rounds: int = 3) -> float:
+    best = float('inf')
+    hits = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hits = scan(parser, lines)
+        best = min(best, time.perf_counter() - started)
+
+    rate = len(lines) / best
+    print(f"  {label:<12} {rate:>12,.0f} lines/s  ({best:.3f}s, {hits:,} matches)")
+    return rate
+
+async def run_benchmark(line_count: int = 200_000):
+    """Run the log parser benchmarks"""
+    print("⏱️ Log Parser Benchmark")
+    print("=" * 50)
+
+    parser = UnifiedLogParser(MockBot())
+    lines = build_synthetic_log(line_count).splitlines()
+    print(f"📄 Synthetic Deadside.log: {len(lines):,} lines")
+
+    print("🔍 Line classification")
+    before = measure("Before", legacy_scan, parser, lines)
+    after = measure("After", classifier_scan, parser, lines)
+    print(f"🚀 Speed-up: {after / before:.1f}x")
+
+    stamps = [parser.patterns['timestamp'].search(line).group(1) for line in lines]
+    print("🕒 Timestamp parsing")
+    before = measure("Before", legacy_timestamps, parser, stamps)
+    after = measure("After", fast_timestamps, parser, stamps)
+    print(f"🚀 Speed-up: {after / before:.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
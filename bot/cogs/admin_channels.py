@@ -127,6 +127,7 @@ class AdminChannels(commands.Cog):
                 },
                 upsert=True
             )
+            self.bot.db_manager.invalidate_guild(guild_id)
             
             # Create success embed
             embed = discord.Embed(
@@ -276,6 +277,7 @@ class AdminChannels(commands.Cog):
                 {"$set": channel_updates},
                 upsert=True
             )
+            self.bot.db_manager.invalidate_guild(guild_id)
             
             # Create success embed
             embed = discord.Embed(
@@ -338,6 +340,7 @@ class AdminChannels(commands.Cog):
                 {"guild_id": guild_id},
                 {"$set": clear_update}
             )
+            self.bot.db_manager.invalidate_guild(guild_id)
             
             # Create confirmation embed
             embed = discord.Embed(
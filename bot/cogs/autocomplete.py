@@ -8,26 +8,6 @@ class ServerAutocomplete:
     This replaces direct server_id inputs with user-friendly server names.
     """
 
-    @staticmethod
-    async def get_servers_for_guild(guild_id: int, database):
-        """
-        Fetch servers associated with a specific guild from the database.
-
-        Args:
-            guild_id: The Discord guild ID
-            database: MongoDB database instance
-
-        Returns:
-            List of server documents containing name and ID
-        """
-        # Get guild configuration which contains the servers array
-        guild_doc = await database.guilds.find_one({"guild_id": guild_id})
-
-        if guild_doc and "servers" in guild_doc:
-            return guild_doc["servers"]
-
-        return []
-
     @staticmethod
     async def autocomplete_server_name(ctx: discord.AutocompleteContext):
         """Autocomplete for server names (guild-scoped only)"""
@@ -74,11 +54,9 @@ class ServerAutocomplete:
                 is_owner = premium_cog.is_bot_owner(ctx.interaction.user.id)
                 
                 if ctx.interaction.guild:
-                    home_guild_doc = await ctx.bot.db_manager.guilds.find_one({
-                        "guild_id": ctx.interaction.guild.id,
-                        "is_home_server": True
-                    })
-                    home_guild = bool(home_guild_doc)
+                    # Cached guild config, this runs on every keystroke
+                    home_guild_doc = await ctx.bot.db_manager.get_guild(ctx.interaction.guild.id)
+                    home_guild = bool(home_guild_doc and home_guild_doc.get("is_home_server"))
             
             # Only allow cross-guild access for bot owner or home guild admins
             if not is_owner and not home_guild:
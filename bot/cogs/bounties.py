@@ -12,6 +12,7 @@ from typing import Dict, List, Optional, Any, Tuple
 
 import discord
 from discord.ext import commands
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +50,7 @@ class Bounties(commands.Cog):
         """Find Discord user ID by character name"""
         player_data = await self.bot.db_manager.players.find_one({
             'guild_id': guild_id,
-            'linked_characters': character_name
+            'linked_character_keys': self.bot.db_manager.player_name_key(character_name)
         })
         return player_data['discord_id'] if player_data else None
 
@@ -77,7 +78,7 @@ class Bounties(commands.Cog):
             # Find player in PvP data (case-insensitive match)
             cursor = self.bot.db_manager.pvp_data.find({
                 'guild_id': guild_id,
-                'player_name': {'$regex': f'^{target_name}$', '$options': 'i'}
+                'player_name_key': self.bot.db_manager.player_name_key(target_name)
             })
 
             async for player_doc in cursor:
@@ -185,14 +186,7 @@ class Bounties(commands.Cog):
                 return
 
             # Check if bounty already exists
-            existing_bounty = await self.bot.db_manager.bounties.find_one({
-                'guild_id': guild_id,
-                'target_character': target_character,
-                'active': True,
-                'expires_at': {'$gt': datetime.now(timezone.utc)}
-            })
-
-            if existing_bounty:
+            if self.bot.db_manager.match_active_bounties(guild_id, target_character):
                 await ctx.respond(f"❌ There is already an active bounty on **{target_character}**!", ephemeral=True)
                 return
 
@@ -218,6 +212,7 @@ class Bounties(commands.Cog):
             }
 
             await self.bot.db_manager.bounties.insert_one(bounty_doc)
+            self.bot.db_manager.index_bounty(bounty_doc)
 
             # Add wallet event
             await self.add_wallet_event(
@@ -258,7 +253,7 @@ class Bounties(commands.Cog):
             )
 
             # Set thumbnail using bounty asset
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
+            bounty_file = get_asset_registry().file("Bounty.png")
             embed.set_thumbnail(url="attachment://Bounty.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -338,7 +333,7 @@ class Bounties(commands.Cog):
                 )
 
             # Set thumbnail using bounty asset
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
+            bounty_file = get_asset_registry().file("Bounty.png")
             embed.set_thumbnail(url="attachment://Bounty.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers • 🤖 = Auto-generated")
 
@@ -351,14 +346,8 @@ class Bounties(commands.Cog):
     async def check_bounty_claims(self, guild_id: int, killer_character: str, victim_character: str):
         """Check if a kill claims any bounties"""
         try:
-            # Find active bounties on the victim
-            active_bounties = await self.bot.db_manager.bounties.find({
-                'guild_id': guild_id,
-                'target_character': victim_character,
-                'active': True,
-                'claimed': False,
-                'expires_at': {'$gt': datetime.now(timezone.utc)}
-            }).to_list(length=None)
+            # Find active bounties on the victim (in memory, no database round trip)
+            active_bounties = self.bot.db_manager.match_active_bounties(guild_id, victim_character)
 
             if not active_bounties:
                 return
@@ -382,9 +371,13 @@ class Bounties(commands.Cog):
             bounty_amount = bounty['amount']
             target_character = bounty['target_character']
 
+            # Take it out of the index first so a concurrent kill can't claim it twice
+            if not self.bot.db_manager.unindex_bounty(bounty):
+                return
+
             # Mark bounty as claimed
-            await self.bot.db_manager.bounties.update_one(
-                {'_id': bounty['_id']},
+            result = await self.bot.db_manager.bounties.update_one(
+                {'_id': bounty['_id'], 'claimed': False},
                 {
                     '$set': {
                         'claimed': True,
@@ -395,6 +388,8 @@ class Bounties(commands.Cog):
                     }
                 }
             )
+            if result.modified_count == 0:
+                return  # Already claimed elsewhere
 
             # Award money to killer
             await self.bot.db_manager.update_wallet(
@@ -465,7 +460,7 @@ class Bounties(commands.Cog):
                 )
 
             # Set thumbnail using bounty asset
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
+            bounty_file = get_asset_registry().file("Bounty.png")
             embed.set_thumbnail(url="attachment://Bounty.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -514,14 +509,7 @@ class Bounties(commands.Cog):
                 kill_count = killer_data['kill_count']
 
                 # Check if there's already a bounty on this player
-                existing_bounty = await self.bot.db_manager.bounties.find_one({
-                    'guild_id': guild_id,
-                    'target_character': killer_name,
-                    'active': True,
-                    'expires_at': {'$gt': datetime.now(timezone.utc)}
-                })
-
-                if existing_bounty:
+                if self.bot.db_manager.match_active_bounties(guild_id, killer_name):
                     continue  # Skip if already has bounty
 
                 # Calculate bounty amount based on performance
@@ -550,6 +538,7 @@ class Bounties(commands.Cog):
                 }
 
                 await self.bot.db_manager.bounties.insert_one(bounty_doc)
+                self.bot.db_manager.index_bounty(bounty_doc)
 
                 # Send auto-bounty notification
                 await self._send_auto_bounty_embed(guild_id, killer_name, bounty_amount, kill_count)
@@ -608,7 +597,7 @@ class Bounties(commands.Cog):
             )
 
             # Set thumbnail using bounty asset
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
+            bounty_file = get_asset_registry().file("Bounty.png")
             embed.set_thumbnail(url="attachment://Bounty.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers • Auto-generated bounty")
 
@@ -617,105 +606,5 @@ class Bounties(commands.Cog):
         except Exception as e:
             logger.error(f"Failed to send auto-bounty embed: {e}")
 
-    bounty = discord.SlashCommandGroup("bounty", "🎯 Bounty system commands")
-
-    @bounty.command(name="set", description="Set a bounty on a player")
-    async def bounty_set_cmd(self, ctx: discord.ApplicationContext, 
-                            target: discord.Option(str, "Target player name or @mention"),
-                            amount: discord.Option(int, "Bounty amount", min_value=100)):
-        """Set a bounty on a player"""
-        try:
-            guild_id = ctx.guild.id
-            discord_id = ctx.user.id
-            
-            if not await self.check_premium_server(guild_id):
-                embed = discord.Embed(
-                    title="🚫 Premium Required",
-                    description="Bounty system requires premium server access.",
-                    color=0xff5e5e
-                )
-                await ctx.respond(embed=embed, ephemeral=True)
-                return
-                
-            # Check wallet balance
-            wallet = await self.bot.db_manager.get_wallet(guild_id, discord_id)
-            if wallet['balance'] < amount:
-                await ctx.respond(f"❌ Insufficient funds! You have ${wallet['balance']:,}", ephemeral=True)
-                return
-                
-            # Resolve target
-            target_result = await self.resolve_target(ctx, target)
-            if not target_result:
-                await ctx.respond("❌ Target not found or invalid!", ephemeral=True)
-                return
-                
-            target_name, target_discord_id = target_result
-            
-            # Deduct bounty amount
-            await self.bot.db_manager.update_wallet(guild_id, discord_id, -amount, "bounty_set")
-            
-            # Create bounty
-            bounty_doc = {
-                "guild_id": guild_id,
-                "target_name": target_name,
-                "target_discord_id": target_discord_id,
-                "bounty_amount": amount,
-                "issuer_discord_id": discord_id,
-                "created_at": datetime.now(timezone.utc),
-                "expires_at": datetime.now(timezone.utc) + timedelta(hours=24),
-                "claimed": False
-            }
-            
-            await self.bot.db_manager.db.bounties.insert_one(bounty_doc)
-            
-            embed = discord.Embed(
-                title="🎯 Bounty Set",
-                description=f"**Target:** {target_name}\n**Amount:** ${amount:,}\n**Expires:** <t:{int((datetime.now(timezone.utc) + timedelta(hours=24)).timestamp())}:R>",
-                color=0xffa500
-            )
-            await ctx.respond(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Failed to set bounty: {e}")
-            await ctx.respond("❌ Failed to set bounty", ephemeral=True)
-
-    @bounty.command(name="list", description="View active bounties")
-    async def bounty_list_cmd(self, ctx: discord.ApplicationContext):
-        """List active bounties"""
-        try:
-            guild_id = ctx.guild.id
-            
-            bounties = await self.bot.db_manager.db.bounties.find({
-                "guild_id": guild_id,
-                "claimed": False,
-                "expires_at": {"$gt": datetime.now(timezone.utc)}
-            }).sort("bounty_amount", -1).to_list(length=20)
-            
-            if not bounties:
-                embed = discord.Embed(
-                    title="📋 Active Bounties",
-                    description="No active bounties found.",
-                    color=0x7f5af0
-                )
-                await ctx.respond(embed=embed, ephemeral=True)
-                return
-                
-            embed = discord.Embed(
-                title="📋 Active Bounties",
-                color=0xffa500
-            )
-            
-            bounty_text = ""
-            for bounty in bounties[:10]:
-                expires_timestamp = int(bounty['expires_at'].timestamp())
-                bounty_text += f"**{bounty['target_name']}** - ${bounty['bounty_amount']:,} (expires <t:{expires_timestamp}:R>)\n"
-                
-            embed.add_field(name="🎯 Targets", value=bounty_text, inline=False)
-            await ctx.respond(embed=embed, ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Failed to list bounties: {e}")
-            await ctx.respond("❌ Failed to list bounties", ephemeral=True)
-
 def setup(bot):
     bot.add_cog(Bounties(bot))
\ No newline at end of file
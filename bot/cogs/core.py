@@ -9,6 +9,7 @@ from typing import Optional
 
 import discord
 from discord.ext import commands
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,7 @@ class Core(commands.Cog):
             )
 
             # Set thumbnail using main logo
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
             embed.set_thumbnail(url="attachment://main.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -138,7 +139,7 @@ class Core(commands.Cog):
             )
 
             # Set thumbnail using main logo
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
             embed.set_thumbnail(url="attachment://main.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -188,7 +189,7 @@ class Core(commands.Cog):
             )
 
             # Set thumbnail using main logo
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
             embed.set_thumbnail(url="attachment://main.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -14,6 +14,7 @@ from typing import Dict, Optional, Any
 import discord
 from discord.ext import commands
 from bot.cogs.autocomplete import ServerAutocomplete
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +117,7 @@ class Economy(commands.Cog):
             )
 
             # Add thumbnail
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
             embed.set_thumbnail(url="attachment://main.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -216,7 +217,7 @@ class Economy(commands.Cog):
                         inline=True
                     )
 
-                    main_file = discord.File("./assets/main.png", filename="main.png")
+                    main_file = get_asset_registry().file("main.png")
                     embed.set_thumbnail(url="attachment://main.png")
                     embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Any
 
 import discord
 from discord.ext import commands
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -66,39 +67,19 @@ class Factions(commands.Cog):
 
     async def calculate_faction_stats(self, guild_id: int, faction_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate combined stats for all faction members"""
-        try:
-            combined_stats = {
-                'total_kills': 0,
-                'total_deaths': 0,
-                'total_suicides': 0,
-                'total_kdr': 0.0,
-                'member_count': len(faction_data['members']),
-                'best_streak': 0,
-                'total_distance': 0.0
-            }
+        combined_stats = {
+            'total_kills': 0,
+            'total_deaths': 0,
+            'total_suicides': 0,
+            'total_kdr': 0.0,
+            'member_count': len(faction_data['members']),
+            'best_streak': 0,
+            'total_distance': 0.0
+        }
 
-            # Get stats for all members
-            for member_id in faction_data['members']:
-                # Get member's linked characters
-                player_data = await self.bot.db_manager.get_linked_player(guild_id, member_id)
-                if not player_data:
-                    continue
-
-                # Get stats for each character across all servers
-                for character in player_data['linked_characters']:
-                    cursor = self.bot.db_manager.pvp_data.find({
-                        'guild_id': guild_id,
-                        'player_name': character
-                    })
-
-                    async for server_stats in cursor:
-                        combined_stats['total_kills'] += server_stats.get('kills', 0)
-                        combined_stats['total_deaths'] += server_stats.get('deaths', 0)
-                        combined_stats['total_suicides'] += server_stats.get('suicides', 0)
-                        combined_stats['total_distance'] += server_stats.get('total_distance', 0.0)
-
-                        if server_stats.get('longest_streak', 0) > combined_stats['best_streak']:
-                            combined_stats['best_streak'] = server_stats.get('longest_streak', 0)
+        try:
+            # Totals for every member's linked characters across all servers in one aggregation
+            combined_stats.update(await self.bot.db_manager.get_faction_stats(guild_id, faction_data['_id']))
 
             # Calculate faction KDR safely
             if combined_stats['total_deaths'] > 0:
@@ -195,6 +176,7 @@ class Factions(commands.Cog):
             }
 
             await self.bot.db_manager.factions.insert_one(faction_doc)
+            await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
 
             # Create success embed
             # Create success embed
@@ -230,7 +212,7 @@ class Factions(commands.Cog):
                 inline=False
             )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -323,7 +305,7 @@ class Factions(commands.Cog):
                 inline=False
             )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -389,6 +371,7 @@ class Factions(commands.Cog):
                 {'_id': faction['_id']},
                 {'$addToSet': {'members': discord_id}}
             )
+            await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
 
             # Create success embed
             embed = discord.Embed(
@@ -419,7 +402,7 @@ class Factions(commands.Cog):
                 inline=True
             )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -463,6 +446,7 @@ class Factions(commands.Cog):
                 else:
                     # Last member, delete faction
                     await self.bot.db_manager.factions.delete_one({'_id': faction['_id']})
+                    await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
 
                     embed = discord.Embed(
                         title="🏛️ Faction Disbanded",
@@ -482,6 +466,7 @@ class Factions(commands.Cog):
                     '$pull': {'members': discord_id, 'officers': discord_id}
                 }
             )
+            await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
 
             # Create leave embed
             embed = discord.Embed(
@@ -631,7 +616,7 @@ class Factions(commands.Cog):
                     inline=False
                 )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -724,7 +709,7 @@ class Factions(commands.Cog):
                 inline=True
             )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -806,7 +791,7 @@ class Factions(commands.Cog):
                 inline=False
             )
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
+            faction_file = get_asset_registry().file("Faction.png")
             embed.set_thumbnail(url="attachment://Faction.png")
             embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
 
@@ -867,6 +852,7 @@ class Factions(commands.Cog):
             }
             
             await self.bot.db_manager.factions.insert_one(faction_doc)
+            await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
             
             embed = discord.Embed(
                 title="⚔️ Faction Created",
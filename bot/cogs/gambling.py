@@ -15,6 +15,7 @@ from typing import Dict, List, Optional, Any, Tuple
 import discord
 from discord.ext import commands
 from bot.utils.embed_factory import EmbedFactory
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -776,7 +777,7 @@ class Gambling(commands.Cog):
             # Create view with game selection
             view = UltimateGamblingView(self, ctx)
 
-            gamble_file = discord.File('./assets/Gamble.png', filename='Gamble.png')
+            gamble_file = get_asset_registry().file('Gamble.png')
             await ctx.respond(embed=embed, file=gamble_file, view=view)
 
         except Exception as e:
@@ -835,7 +836,7 @@ class Gambling(commands.Cog):
 
             embed.set_footer(text="🚀 Ultimate AI Gaming Engine | Select your bet amount")
 
-            gamble_file = discord.File('./assets/Gamble.png', filename='Gamble.png')
+            gamble_file = get_asset_registry().file('Gamble.png')
             if hasattr(interaction, 'response') and not interaction.response.is_done():
                 await interaction.response.edit_message(embed=embed, file=gamble_file, view=view)
             else:
@@ -1004,7 +1005,7 @@ class Gambling(commands.Cog):
 
                 embed.set_footer(text=f"🚀 Frame {i+1}/8 | Ultimate AI Gaming Engine")
 
-                gamble_file = discord.File('./assets/Gamble.png', filename='Gamble.png')
+                gamble_file = get_asset_registry().file('Gamble.png')
                 await interaction.edit_original_response(embed=embed, file=gamble_file, view=None)
                 await asyncio.sleep(0.8)
 
@@ -1084,7 +1085,7 @@ class Gambling(commands.Cog):
             view.clear_items()
             view._setup_slots_interface()
 
-            gamble_file = discord.File('./assets/Gamble.png', filename='Gamble.png')
+            gamble_file = get_asset_registry().file('Gamble.png')
             await interaction.edit_original_response(embed=embed, file=gamble_file, view=view)
 
         except Exception as e:
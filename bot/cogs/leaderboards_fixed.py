@@ -9,7 +9,7 @@ import asyncio
 import logging
 import random
 from datetime import datetime, timezone
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any
 from bot.utils.embed_factory import EmbedFactory
 from bot.cogs.autocomplete import ServerAutocomplete
 
@@ -76,37 +76,8 @@ class LeaderboardsFixed(commands.Cog):
 
     async def get_player_faction(self, guild_id: int, player_name: str) -> Optional[str]:
         """Get player's faction tag if they have one"""
-        try:
-            # First find the Discord ID for this player name
-            player_link = await self.bot.db_manager.players.find_one({
-                "guild_id": guild_id,
-                "linked_characters": player_name
-            })
-
-            if not player_link:
-                return None
-
-            discord_id = player_link.get('discord_id')
-            if not discord_id:
-                return None
-
-            # Now look up faction using Discord ID - ensure we're checking the members array properly
-            faction_doc = await self.bot.db_manager.factions.find_one({
-                "guild_id": guild_id,
-                "members": {"$in": [discord_id]}
-            })
-
-            if faction_doc:
-                # Return faction tag if available, otherwise faction name
-                faction_tag = faction_doc.get('faction_tag')
-                if faction_tag:
-                    return faction_tag
-                return faction_doc.get('faction_name')
-
-            return None
-        except Exception as e:
-            logger.error(f"Error getting player faction for {player_name}: {e}")
-            return None
+        tags = await self.bot.db_manager.get_faction_tags(guild_id, [player_name])
+        return tags.get(player_name)
 
     async def format_leaderboard_line(self, rank: int, player: Dict[str, Any], stat_type: str, guild_id: int) -> str:
         """Format a single leaderboard line with faction tags and clean styling"""
@@ -161,24 +132,6 @@ class LeaderboardsFixed(commands.Cog):
 
         return f"{rank_display} {player_name}{faction_tag} — {value}"
 
-    async def get_top_kills(self, guild_id: int, server_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get top killers for a specific server"""
-        try:
-            query = {
-                "guild_id": guild_id,
-                "kills": {"$gt": 0}
-            }
-
-            # Add server filter if specified
-            if server_id and server_id.strip():
-                query["server_id"] = server_id
-
-            cursor = self.bot.db_manager.pvp_data.find(query).sort("kills", -1).limit(limit)
-            return await cursor.to_list(length=None)
-        except Exception as e:
-            logger.error(f"Error getting top kills: {e}")
-            return []
-            
     async def create_themed_leaderboard(self, guild_id: int, server_id: str, stat_type: str, server_name: str) -> Tuple[Optional[discord.Embed], Optional[discord.File]]:
         """Create properly themed leaderboard using EmbedFactory"""
         try:
@@ -202,86 +155,34 @@ class LeaderboardsFixed(commands.Cog):
                 'factions': f"Faction standings on {server_name}"
             }
 
-            if stat_type == 'kills':
-                players = await self.get_top_kills(guild_id, server_id)
-                title = f"{random.choice(title_pools['kills'])} - {server_name}"
-                description = descriptions['kills']
-
-            elif stat_type == 'deaths':
-                # Guild-wide query
-                cursor = self.bot.db_manager.pvp_data.find({
-                    "guild_id": guild_id,
-                    "deaths": {"$gt": 0}
-                }).sort("deaths", -1).limit(10)
-                players = await cursor.to_list(length=None)
-                title = f"{random.choice(title_pools['deaths'])} - {server_name}"
-                description = descriptions['deaths']
-
-            elif stat_type == 'kdr':
-                # Guild-wide query
-                cursor = self.bot.db_manager.pvp_data.find({
-                    "guild_id": guild_id,
-                    "kills": {"$gte": 1}
-                }).limit(50)
-                all_players = await cursor.to_list(length=None)
-
-                # Calculate KDR and sort in Python
-                for player in all_players:
-                    kills = player.get('kills', 0)
-                    deaths = player.get('deaths', 0)
-                    player['kdr'] = kills / max(deaths, 1) if deaths > 0 else float(kills)
-
-                players = sorted(all_players, key=lambda x: x['kdr'], reverse=True)[:10]
-                title = f"{random.choice(title_pools['kdr'])} - {server_name}"
-                description = descriptions['kdr']
-
-            elif stat_type == 'distance':
-                # Guild-wide query for distance leaderboard
-                cursor = self.bot.db_manager.pvp_data.find({
-                    "guild_id": guild_id,
-                    "personal_best_distance": {"$gt": 0}
-                }).sort("personal_best_distance", -1).limit(10)
-                players = await cursor.to_list(length=None)
-                title = f"{random.choice(title_pools['distance'])} - {server_name}"
-                description = descriptions['distance']
+            if stat_type not in title_pools:
+                return None, None
+
+            # Precomputed top-N rankings, refreshed as kills are ingested
+            rankings = await self.bot.db_manager.get_leaderboard_snapshot(guild_id, server_id, stat_type)
+
+            # Resolve faction tags for every row in one query, per-row lookups then hit the cache
+            if stat_type != 'factions':
+                await self.bot.db_manager.get_faction_tags(
+                    guild_id, [row.get('top_killer' if stat_type == 'weapons' else 'player_name') for row in rankings]
+                )
+
+            if stat_type in ('kills', 'deaths', 'kdr', 'distance'):
+                players = rankings
+                title = f"{random.choice(title_pools[stat_type])} - {server_name}"
+                description = descriptions[stat_type]
 
             elif stat_type == 'weapons':
-                # Guild-wide weapons query
-                cursor = self.bot.db_manager.kill_events.find({
-                    "guild_id": guild_id,
-                    "is_suicide": False,
-                    "weapon": {"$nin": ["Menu Suicide", "Suicide", "Falling", "suicide_by_relocation"]}
-                })
-
-                weapon_events = await cursor.to_list(length=None)
-
-                # Group weapons in Python
-                weapon_stats = {}
-                for event in weapon_events:
-                    weapon = event.get('weapon', 'Unknown')
-                    killer = event.get('killer', 'Unknown')
-
-                    if weapon not in weapon_stats:
-                        weapon_stats[weapon] = {'kills': 0, 'top_killer': killer}
-                    weapon_stats[weapon]['kills'] += 1
-
-                # Sort and limit
-                weapons_data = []
-                for weapon, stats in sorted(weapon_stats.items(), key=lambda x: x[1]['kills'], reverse=True)[:10]:
-                    weapons_data.append({
-                        '_id': weapon,
-                        'kills': stats['kills'],
-                        'top_killer': stats['top_killer']
-                    })
+                weapons_data = rankings
 
                 if not weapons_data:
                     return None, None
 
                 leaderboard_text = []
                 for i, weapon in enumerate(weapons_data, 1):
-                    weapon_name = weapon['_id'] or 'Unknown'
+                    weapon_name = weapon.get('weapon') or 'Unknown'
                     kills = weapon['kills']
-                    top_killer = weapon['top_killer'] or 'Unknown'
+                    top_killer = weapon.get('top_killer') or 'Unknown'
 
                     # Clean weapon formatting without emojis
                     rank_display = f"**{i}.**"
@@ -313,67 +214,17 @@ class LeaderboardsFixed(commands.Cog):
                 return embed, file
 
             elif stat_type == 'factions':
-                # Get all factions for this guild first
-                factions_cursor = self.bot.db_manager.factions.find({"guild_id": guild_id})
-                all_factions = await factions_cursor.to_list(length=None)
-
-                faction_stats = {}
-
-                # Process each faction
-                for faction_doc in all_factions:
-                    faction_name = faction_doc.get('faction_name')
-                    faction_tag = faction_doc.get('faction_tag')
-                    faction_display = faction_tag if faction_tag else faction_name
-
-                    if not faction_display:
-                        continue
-
-                    faction_stats[faction_display] = {
-                        'kills': 0, 
-                        'deaths': 0, 
-                        'members': set(),
-                        'faction_name': faction_name
-                    }
-
-                    # Get stats for each member
-                    for discord_id in faction_doc.get('members', []):
-                        # Get player's linked characters
-                        player_link = await self.bot.db_manager.players.find_one({
-                            "guild_id": guild_id,
-                            "discord_id": discord_id
-                        })
-
-                        if not player_link:
-                            continue
-
-                        # Get stats for each character
-                        for character in player_link.get('linked_characters', []):
-                            player_stat = await self.bot.db_manager.pvp_data.find_one({
-                                "guild_id": guild_id,
-                                "player_name": character
-                            })
-
-                            if player_stat:
-                                faction_stats[faction_display]['kills'] += player_stat.get('kills', 0)
-                                faction_stats[faction_display]['deaths'] += player_stat.get('deaths', 0)
-                                faction_stats[faction_display]['members'].add(character)
-
-                # Convert member sets to counts
-                for faction_name in faction_stats:
-                    faction_stats[faction_name]['member_count'] = len(faction_stats[faction_name]['members'])
-                    del faction_stats[faction_name]['members']
-
-                if not faction_stats:
-                    return None, None
+                sorted_factions = rankings
 
-                # Sort by kills
-                sorted_factions = sorted(faction_stats.items(), key=lambda x: x[1]['kills'], reverse=True)[:10]
+                if not sorted_factions:
+                    return None, None
 
                 leaderboard_text = []
-                for i, (faction_name, stats) in enumerate(sorted_factions, 1):
-                    kills = stats['kills']
-                    deaths = stats['deaths']
-                    members = stats['member_count']
+                for i, faction in enumerate(sorted_factions, 1):
+                    faction_name = faction['faction']
+                    kills = faction['kills']
+                    deaths = faction['deaths']
+                    members = faction['member_count']
                     kdr = kills / max(deaths, 1) if deaths > 0 else kills
 
                     # Clean faction formatting without emojis
@@ -392,8 +243,8 @@ class LeaderboardsFixed(commands.Cog):
                     'title': title,
                     'description': descriptions['factions'],
                     'rankings': "\n".join(leaderboard_text),
-                    'total_kills': sum(f[1]['kills'] for f in sorted_factions),
-                    'total_deaths': sum(f[1]['deaths'] for f in sorted_factions),
+                    'total_kills': sum(f['kills'] for f in sorted_factions),
+                    'total_deaths': sum(f['deaths'] for f in sorted_factions),
                     'stat_type': 'factions',
                     'style_variant': 'factions',
                     'server_name': server_name,
@@ -403,9 +254,6 @@ class LeaderboardsFixed(commands.Cog):
                 embed, file = await EmbedFactory.build('leaderboard', embed_data)
                 return embed, file
 
-            else:
-                return None, None
-
             if not players:
                 return None, None
 
@@ -11,6 +11,7 @@ from typing import Dict, List, Optional, Any
 
 import discord
 from discord.ext import commands
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +58,7 @@ class Linking(commands.Cog):
             # Check if character is already linked to another user
             existing_link = await self.bot.db_manager.players.find_one({
                 "guild_id": guild_id,
-                "linked_characters": character
+                "linked_character_keys": self.bot.db_manager.player_name_key(character)
             })
             
             if existing_link and existing_link['discord_id'] != discord_id:
@@ -121,7 +122,7 @@ class Linking(commands.Cog):
                     inline=True
                 )
                 
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
 
                 
                 embed.set_thumbnail(url="attachment://main.png")
@@ -183,7 +184,7 @@ class Linking(commands.Cog):
             # Check if character is linked to another user
             existing_link = await self.bot.db_manager.players.find_one({
                 "guild_id": guild_id,
-                "linked_characters": character
+                "linked_character_keys": self.bot.db_manager.player_name_key(character)
             })
             
             if existing_link and existing_link['discord_id'] != discord_id:
@@ -196,10 +197,15 @@ class Linking(commands.Cog):
             # Add the alternate character
             result = await self.bot.db_manager.players.update_one(
                 {"guild_id": guild_id, "discord_id": discord_id},
-                {"$addToSet": {"linked_characters": character}}
+                {"$addToSet": {
+                    "linked_characters": character,
+                    "linked_character_keys": self.bot.db_manager.player_name_key(character)
+                }}
             )
             
             if result.modified_count > 0:
+                await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
+
                 # Get updated data
                 updated_player = await self.bot.db_manager.get_linked_player(guild_id, discord_id)
                 
@@ -216,7 +222,7 @@ class Linking(commands.Cog):
                     inline=False
                 )
                 
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
 
                 
                 embed.set_thumbnail(url="attachment://main.png")
@@ -257,16 +263,28 @@ class Linking(commands.Cog):
                 )
                 return
             
-            # Remove the character
+            # Remove the character, keys are rebuilt from what is left since two
+            # linked names can share one key ("Bob" and "bob")
+            remaining_chars = [c for c in player_data['linked_characters'] if c != character]
             result = await self.bot.db_manager.players.update_one(
-                {"guild_id": guild_id, "discord_id": discord_id},
-                {"$pull": {"linked_characters": character}}
+                {
+                    "guild_id": guild_id,
+                    "discord_id": discord_id,
+                    "linked_characters": player_data['linked_characters']
+                },
+                {
+                    "$pull": {"linked_characters": character},
+                    "$set": {"linked_character_keys": list(dict.fromkeys(
+                        self.bot.db_manager.player_name_key(c) for c in remaining_chars
+                    ))}
+                }
             )
             
             if result.modified_count > 0:
+                await self.bot.db_manager.sync_faction_member(guild_id, discord_id)
+
                 # If removed character was primary, set new primary
                 if player_data['primary_character'] == character:
-                    remaining_chars = [c for c in player_data['linked_characters'] if c != character]
                     await self.bot.db_manager.players.update_one(
                         {"guild_id": guild_id, "discord_id": discord_id},
                         {"$set": {"primary_character": remaining_chars[0]}}
@@ -295,7 +313,7 @@ class Linking(commands.Cog):
                         inline=True
                     )
                 
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
 
                 
                 embed.set_thumbnail(url="attachment://main.png")
@@ -357,7 +375,7 @@ class Linking(commands.Cog):
                 inline=True
             )
             
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
             
             embed.set_thumbnail(url="attachment://main.png")
@@ -407,6 +425,8 @@ class Linking(commands.Cog):
             
             embed.set_footer(text="Click the buttons below to confirm or cancel")
             
+            db_manager = self.bot.db_manager
+
             # Create confirmation view with buttons
             class UnlinkConfirmView(discord.ui.View):
                 def __init__(self, timeout=30):
@@ -424,12 +444,14 @@ class Linking(commands.Cog):
                     
                     # Proceed with unlinking
                     try:
-                        result = await self.bot.db_manager.players.delete_one({
+                        result = await db_manager.players.delete_one({
                             "guild_id": guild_id,
                             "discord_id": discord_id
                         })
                         
                         if result.deleted_count > 0:
+                            await db_manager.sync_faction_member(guild_id, discord_id)
+
                             success_embed = discord.Embed(
                                 title="✅ Characters Unlinked",
                                 description="All your characters have been successfully unlinked!",
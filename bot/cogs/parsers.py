@@ -9,6 +9,7 @@ from typing import Optional, Dict, Any
 import discord
 from discord.ext import commands
 from bot.cogs.autocomplete import ServerAutocomplete
+from bot.utils.asset_registry import get_asset_registry
 from discord import Option
 #from discord import app_commands # Removed app_commands import, not needed for py-cord 2.6.1
 
@@ -74,7 +75,7 @@ class Parsers(commands.Cog):
                 inline=False
             )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -212,7 +213,7 @@ class Parsers(commands.Cog):
                     inline=False
                 )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -567,8 +568,7 @@ class Parsers(commands.Cog):
             else:
                 # Manual reset if method doesn't exist
                 parser.file_states.clear()
-                parser.player_sessions.clear()
-                parser.player_lifecycle.clear()
+                parser.presence.clear()
                 parser.last_log_position.clear()
                 if hasattr(parser, 'log_file_hashes'):
                     parser.log_file_hashes.clear()
@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Any
 import discord
 from discord.ext import commands
 from bot.cogs.autocomplete import ServerAutocomplete
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +69,7 @@ class Premium(commands.Cog):
                 {"guild_id": {"$ne": guild_id}},
                 {"$unset": {"is_home_server": ""}}
             )
+            self.bot.database.invalidate_guild()
 
             embed = discord.Embed(
                 title="🏠 Home Server Set",
@@ -82,7 +84,7 @@ class Premium(commands.Cog):
                 inline=False
             )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -120,10 +122,8 @@ class Premium(commands.Cog):
             is_owner = self.is_bot_owner(ctx.user.id)
 
             # Check if current guild is home server
-            home_guild = await self.bot.db_manager.guilds.find_one({
-                "guild_id": ctx.guild.id,
-                "is_home_server": True
-            })
+            home_guild_config = await self.bot.db_manager.get_guild(ctx.guild.id)
+            home_guild = bool(home_guild_config and home_guild_config.get("is_home_server"))
 
             if not is_owner and not home_guild:
                 await ctx.respond("❌ Premium management is only available to bot owners or in the home server!", ephemeral=True)
@@ -166,7 +166,7 @@ class Premium(commands.Cog):
                     inline=False
                 )
 
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
 
 
                 embed.set_thumbnail(url="attachment://main.png")
@@ -204,10 +204,8 @@ class Premium(commands.Cog):
             is_owner = self.is_bot_owner(ctx.user.id)
 
             # Check if current guild is home server
-            home_guild = await self.bot.db_manager.guilds.find_one({
-                "guild_id": ctx.guild.id,
-                "is_home_server": True
-            })
+            home_guild_config = await self.bot.db_manager.get_guild(ctx.guild.id)
+            home_guild = bool(home_guild_config and home_guild_config.get("is_home_server"))
 
             if not is_owner and not home_guild:
                 await ctx.respond("❌ Premium management is only available to bot owners or in the home server!", ephemeral=True)
@@ -237,7 +235,7 @@ class Premium(commands.Cog):
                     inline=False
                 )
 
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
 
 
                 embed.set_thumbnail(url="attachment://main.png")
@@ -331,10 +329,8 @@ class Premium(commands.Cog):
 
             # Check if user can manage premium
             is_owner = self.is_bot_owner(ctx.user.id)
-            home_guild = await self.bot.db_manager.guilds.find_one({
-                "guild_id": guild_id,
-                "is_home_server": True
-            })
+            home_guild_config = await self.bot.db_manager.get_guild(guild_id)
+            home_guild = bool(home_guild_config and home_guild_config.get("is_home_server"))
 
             if is_owner or home_guild:
                 embed.add_field(
@@ -343,7 +339,7 @@ class Premium(commands.Cog):
                     inline=False
                 )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -424,7 +420,7 @@ class Premium(commands.Cog):
                 inline=False
             )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -511,7 +507,7 @@ class Premium(commands.Cog):
                     inline=False
                 )
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
+            main_file = get_asset_registry().file("main.png")
 
 
             embed.set_thumbnail(url="attachment://main.png")
@@ -13,6 +13,7 @@ import discord
 from discord.ext import commands
 from bot.utils.embed_factory import EmbedFactory
 from bot.cogs.autocomplete import ServerAutocomplete
+from bot.utils.asset_registry import get_asset_registry
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +50,7 @@ class Stats(commands.Cog):
             # Find player in PvP data (case-insensitive match)
             cursor = self.bot.db_manager.pvp_data.find({
                 'guild_id': guild_id,
-                'player_name': {'$regex': f'^{target_name}$', '$options': 'i'}
+                'player_name_key': self.bot.db_manager.player_name_key(target_name)
             })
             
             async for player_doc in cursor:
@@ -91,57 +92,20 @@ class Stats(commands.Cog):
                 logger.warning("No player characters provided for stats calculation")
                 return combined_stats
 
-            # Get stats from all servers or specific server
-            for character in player_characters:
-                try:
-                    query = {
-                        'guild_id': guild_id,
-                        'player_name': character
-                    }
-                    
-                    # Add server filter if specified
-                    if server_id:
-                        query['server_id'] = server_id
-                    
-                    cursor = self.bot.db_manager.pvp_data.find(query)
-
-                    async for server_stats in cursor:
-                        if not isinstance(server_stats, dict):
-                            logger.warning(f"Invalid server_stats type: {type(server_stats)}")
-                            continue
-
-                        # Enhanced logging to track actual data retrieval
-                        logger.debug(f"Processing server stats for {character}: kills={server_stats.get('kills', 0)}, deaths={server_stats.get('deaths', 0)}")
-
-                        kills = max(0, server_stats.get('kills', 0))
-                        deaths = max(0, server_stats.get('deaths', 0))
-                        suicides = max(0, server_stats.get('suicides', 0))
-                        
-                        combined_stats['kills'] += kills
-                        combined_stats['deaths'] += deaths
-                        combined_stats['suicides'] += suicides
-                        
-                        # Track personal best distance (take the maximum across all servers)
-                        pb_distance = float(server_stats.get('personal_best_distance', 0.0))
-                        if pb_distance > combined_stats['personal_best_distance']:
-                            combined_stats['personal_best_distance'] = pb_distance
-                        
-                        # Add to total distance traveled
-                        total_distance = float(server_stats.get('total_distance', 0.0))
-                        combined_stats['total_distance'] += total_distance
-                        
-                        combined_stats['servers_played'] += 1
-
-                        # Track best streak
-                        best_streak = max(0, server_stats.get('best_streak', 0))
-                        if best_streak > combined_stats['best_streak']:
-                            combined_stats['best_streak'] = best_streak
-
-                        logger.info(f"Character {character}: +{kills} kills, +{deaths} deaths. Total: {combined_stats['kills']} kills, {combined_stats['deaths']} deaths")
-
-                except Exception as char_error:
-                    logger.error(f"Error processing character {character}: {char_error}")
-                    continue
+            # Totals, weapons and rivalries come back from a single aggregation
+            summary = await self.bot.db_manager.get_player_stats_summary(guild_id, player_characters, server_id)
+
+            totals = summary.get('totals')
+            if totals:
+                combined_stats['kills'] = totals.get('kills', 0)
+                combined_stats['deaths'] = totals.get('deaths', 0)
+                combined_stats['suicides'] = totals.get('suicides', 0)
+                combined_stats['personal_best_distance'] = float(totals.get('personal_best_distance') or 0.0)
+                combined_stats['total_distance'] = float(totals.get('total_distance') or 0.0)
+                combined_stats['servers_played'] = totals.get('servers_played', 0)
+                combined_stats['best_streak'] = totals.get('best_streak', 0)
+
+                logger.debug(f"Characters {player_characters}: {combined_stats['kills']} kills, {combined_stats['deaths']} deaths")
 
             # Calculate KDR safely
             if combined_stats['deaths'] > 0:
@@ -149,119 +113,29 @@ class Stats(commands.Cog):
             else:
                 combined_stats['kdr'] = float(combined_stats['kills'])
 
-            # Get weapon statistics and rivals/nemesis
-            try:
-                await self._calculate_weapon_stats(guild_id, player_characters, combined_stats, server_id)
-            except Exception as weapon_error:
-                logger.error(f"Error calculating weapon stats: {weapon_error}")
-
-            try:
-                await self._calculate_rivals_nemesis(guild_id, player_characters, combined_stats, server_id)
-            except Exception as rival_error:
-                logger.error(f"Error calculating rivals/nemesis: {rival_error}")
-
-            return combined_stats
-
-        except Exception as e:
-            logger.error(f"Failed to get combined stats: {e}")
-            import traceback
-            logger.error(f"Stack trace: {traceback.format_exc()}")
-            return combined_stats
-
-    async def _calculate_weapon_stats(self, guild_id: int, player_characters: List[str], 
-                                    combined_stats: Dict[str, Any], server_id: str = None):
-        """Calculate weapon statistics from kill events (excludes suicides)"""
-        try:
-            weapon_counts = {}
-
-            for character in player_characters:
-                query = {
-                    'guild_id': guild_id,
-                    'killer': character,
-                    'is_suicide': False  # Only count actual PvP kills for weapon stats
-                }
-                
-                # Add server filter if specified
-                if server_id:
-                    query['server_id'] = server_id
-                
-                cursor = self.bot.db_manager.kill_events.find(query)
-
-                async for kill_event in cursor:
-                    weapon = kill_event.get('weapon', 'Unknown')
-                    # Skip suicide weapons even if they somehow got through
-                    if weapon not in ['Menu Suicide', 'Suicide', 'Falling']:
-                        weapon_counts[weapon] = weapon_counts.get(weapon, 0) + 1
-
+            # Weapon statistics (excludes suicides)
+            weapon_counts = summary.get('weapons') or {}
             if weapon_counts:
                 combined_stats['favorite_weapon'] = max(weapon_counts.keys(), key=lambda x: weapon_counts[x])
                 combined_stats['weapon_stats'] = weapon_counts
 
-        except Exception as e:
-            logger.error(f"Failed to calculate weapon stats: {e}")
-
-    async def _calculate_rivals_nemesis(self, guild_id: int, player_characters: List[str], 
-                                      combined_stats: Dict[str, Any], server_id: str = None):
-        """Calculate enhanced rivalry intelligence"""
-        try:
-            kills_against = {}
-            deaths_to = {}
-
-            for character in player_characters:
-                # Count kills against others
-                query_kills = {
-                    'guild_id': guild_id,
-                    'killer': character,
-                    'is_suicide': False
-                }
-                
-                # Add server filter if specified
-                if server_id:
-                    query_kills['server_id'] = server_id
-                
-                cursor = self.bot.db_manager.kill_events.find(query_kills)
-
-                async for kill_event in cursor:
-                    victim = kill_event.get('victim')
-                    if victim and victim not in player_characters:  # Don't count alt kills
-                        kills_against[victim] = kills_against.get(victim, 0) + 1
-
-                # Count deaths to others
-                query_deaths = {
-                    'guild_id': guild_id,
-                    'victim': character,
-                    'is_suicide': False
-                }
-                
-                # Add server filter if specified
-                if server_id:
-                    query_deaths['server_id'] = server_id
-                
-                cursor = self.bot.db_manager.kill_events.find(query_deaths)
+            # Rivalry intelligence (alts excluded)
+            if summary.get('top_victim'):
+                combined_stats['most_eliminated_player'], combined_stats['most_eliminated_count'] = summary['top_victim']
 
-                async for kill_event in cursor:
-                    killer = kill_event.get('killer')
-                    if killer and killer not in player_characters:  # Don't count alt deaths
-                        deaths_to[killer] = deaths_to.get(killer, 0) + 1
-
-            # Enhanced rivalry calculation
-            if kills_against:
-                most_killed_player = max(kills_against.keys(), key=lambda x: kills_against[x])
-                combined_stats['most_eliminated_player'] = most_killed_player
-                combined_stats['most_eliminated_count'] = kills_against[most_killed_player]
-
-            if deaths_to:
-                killed_by_most_player = max(deaths_to.keys(), key=lambda x: deaths_to[x])
-                combined_stats['eliminated_by_most_player'] = killed_by_most_player
-                combined_stats['eliminated_by_most_count'] = deaths_to[killed_by_most_player]
+            if summary.get('top_killer'):
+                combined_stats['eliminated_by_most_player'], combined_stats['eliminated_by_most_count'] = summary['top_killer']
 
             # Calculate rivalry score for tactical advantage
-            most_eliminated_count = combined_stats.get('most_eliminated_count', 0)
-            eliminated_by_most_count = combined_stats.get('eliminated_by_most_count', 0)
-            combined_stats['rivalry_score'] = most_eliminated_count - eliminated_by_most_count
+            combined_stats['rivalry_score'] = combined_stats['most_eliminated_count'] - combined_stats['eliminated_by_most_count']
+
+            return combined_stats
 
         except Exception as e:
-            logger.error(f"Failed to calculate rivalry intelligence: {e}")
+            logger.error(f"Failed to get combined stats: {e}")
+            import traceback
+            logger.error(f"Stack trace: {traceback.format_exc()}")
+            return combined_stats
 
     @discord.slash_command(name="stats", description="View PvP statistics for yourself, a user, or a player name")
     async def stats(self, ctx: discord.ApplicationContext, 
@@ -356,7 +230,7 @@ class Stats(commands.Cog):
                     color=0x808080,
                     timestamp=datetime.now(timezone.utc)
                 )
-                main_file = discord.File("./assets/main.png", filename="main.png")
+                main_file = get_asset_registry().file("main.png")
                 embed.set_thumbnail(url="attachment://main.png")
                 embed.set_footer(text="Powered by Discord.gg/EmeraldServers")
                 
@@ -4,12 +4,18 @@ Emerald's Killfeed - Database Models and Architecture
 Implements PHASE 1 data architecture requirements with bulletproof error handling
 """
 
+import copy
+import hashlib
+import heapq
 import logging
 import asyncio
-from typing import Optional, Dict, List, Any
+import time
+from typing import Optional, Dict, List, Any, Set, Tuple
 from datetime import datetime, timezone, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +43,38 @@ class DatabaseManager:
         self.premium = self.db.premium_servers
         self.parser_states = self.db.parser_states
         self.player_sessions = self.db.player_sessions
+        self.leaderboard_snapshots = self.db.leaderboard_snapshots
+        self.character_factions = self.db.character_factions
+        self.outbound_messages = self.db.outbound_messages
 
         # Initialize locks for thread-safe operations
         self._parser_state_locks = {}
         self._session_locks = {}
 
+        # Servers with kills ingested since their last leaderboard snapshot
+        self._dirty_leaderboards: Set[Tuple[int, str]] = set()
+        # Guilds with faction or link changes, every server's snapshots go stale
+        self._dirty_leaderboard_guilds: Set[int] = set()
+
+        # Per-guild character name -> faction tag cache for leaderboard rendering
+        self._faction_tag_cache: Dict[int, Dict[str, Any]] = {}
+
+        # Guild config cache: guild_id -> (expires_at, document)
+        self._guild_cache: Dict[int, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._guild_watch_task: Optional[asyncio.Task] = None
+        self._guild_change_stream_active = False
+
+        # Premium entitlements: (guild_id, server_id) -> expires_at, with an expiry heap
+        self._premium_entitlements: Dict[Tuple[int, str], Optional[datetime]] = {}
+        self._premium_expiry_heap: List[Tuple[float, int, str]] = []
+        self._premium_expiry_handle: Optional[asyncio.TimerHandle] = None
+        self._premium_loaded = False
+
+        # Active bounties: guild_id -> target name key -> bounty_id -> bounty, with an expiry heap
+        self._active_bounties: Dict[int, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._bounty_expiry_heap: List[Tuple[float, int, str, str]] = []
+        self._bounty_expiry_handle: Optional[asyncio.TimerHandle] = None
+
     async def initialize_indexes(self):
         """Create optimized database indexes with bulletproof conflict resolution"""
         try:
@@ -56,6 +89,10 @@ class DatabaseManager:
             # STEP 3: Create all indexes with proper error handling
             await self._create_all_indexes_safely()
 
+            # STEP 4: Backfill denormalized lookup collections
+            await self.rebuild_faction_index()
+            await self.backfill_player_name_keys()
+
             logger.info("Database initialization completed successfully")
 
         except Exception as e:
@@ -272,6 +309,7 @@ class DatabaseManager:
             try:
                 await self.players.create_index([("guild_id", 1), ("discord_id", 1)], unique=True)
                 await self.players.create_index([("guild_id", 1), ("linked_characters", 1)])
+                await self.players.create_index([("guild_id", 1), ("linked_character_keys", 1)])
                 logger.debug("Player indexes created")
             except Exception as e:
                 logger.warning(f"Player index creation: {e}")
@@ -281,6 +319,8 @@ class DatabaseManager:
                 await self.pvp_data.create_index([("guild_id", 1), ("server_id", 1), ("player_name", 1)], unique=True)
                 await self.pvp_data.create_index([("guild_id", 1), ("server_id", 1), ("kills", -1)])
                 await self.pvp_data.create_index([("guild_id", 1), ("server_id", 1), ("kdr", -1)])
+                await self.pvp_data.create_index([("guild_id", 1), ("player_name", 1)])
+                await self.pvp_data.create_index([("guild_id", 1), ("player_name_key", 1)])
                 logger.debug("PvP data indexes created")
             except Exception as e:
                 logger.warning(f"PvP data index creation: {e}")
@@ -290,10 +330,40 @@ class DatabaseManager:
                 await self.kill_events.create_index([("guild_id", 1), ("server_id", 1), ("timestamp", -1)])
                 await self.kill_events.create_index([("guild_id", 1), ("server_id", 1), ("killer", 1)])
                 await self.kill_events.create_index([("guild_id", 1), ("server_id", 1), ("victim", 1)])
+                # /stats aggregation: player kills/deaths across servers, suicides filtered in the index
+                await self.kill_events.create_index([("guild_id", 1), ("killer", 1), ("is_suicide", 1), ("server_id", 1)])
+                await self.kill_events.create_index([("guild_id", 1), ("victim", 1), ("is_suicide", 1), ("server_id", 1)])
+                # Idempotency key: re-reading rows after a failed cursor save never double counts
+                await self.kill_events.create_index("event_key", unique=True, sparse=True)
                 logger.debug("Kill events indexes created")
             except Exception as e:
                 logger.warning(f"Kill events index creation: {e}")
 
+            # Leaderboard snapshot indexes (server-scoped)
+            try:
+                await self.leaderboard_snapshots.create_index(
+                    [("guild_id", 1), ("server_id", 1), ("category", 1), ("window", 1)], unique=True
+                )
+                logger.debug("Leaderboard snapshot indexes created")
+            except Exception as e:
+                logger.warning(f"Leaderboard snapshot index creation: {e}")
+
+            # Character -> faction index (guild-scoped)
+            try:
+                await self.character_factions.create_index([("guild_id", 1), ("character_name", 1)], unique=True)
+                await self.character_factions.create_index([("guild_id", 1), ("faction_id", 1)])
+                await self.character_factions.create_index([("guild_id", 1), ("discord_id", 1)])
+                logger.debug("Character faction indexes created")
+            except Exception as e:
+                logger.warning(f"Character faction index creation: {e}")
+
+            # Outbound message journal (replayed in queue order)
+            try:
+                await self.outbound_messages.create_index([("queued_at", 1)])
+                logger.debug("Outbound message journal indexes created")
+            except Exception as e:
+                logger.warning(f"Outbound message journal index creation: {e}")
+
             # Economy indexes (guild-scoped)
             try:
                 await self.economy.create_index([("guild_id", 1), ("discord_id", 1)], unique=True)
@@ -319,6 +389,7 @@ class DatabaseManager:
             # Bounty indexes (guild-scoped)
             try:
                 await self.bounties.create_index([("guild_id", 1), ("target_player", 1)])
+                await self.bounties.create_index([("guild_id", 1), ("target_character", 1), ("active", 1)])
                 await self.bounties.create_index("expires_at")
                 logger.debug("Bounty indexes created")
             except Exception as e:
@@ -394,6 +465,9 @@ class DatabaseManager:
             logger.error(f"Index creation traceback: {traceback.format_exc()}")
 
     # GUILD MANAGEMENT
+    GUILD_CACHE_TTL = 60
+    GUILD_CACHE_STREAM_TTL = 600
+
     async def create_guild(self, guild_id: int, guild_name: str) -> Dict[str, Any]:
         """Create guild configuration"""
         guild_doc = {
@@ -414,17 +488,71 @@ class DatabaseManager:
         }
 
         await self.guilds.insert_one(guild_doc)
+        self.invalidate_guild(guild_id)
         logger.info(f"Created guild: {guild_name} ({guild_id})")
         return guild_doc
 
     async def get_guild(self, guild_id: int) -> Optional[Dict[str, Any]]:
-        """Get guild configuration"""
+        """Get guild configuration, served from the in-process cache when fresh"""
         try:
-            return await self.guilds.find_one({"guild_id": guild_id})
+            guild_id = int(guild_id)
+            now = time.monotonic()
+
+            cached = self._guild_cache.get(guild_id)
+            if cached and cached[0] > now:
+                guild_doc = cached[1]
+            else:
+                guild_doc = await self.guilds.find_one({"guild_id": guild_id})
+                ttl = self.GUILD_CACHE_STREAM_TTL if self._guild_change_stream_active else self.GUILD_CACHE_TTL
+                self._guild_cache[guild_id] = (now + ttl, guild_doc)
+
+            # Callers are free to modify what they get back
+            return copy.deepcopy(guild_doc)
         except Exception as e:
             logger.error(f"Failed to get guild {guild_id}: {e}")
             return None
 
+    def invalidate_guild(self, guild_id: Optional[int] = None):
+        """Drop a cached guild config after it was written (all guilds when guild_id is None)"""
+        if guild_id is None:
+            self._guild_cache.clear()
+        else:
+            self._guild_cache.pop(int(guild_id), None)
+
+    def start_guild_change_stream(self):
+        """Watch the guilds collection and invalidate cached configs on change (replica sets only)"""
+        if self._guild_watch_task is None or self._guild_watch_task.done():
+            self._guild_watch_task = asyncio.create_task(self._watch_guild_changes())
+
+    async def stop_guild_change_stream(self):
+        """Stop watching the guilds collection (for shutdown)"""
+        if self._guild_watch_task and not self._guild_watch_task.done():
+            self._guild_watch_task.cancel()
+            try:
+                await self._guild_watch_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch_guild_changes(self):
+        try:
+            async with self.guilds.watch(full_document="updateLookup") as stream:
+                self._guild_change_stream_active = True
+                logger.info("👁️ Watching guild config changes")
+                async for change in stream:
+                    guild_id = (change.get("fullDocument") or {}).get("guild_id")
+                    # Deletes carry no document, so drop everything
+                    self.invalidate_guild(guild_id)
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            logger.info(f"Guild change stream unavailable, relying on TTL and explicit invalidation: {e}")
+        except Exception as e:
+            logger.error(f"Guild change stream stopped: {e}")
+        finally:
+            # Entries cached under the long TTL may now miss changes
+            self._guild_change_stream_active = False
+            self._guild_cache.clear()
+
     async def add_server_to_guild(self, guild_id: int, server_config: Dict[str, Any]) -> bool:
         """Add game server to guild"""
         try:
@@ -432,6 +560,7 @@ class DatabaseManager:
                 {"guild_id": guild_id},
                 {"$addToSet": {"servers": server_config}}
             )
+            self.invalidate_guild(guild_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to add server to guild {guild_id}: {e}")
@@ -456,27 +585,25 @@ class DatabaseManager:
                     {"$pull": {"servers": {"server_id": server_id}}}
                 )
 
+            self.invalidate_guild(guild_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to remove server from guild {guild_id}: {e}")
             return False
 
     # PLAYER LINKING (Guild-scoped)
+    @staticmethod
+    def player_name_key(name: str) -> str:
+        """Normalized player name for case-insensitive equality lookups (casefolded, whitespace collapsed)"""
+        return ' '.join(str(name).split()).casefold()
+
     async def find_player_in_pvp_data(self, guild_id: int, character_name: str) -> Optional[str]:
         """Find player in PvP data with case-insensitive search, returns actual player name if found"""
         try:
-            # Search for player with case-insensitive regex that handles spaces
-            # Remove extra spaces and normalize the search term
-            normalized_search = ' '.join(character_name.strip().split())
-
-            # Create case-insensitive regex pattern
-            escaped_search = normalized_search.replace(' ', r'\s+')
-            pattern = f"^{escaped_search}$"
-
-            player_doc = await self.pvp_data.find_one({
-                "guild_id": guild_id,
-                "player_name": {"$regex": pattern, "$options": "i"}
-            })
+            player_doc = await self.pvp_data.find_one(
+                {"guild_id": guild_id, "player_name_key": self.player_name_key(character_name)},
+                {"player_name": 1}
+            )
 
             if player_doc:
                 return player_doc["player_name"]  # Return the actual player name from database
@@ -529,7 +656,10 @@ class DatabaseManager:
                 if character_name not in existing_player.get('linked_characters', []):
                     await self.players.update_one(
                         {"guild_id": guild_id, "discord_id": discord_id},
-                        {"$addToSet": {"linked_characters": character_name}}
+                        {"$addToSet": {
+                            "linked_characters": character_name,
+                            "linked_character_keys": self.player_name_key(character_name)
+                        }}
                     )
             else:
                 # New player, create document
@@ -537,11 +667,14 @@ class DatabaseManager:
                     "guild_id": guild_id,
                     "discord_id": discord_id,
                     "linked_characters": [character_name],
+                    "linked_character_keys": [self.player_name_key(character_name)],
                     "primary_character": character_name,
                     "linked_at": datetime.now(timezone.utc)
                 }
                 await self.players.insert_one(player_doc)
 
+            await self.sync_faction_member(guild_id, discord_id)
+
             logger.info(f"Linked player {character_name} to Discord {discord_id} in guild {guild_id}")
             return True
 
@@ -672,6 +805,8 @@ class DatabaseManager:
                             safe_defaults[field] = 0 if field != "total_distance" else 0.0
 
                     # Single atomic operation without conflicts
+                    safe_defaults["player_name_key"] = self.player_name_key(player_name)
+
                     result = await self.pvp_data.update_one(
                         {
                             "guild_id": guild_id,
@@ -700,6 +835,7 @@ class DatabaseManager:
                         },
                         {
                             "$set": stats_update,
+                            "$setOnInsert": {"player_name_key": self.player_name_key(player_name)},
                             "$currentDate": {"last_updated": True}
                         },
                         upsert=True
@@ -724,6 +860,7 @@ class DatabaseManager:
                         "guild_id": guild_id,
                         "server_id": server_id,
                         "player_name": player_name,
+                        "player_name_key": self.player_name_key(player_name),
                         "created_at": datetime.now(timezone.utc),
                         "last_updated": datetime.now(timezone.utc),
                         "kills": 0,
@@ -786,10 +923,123 @@ class DatabaseManager:
             "player_name": player_name
         })
 
+    async def get_player_stats_summary(self, guild_id: int, player_characters: List[str],
+                                       server_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get combined PvP stats, weapon counts and rivalries for a player in one aggregation.
+
+        Matches the player's kills and deaths in kill_events, unions in their pvp_data
+        rows and splits the stream with $facet, so /stats costs a single round trip.
+
+        Args:
+            guild_id: Guild to search
+            player_characters: All character names linked to the player
+            server_id: Optional server filter
+
+        Returns:
+            Dict with 'totals' (summed pvp_data fields, None if no rows), 'weapons'
+            ({weapon: kills}), 'top_victim' and 'top_killer' ((name, count) or None)
+        """
+        summary = {'totals': None, 'weapons': {}, 'top_victim': None, 'top_killer': None}
+        try:
+            if not player_characters:
+                return summary
+
+            guild_id = int(guild_id)
+            events_match = {
+                'guild_id': guild_id,
+                'is_suicide': False,
+                '$or': [
+                    {'killer': {'$in': player_characters}},
+                    {'victim': {'$in': player_characters}}
+                ]
+            }
+            pvp_match = {'guild_id': guild_id, 'player_name': {'$in': player_characters}}
+            if server_id:
+                events_match['server_id'] = server_id
+                pvp_match['server_id'] = server_id
+
+            # Other players only: kills on and deaths to alts do not count as rivalries
+            others = {'$nin': player_characters + [None, '']}
+
+            def top_opponent(own_field: str, other_field: str) -> List[Dict[str, Any]]:
+                return [
+                    {'$match': {'_pvp': {'$exists': False}, own_field: {'$in': player_characters}, other_field: others}},
+                    {'$group': {'_id': f'${other_field}', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1, '_id': 1}},
+                    {'$limit': 1}
+                ]
+
+            def non_negative(field: str) -> Dict[str, Any]:
+                return {'$max': [0, {'$ifNull': [f'${field}', 0]}]}
+
+            pipeline = [
+                {'$match': events_match},
+                {'$project': {'_id': 0, 'killer': 1, 'victim': 1, 'weapon': 1}},
+                {'$unionWith': {
+                    'coll': self.pvp_data.name,
+                    'pipeline': [
+                        {'$match': pvp_match},
+                        {'$project': {
+                            '_id': 0, '_pvp': {'$literal': True}, 'kills': 1, 'deaths': 1, 'suicides': 1,
+                            'personal_best_distance': 1, 'total_distance': 1, 'best_streak': 1
+                        }}
+                    ]
+                }},
+                {'$facet': {
+                    'totals': [
+                        {'$match': {'_pvp': True}},
+                        {'$group': {
+                            '_id': None,
+                            'kills': {'$sum': non_negative('kills')},
+                            'deaths': {'$sum': non_negative('deaths')},
+                            'suicides': {'$sum': non_negative('suicides')},
+                            'personal_best_distance': {'$max': {'$ifNull': ['$personal_best_distance', 0.0]}},
+                            'total_distance': {'$sum': {'$ifNull': ['$total_distance', 0.0]}},
+                            'best_streak': {'$max': non_negative('best_streak')},
+                            'servers_played': {'$sum': 1}
+                        }}
+                    ],
+                    'weapons': [
+                        {'$match': {
+                            '_pvp': {'$exists': False},
+                            'killer': {'$in': player_characters},
+                            'weapon': {'$nin': ['Menu Suicide', 'Suicide', 'Falling']}
+                        }},
+                        {'$group': {'_id': {'$ifNull': ['$weapon', 'Unknown']}, 'count': {'$sum': 1}}},
+                        {'$sort': {'count': -1, '_id': 1}}
+                    ],
+                    'top_victim': top_opponent('killer', 'victim'),
+                    'top_killer': top_opponent('victim', 'killer')
+                }}
+            ]
+
+            results = await self.kill_events.aggregate(pipeline).to_list(length=1)
+            if not results:
+                return summary
+            facets = results[0]
+
+            if facets['totals']:
+                totals = facets['totals'][0]
+                totals.pop('_id', None)
+                summary['totals'] = totals
+
+            summary['weapons'] = {row['_id']: row['count'] for row in facets['weapons']}
+
+            for key in ('top_victim', 'top_killer'):
+                if facets[key]:
+                    summary[key] = (facets[key][0]['_id'], facets[key][0]['count'])
+
+            return summary
+
+        except Exception as e:
+            logger.error(f"Failed to get player stats summary: {e}")
+            return summary
+
     async def get_guild_currency_name(self, guild_id: int) -> str:
         """Get custom currency name for guild or default"""
         try:
-            guild_doc = await self.guilds.find_one({'guild_id': guild_id})
+            guild_doc = await self.get_guild(guild_id)
             return guild_doc.get('currency_name', 'Emeralds') if guild_doc else 'Emeralds'
         except Exception:
             return 'Emeralds'
@@ -810,40 +1060,53 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to reset player streak: {e}")
 
-    async def add_kill_event(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]):
-        """Add a kill event to the database with enhanced distance validation"""
-        try:
-            # PHASE 1 FIX: Ensure distance is properly validated before DB insertion
-            distance = kill_data.get("distance", 0)
-            if isinstance(distance, str):
-                try:
-                    distance = float(distance) if distance else 0.0
-                except (ValueError, TypeError):
-                    distance = 0.0
-            elif not isinstance(distance, (int, float)):
+    def _build_kill_event(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a kill_events document with enhanced distance validation"""
+        # PHASE 1 FIX: Ensure distance is properly validated before DB insertion
+        distance = kill_data.get("distance", 0)
+        if isinstance(distance, str):
+            try:
+                distance = float(distance) if distance else 0.0
+            except (ValueError, TypeError):
                 distance = 0.0
+        elif not isinstance(distance, (int, float)):
+            distance = 0.0
 
-            # Ensure distance is within reasonable bounds
-            distance = max(0.0, min(distance, 5000.0))
+        # Ensure distance is within reasonable bounds
+        distance = max(0.0, min(distance, 5000.0))
 
-            kill_event = {
-                "guild_id": guild_id,
-                "server_id": server_id,
-                "timestamp": kill_data.get("timestamp", datetime.now(timezone.utc)),
-                "killer": kill_data.get("killer", ""),
-                "killer_id": kill_data.get("killer_id", ""),
-                "victim": kill_data.get("victim", ""),
-                "victim_id": kill_data.get("victim_id", ""),
-                "weapon": kill_data.get("weapon", ""),
-                "distance": distance,  # Now properly validated numeric value
-                "killer_platform": kill_data.get("killer_platform", ""),
-                "victim_platform": kill_data.get("victim_platform", ""),
-                "is_suicide": kill_data.get("is_suicide", False),
-                "raw_line": kill_data.get("raw_line", "")
-            }
+        return {
+            "event_key": self._kill_event_key(guild_id, server_id, kill_data),
+            "guild_id": guild_id,
+            "server_id": server_id,
+            "timestamp": kill_data.get("timestamp", datetime.now(timezone.utc)),
+            "killer": kill_data.get("killer", ""),
+            "killer_id": kill_data.get("killer_id", ""),
+            "victim": kill_data.get("victim", ""),
+            "victim_id": kill_data.get("victim_id", ""),
+            "weapon": kill_data.get("weapon", ""),
+            "distance": distance,  # Now properly validated numeric value
+            "killer_platform": kill_data.get("killer_platform", ""),
+            "victim_platform": kill_data.get("victim_platform", ""),
+            "is_suicide": kill_data.get("is_suicide", False),
+            "raw_line": kill_data.get("raw_line", "")
+        }
+
+    @staticmethod
+    def _kill_event_key(guild_id: int, server_id: str, kill_data: Dict[str, Any]) -> str:
+        """Deterministic key for a kill event: the same CSV row always gets the same key"""
+        source = kill_data.get("raw_line") or "|".join(
+            str(kill_data.get(field, "")) for field in ("timestamp", "killer_id", "victim_id", "weapon", "distance")
+        )
+        return hashlib.sha1(f"{guild_id}|{server_id}|{source}".encode("utf-8")).hexdigest()
+
+    async def add_kill_event(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]):
+        """Add a kill event to the database with enhanced distance validation"""
+        try:
+            kill_event = self._build_kill_event(guild_id, server_id, kill_data)
 
             await self.kill_events.insert_one(kill_event)
-            logger.debug(f"Added kill event: {kill_data['killer']} -> {kill_data['victim']} (distance: {distance}m)")
+            logger.debug(f"Added kill event: {kill_data['killer']} -> {kill_data['victim']} (distance: {kill_event['distance']}m)")
 
         except Exception as e:
             logger.error(f"Failed to add kill event: {e}")
@@ -913,22 +1176,182 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to increment player death: {e}")
 
-    async def find_player_by_character_name(self, guild_id: int, character_name: str) -> Optional[Dict]:
-        """Find a player document by searching linked character names (case-insensitive, space-normalized)"""
+    def _aggregate_kill_deltas(self, kill_events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fold a chronologically ordered batch of kill events into one delta per player.
+
+        Streaks are tracked as runs of kills: lead_kills continue the player's stored
+        streak, best_run is the longest run fully inside the batch, and tail_kills
+        become the new current streak when the batch contains a death or suicide.
+        """
+        deltas: Dict[str, Dict[str, Any]] = {}
+
+        def delta_for(player_name: str) -> Dict[str, Any]:
+            if player_name not in deltas:
+                deltas[player_name] = {
+                    "kills": 0, "deaths": 0, "suicides": 0, "total_distance": 0.0,
+                    "best_distance": 0.0, "lead_kills": 0, "tail_kills": 0,
+                    "best_run": 0, "reset": False
+                }
+            return deltas[player_name]
+
+        for event in kill_events:
+            victim = str(event.get("victim", "")).strip()
+            if event.get("is_suicide"):
+                if victim:
+                    delta = delta_for(victim)
+                    delta["suicides"] += 1
+                    delta["reset"] = True
+                    delta["tail_kills"] = 0
+                continue
+
+            killer = str(event.get("killer", "")).strip()
+            if killer:
+                distance = round(float(event.get("distance", 0.0)), 1)
+                delta = delta_for(killer)
+                delta["kills"] += 1
+                delta["total_distance"] += distance
+                delta["best_distance"] = max(delta["best_distance"], distance)
+                if delta["reset"]:
+                    delta["tail_kills"] += 1
+                    delta["best_run"] = max(delta["best_run"], delta["tail_kills"])
+                else:
+                    delta["lead_kills"] += 1
+
+            if victim:
+                delta = delta_for(victim)
+                delta["deaths"] += 1
+                delta["reset"] = True
+                delta["tail_kills"] = 0
+
+        return deltas
+
+    def _build_pvp_delta_update(self, guild_id: int, server_id: str, player_name: str,
+                                delta: Dict[str, Any]) -> UpdateOne:
+        """Build an upserting pipeline update that applies a player's batch delta server-side"""
+        stored_streak = {"$ifNull": ["$current_streak", 0]}
+        continued_streak = {"$add": [stored_streak, delta["lead_kills"]]}
+
+        return UpdateOne(
+            {"guild_id": guild_id, "server_id": server_id, "player_name": player_name},
+            [
+                {"$set": {
+                    "kills": {"$add": [{"$ifNull": ["$kills", 0]}, delta["kills"]]},
+                    "deaths": {"$add": [{"$ifNull": ["$deaths", 0]}, delta["deaths"]]},
+                    "suicides": {"$add": [{"$ifNull": ["$suicides", 0]}, delta["suicides"]]},
+                    "total_distance": {"$add": [{"$ifNull": ["$total_distance", 0.0]}, delta["total_distance"]]},
+                    "personal_best_distance": {
+                        "$max": [{"$ifNull": ["$personal_best_distance", 0.0]}, delta["best_distance"]]
+                    },
+                    "longest_streak": {
+                        "$max": [{"$ifNull": ["$longest_streak", 0]}, continued_streak, delta["best_run"]]
+                    },
+                    "current_streak": delta["tail_kills"] if delta["reset"] else continued_streak,
+                    "created_at": {"$ifNull": ["$created_at", "$$NOW"]},
+                    "favorite_weapon": {"$ifNull": ["$favorite_weapon", None]},
+                    "best_streak": {"$ifNull": ["$best_streak", 0]},
+                    "player_name_key": {"$literal": self.player_name_key(player_name)},
+                    "last_updated": "$$NOW"
+                }},
+                {"$set": {
+                    "kdr": {
+                        "$cond": [
+                            {"$gt": ["$deaths", 0]},
+                            {"$divide": ["$kills", "$deaths"]},
+                            {"$toDouble": "$kills"}
+                        ]
+                    }
+                }}
+            ],
+            upsert=True
+        )
+
+    async def ingest_kill_events(self, guild_id: int, server_id: str,
+                                 kill_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ingest a batch of parsed kill events in a fixed number of round trips.
+
+        Issues one insert_many into kill_events and one unordered bulk_write into
+        pvp_data with a single pipeline update per affected player. Kill/death/
+        suicide counters, distance, streaks and KDR are all computed server-side.
+
+        Safe to retry with the same rows: events are keyed by event_key and only
+        count towards pvp_data once. An event is flagged stats_applied after the
+        pvp_data write, so a batch that failed in between is counted on retry.
+
+        Args:
+            guild_id: Guild owning the server
+            server_id: Game server the events came from
+            kill_events: Parsed kill events in chronological order
+
+        Returns:
+            The kill events newly counted, in order. Rows read again after an
+            earlier successful batch are left out, so callers post them only once
+
+        Raises:
+            Any database error, so callers can keep their cursor and retry
+        """
         try:
-            # Normalize the search term
-            normalized_search = ' '.join(character_name.strip().split())
+            guild_id = int(guild_id)
+            server_id = str(server_id)
 
-            # Create case-insensitive regex pattern
-            escaped_search = normalized_search.replace(' ', r'\s+')
-            pattern = f"^{escaped_search}$"
+            if not kill_events:
+                return []
+
+            documents = [
+                {**self._build_kill_event(guild_id, server_id, event), "stats_applied": False}
+                for event in kill_events
+            ]
+            duplicate_keys = set()
+            try:
+                await self.kill_events.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors', [])
+                if any(error.get('code') != 11000 for error in write_errors):
+                    raise
+                duplicate_keys = {documents[error['index']]['event_key'] for error in write_errors}
+
+            if duplicate_keys:
+                # Already stored: only count the ones a failed batch left unapplied
+                unapplied = set(await self.kill_events.distinct("event_key", {
+                    "event_key": {"$in": list(duplicate_keys)},
+                    "stats_applied": False
+                }))
+                counted = [
+                    (event, document) for event, document in zip(kill_events, documents)
+                    if document['event_key'] not in duplicate_keys or document['event_key'] in unapplied
+                ]
+                if not counted:
+                    return []
+                kill_events = [event for event, _ in counted]
+                documents = [document for _, document in counted]
+
+            deltas = self._aggregate_kill_deltas(documents)
+            operations = [
+                self._build_pvp_delta_update(guild_id, server_id, player_name, delta)
+                for player_name, delta in deltas.items()
+            ]
+            if operations:
+                await self.pvp_data.bulk_write(operations, ordered=False)
+            await self.kill_events.update_many(
+                {"event_key": {"$in": [document['event_key'] for document in documents]}},
+                {"$set": {"stats_applied": True}}
+            )
+            self.mark_leaderboard_dirty(guild_id, server_id)
 
+            logger.debug(f"Ingested {len(documents)} kill events affecting {len(operations)} players on {server_id}")
+            return kill_events
+
+        except Exception as e:
+            logger.error(f"Failed to ingest kill events: {e}")
+            raise
+
+    async def find_player_by_character_name(self, guild_id: int, character_name: str) -> Optional[Dict]:
+        """Find a player document by searching linked character names (case-insensitive, space-normalized)"""
+        try:
             player_doc = await self.pvp_data.find_one({
                 "guild_id": guild_id,
-                "player_name": {
-                    "$regex": pattern,
-                    "$options": "i"
-                }
+                "player_name_key": self.player_name_key(character_name)
             })
 
             return player_doc
@@ -1017,12 +1440,111 @@ class DatabaseManager:
                 upsert=True
             )
 
+            if expires_at is not None:
+                self._grant_premium(guild_id, server_id, expires_at)
+            else:
+                self._premium_entitlements.pop((guild_id, server_id), None)
+
             return True
 
         except Exception as e:
             logger.error(f"Failed to set premium status: {e}")
             return False
 
+    PREMIUM_RELOAD_RETRY = 60
+
+    async def load_premium_entitlements(self):
+        """
+        Load active premium servers into the in-memory entitlement table.
+
+        Reads the premium collection directly, the same documents is_premium_server
+        honours per call. If the load fails the table stays unused (checks keep
+        querying the database) and the load is retried after PREMIUM_RELOAD_RETRY seconds.
+        """
+        try:
+            current_time = datetime.now(timezone.utc)
+            active_premium = await self.premium.find({
+                "active": True,
+                "$or": [
+                    {"expires_at": {"$gt": current_time}},
+                    {"expires_at": None}
+                ]
+            }).to_list(length=None)
+
+            self._premium_entitlements.clear()
+            self._premium_expiry_heap.clear()
+            for premium in active_premium:
+                self._grant_premium(premium["guild_id"], premium["server_id"], premium.get("expires_at"))
+
+            self._premium_loaded = True
+            logger.info(f"💎 Loaded {len(self._premium_entitlements)} premium entitlements")
+
+        except Exception as e:
+            logger.error(f"Failed to load premium entitlements, retrying in {self.PREMIUM_RELOAD_RETRY}s: {e}")
+            try:
+                loop = asyncio.get_running_loop()
+                loop.call_later(self.PREMIUM_RELOAD_RETRY,
+                                lambda: asyncio.create_task(self.load_premium_entitlements()))
+            except RuntimeError:
+                pass  # No event loop, checks keep querying the database
+
+    def _grant_premium(self, guild_id: int, server_id: str, expires_at: Optional[datetime]):
+        """Record an entitlement and queue its expiry"""
+        key = (int(guild_id), str(server_id))
+        if expires_at and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+        self._premium_entitlements[key] = expires_at
+        if expires_at is not None:
+            heapq.heappush(self._premium_expiry_heap, (expires_at.timestamp(), key[0], key[1]))
+            self._schedule_premium_expiry()
+
+    def _schedule_premium_expiry(self):
+        """Arm a single timer for the earliest pending expiry"""
+        if not self._premium_expiry_heap:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Loaded outside the event loop, expiry is still checked on read
+
+        if self._premium_expiry_handle:
+            self._premium_expiry_handle.cancel()
+        delay = max(0.0, self._premium_expiry_heap[0][0] - time.time())
+        self._premium_expiry_handle = loop.call_later(delay, self._expire_premium)
+
+    def _expire_premium(self):
+        """Drop every entitlement whose expires_at has passed and persist the change"""
+        self._premium_expiry_handle = None
+        now = time.time()
+
+        while self._premium_expiry_heap and self._premium_expiry_heap[0][0] <= now:
+            expires_ts, guild_id, server_id = heapq.heappop(self._premium_expiry_heap)
+            key = (guild_id, server_id)
+            expires_at = self._premium_entitlements.get(key)
+
+            # Skip stale heap entries left behind by renewals and revocations
+            if expires_at is None or expires_at.timestamp() != expires_ts:
+                continue
+
+            del self._premium_entitlements[key]
+            logger.info(f"Premium expired for server {server_id} in guild {guild_id}")
+            asyncio.create_task(self._persist_premium_expiry(guild_id, server_id))
+
+        self._schedule_premium_expiry()
+
+    async def _persist_premium_expiry(self, guild_id: int, server_id: str):
+        """Mark an expired entitlement inactive, unless it was renewed in the meantime"""
+        try:
+            now = datetime.now(timezone.utc)
+            await self.premium.update_one(
+                {"guild_id": guild_id, "server_id": server_id, "expires_at": {"$lte": now}},
+                {"$set": {"active": False, "expires_at": None, "updated_at": now}}
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist premium expiry for server {server_id}: {e}")
+
     async def is_premium_server(self, guild_id: int, server_id: str) -> bool:
         """Check if server has active premium"""
         try:
@@ -1030,6 +1552,15 @@ class DatabaseManager:
             guild_id = int(guild_id)
             server_id = str(server_id)
 
+            if self._premium_loaded:
+                key = (guild_id, server_id)
+                if key not in self._premium_entitlements:
+                    return False
+
+                expires_at = self._premium_entitlements[key]
+                # The expiry timer may not have fired yet
+                return expires_at is None or expires_at > datetime.now(timezone.utc)
+
             premium_doc = await self.premium.find_one({"guild_id": guild_id, "server_id": server_id})
 
             if not premium_doc or not premium_doc.get("active"):
@@ -1053,6 +1584,122 @@ class DatabaseManager:
             logger.error(f"Failed to check premium status: {e}")
             return False
 
+    # ACTIVE BOUNTY INDEX
+    async def load_active_bounties(self):
+        """Load active, unclaimed bounties into the in-memory index"""
+        try:
+            # Bounties from the removed duplicate /bounty set used target_name/bounty_amount
+            await self.bounties.update_many(
+                {"target_character": {"$exists": False}, "target_name": {"$exists": True}},
+                [{"$set": {
+                    "target_character": "$target_name",
+                    "amount": "$bounty_amount",
+                    "active": {"$not": ["$claimed"]},
+                    "auto_generated": False
+                }}]
+            )
+
+            now = datetime.now(timezone.utc)
+            active = await self.bounties.find({
+                "active": True,
+                "claimed": False,
+                "expires_at": {"$gt": now}
+            }).to_list(length=None)
+
+            self._active_bounties.clear()
+            self._bounty_expiry_heap.clear()
+            for bounty in active:
+                self.index_bounty(bounty)
+
+            logger.info(f"🎯 Loaded {len(active)} active bounties")
+
+        except Exception as e:
+            logger.error(f"Failed to load active bounties: {e}")
+
+    def index_bounty(self, bounty: Dict[str, Any]):
+        """Add an inserted bounty to the index and queue its expiry"""
+        guild_id = int(bounty["guild_id"])
+        name_key = self.player_name_key(bounty["target_character"])
+        bounty_id = str(bounty["_id"])
+
+        expires_at = bounty.get("expires_at")
+        if expires_at and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+            bounty["expires_at"] = expires_at
+
+        self._active_bounties.setdefault(guild_id, {}).setdefault(name_key, {})[bounty_id] = bounty
+        if expires_at is not None:
+            heapq.heappush(self._bounty_expiry_heap, (expires_at.timestamp(), guild_id, name_key, bounty_id))
+            self._schedule_bounty_expiry()
+
+    def unindex_bounty(self, bounty: Dict[str, Any]) -> bool:
+        """
+        Remove a bounty from the index.
+
+        Returns:
+            False if it was not indexed (already claimed or expired)
+        """
+        guild_id = int(bounty["guild_id"])
+        name_key = self.player_name_key(bounty["target_character"])
+        return self._drop_indexed_bounty(guild_id, name_key, str(bounty["_id"])) is not None
+
+    def _drop_indexed_bounty(self, guild_id: int, name_key: str, bounty_id: str) -> Optional[Dict[str, Any]]:
+        guild_bounties = self._active_bounties.get(guild_id)
+        if not guild_bounties or name_key not in guild_bounties:
+            return None
+
+        bounty = guild_bounties[name_key].pop(bounty_id, None)
+        if not guild_bounties[name_key]:
+            del guild_bounties[name_key]
+            if not guild_bounties:
+                del self._active_bounties[guild_id]
+        return bounty
+
+    def match_active_bounties(self, guild_id: int, character_name: str) -> List[Dict[str, Any]]:
+        """Get the active bounties on a character, from memory only (checked for every kill)"""
+        guild_bounties = self._active_bounties.get(int(guild_id))
+        if not guild_bounties:
+            return []
+
+        targets = guild_bounties.get(self.player_name_key(character_name))
+        if not targets:
+            return []
+
+        # The expiry timer may not have fired yet
+        now = datetime.now(timezone.utc)
+        return [
+            bounty for bounty in targets.values()
+            if bounty.get("expires_at") is None or bounty["expires_at"] > now
+        ]
+
+    def _schedule_bounty_expiry(self):
+        """Arm a single timer for the earliest pending bounty expiry"""
+        if not self._bounty_expiry_heap:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Loaded outside the event loop, expiry is still checked on read
+
+        if self._bounty_expiry_handle:
+            self._bounty_expiry_handle.cancel()
+        delay = max(0.0, self._bounty_expiry_heap[0][0] - time.time())
+        self._bounty_expiry_handle = loop.call_later(delay, self._expire_bounties)
+
+    def _expire_bounties(self):
+        """Drop every indexed bounty whose expires_at has passed"""
+        self._bounty_expiry_handle = None
+        now = time.time()
+
+        while self._bounty_expiry_heap and self._bounty_expiry_heap[0][0] <= now:
+            _, guild_id, name_key, bounty_id = heapq.heappop(self._bounty_expiry_heap)
+            # Claimed bounties were already removed
+            if self._drop_indexed_bounty(guild_id, name_key, bounty_id) is not None:
+                logger.debug(f"Bounty {bounty_id} expired in guild {guild_id}")
+
+        self._schedule_bounty_expiry()
+
     # LEADERBOARDS
     async def get_leaderboard(self, guild_id: int, server_id: str, stat: str = "kills", 
                              limit: int = 10) -> List[Dict[str, Any]]:
@@ -1065,6 +1712,449 @@ class DatabaseManager:
 
         return await cursor.to_list(length=limit)
 
+    # LEADERBOARD SNAPSHOTS (Server-scoped)
+    LEADERBOARD_CATEGORIES = ('kills', 'deaths', 'kdr', 'distance', 'weapons', 'factions')
+    LEADERBOARD_SIZE = 10
+    NON_COMBAT_WEAPONS = ["Menu Suicide", "Suicide", "Falling", "suicide_by_relocation"]
+
+    def mark_leaderboard_dirty(self, guild_id: int, server_id: str):
+        """Flag a server's leaderboard snapshots for the next refresh"""
+        self._dirty_leaderboards.add((int(guild_id), str(server_id)))
+
+    def mark_guild_leaderboards_dirty(self, guild_id: int):
+        """Flag every server of a guild for the next refresh (faction and link changes)"""
+        self._dirty_leaderboard_guilds.add(int(guild_id))
+
+    async def load_dirty_leaderboards(self):
+        """
+        Flag every server with stored snapshots for one refresh after startup.
+
+        Dirty flags live in memory, so kills ingested shortly before a restart
+        would otherwise not reach the snapshots until the server's next kill.
+        """
+        try:
+            servers = await self.leaderboard_snapshots.aggregate([
+                {"$group": {"_id": {"guild_id": "$guild_id", "server_id": "$server_id"}}}
+            ]).to_list(length=None)
+
+            for server in servers:
+                self.mark_leaderboard_dirty(server["_id"]["guild_id"], server["_id"]["server_id"])
+            logger.info(f"📊 Queued leaderboard snapshot refresh for {len(servers)} servers")
+
+        except Exception as e:
+            logger.error(f"Failed to queue leaderboard snapshot refresh: {e}")
+
+    async def _compute_leaderboard_rankings(self, guild_id: int, server_id: str, category: str) -> List[Dict[str, Any]]:
+        """Compute the top-N rankings for one category with a single indexed query or aggregation"""
+        limit = self.LEADERBOARD_SIZE
+        player_fields = {
+            "_id": 0, "player_name": 1, "kills": 1, "deaths": 1, "kdr": 1,
+            "total_distance": 1, "personal_best_distance": 1
+        }
+        player_categories = {
+            'kills': ("kills", {"$gt": 0}),
+            'deaths': ("deaths", {"$gt": 0}),
+            'kdr': ("kdr", {"$gt": 0}),
+            'distance': ("personal_best_distance", {"$gt": 0})
+        }
+
+        if category in player_categories:
+            field, condition = player_categories[category]
+            cursor = self.pvp_data.find(
+                {"guild_id": guild_id, "server_id": server_id, field: condition},
+                player_fields
+            ).sort(field, -1).limit(limit)
+            return await cursor.to_list(length=limit)
+
+        if category == 'weapons':
+            pipeline = [
+                {"$match": {
+                    "guild_id": guild_id,
+                    "server_id": server_id,
+                    "is_suicide": False,
+                    "weapon": {"$nin": self.NON_COMBAT_WEAPONS}
+                }},
+                {"$group": {"_id": {"weapon": "$weapon", "killer": "$killer"}, "kills": {"$sum": 1}}},
+                {"$sort": {"kills": -1}},
+                {"$group": {
+                    "_id": "$_id.weapon",
+                    "kills": {"$sum": "$kills"},
+                    "top_killer": {"$first": "$_id.killer"}
+                }},
+                {"$sort": {"kills": -1}},
+                {"$limit": limit},
+                {"$project": {"_id": 0, "weapon": "$_id", "kills": 1, "top_killer": 1}}
+            ]
+            return await self.kill_events.aggregate(pipeline).to_list(length=limit)
+
+        if category == 'factions':
+            pipeline = self._faction_stats_pipeline(
+                {"guild_id": guild_id},
+                {"guild_id": guild_id, "server_id": server_id}
+            ) + [
+                {"$group": {
+                    "_id": "$faction_id",
+                    "faction_name": {"$first": "$faction_name"},
+                    "faction_tag": {"$first": "$faction_tag"},
+                    "kills": {"$sum": "$stats.kills"},
+                    "deaths": {"$sum": "$stats.deaths"},
+                    "member_count": {"$sum": 1}
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "faction": {"$cond": [
+                        {"$eq": [{"$ifNull": ["$faction_tag", ""]}, ""]},
+                        "$faction_name",
+                        "$faction_tag"
+                    ]},
+                    "faction_name": 1,
+                    "kills": 1,
+                    "deaths": 1,
+                    "member_count": 1
+                }},
+                {"$match": {"faction": {"$nin": [None, ""]}}},
+                {"$sort": {"kills": -1}},
+                {"$limit": limit}
+            ]
+            return await self.character_factions.aggregate(pipeline).to_list(length=limit)
+
+        return []
+
+    async def refresh_leaderboard_snapshots(self, guild_id: int, server_id: str,
+                                            window: str = "all_time") -> Dict[str, Dict[str, Any]]:
+        """
+        Recompute every leaderboard category for a server and store them in one bulk_write.
+
+        Returns:
+            Snapshot documents keyed by category
+        """
+        guild_id = int(guild_id)
+        server_id = str(server_id)
+        # Clear first so kills ingested while computing mark the server dirty again
+        self._dirty_leaderboards.discard((guild_id, server_id))
+
+        try:
+            computed_at = datetime.now(timezone.utc)
+            snapshots = {}
+            for category in self.LEADERBOARD_CATEGORIES:
+                snapshots[category] = {
+                    "guild_id": guild_id,
+                    "server_id": server_id,
+                    "category": category,
+                    "window": window,
+                    "rankings": await self._compute_leaderboard_rankings(guild_id, server_id, category),
+                    "computed_at": computed_at
+                }
+
+            await self.leaderboard_snapshots.bulk_write([
+                ReplaceOne(
+                    {"guild_id": guild_id, "server_id": server_id, "category": category, "window": window},
+                    snapshot,
+                    upsert=True
+                )
+                for category, snapshot in snapshots.items()
+            ], ordered=False)
+
+            logger.debug(f"Refreshed leaderboard snapshots for server {server_id} in guild {guild_id}")
+            return snapshots
+
+        except Exception as e:
+            logger.error(f"Failed to refresh leaderboard snapshots for server {server_id}: {e}")
+            self.mark_leaderboard_dirty(guild_id, server_id)
+            return {}
+
+    async def refresh_dirty_leaderboards(self) -> int:
+        """
+        Refresh snapshots only for servers with kills ingested, or guild faction/link
+        changes, since their last snapshot.
+
+        Returns:
+            Number of servers refreshed
+        """
+        dirty_guilds = list(self._dirty_leaderboard_guilds)
+        self._dirty_leaderboard_guilds.clear()
+        for guild_id in dirty_guilds:
+            guild_config = await self.get_guild(guild_id)
+            for server in (guild_config or {}).get("servers", []):
+                self.mark_leaderboard_dirty(guild_id, server.get("_id", server.get("server_id")))
+
+        dirty = list(self._dirty_leaderboards)
+        refreshed = 0
+        for guild_id, server_id in dirty:
+            if await self.refresh_leaderboard_snapshots(guild_id, server_id):
+                refreshed += 1
+
+        if refreshed:
+            logger.info(f"📊 Refreshed leaderboard snapshots for {refreshed} servers")
+        return refreshed
+
+    async def get_leaderboard_snapshots(self, guild_id: int, server_id: str, categories: List[str],
+                                        window: str = "all_time") -> Dict[str, Dict[str, Any]]:
+        """
+        Read precomputed leaderboard snapshots for a server in one query.
+
+        Snapshots that have never been computed are built on demand.
+
+        Returns:
+            Snapshot documents keyed by category
+        """
+        try:
+            guild_id = int(guild_id)
+            server_id = str(server_id)
+
+            cursor = self.leaderboard_snapshots.find({
+                "guild_id": guild_id,
+                "server_id": server_id,
+                "category": {"$in": list(categories)},
+                "window": window
+            })
+            snapshots = {doc["category"]: doc for doc in await cursor.to_list(length=None)}
+
+            if any(category not in snapshots for category in categories):
+                computed = await self.refresh_leaderboard_snapshots(guild_id, server_id, window)
+                snapshots.update({category: computed[category] for category in categories if category in computed})
+
+            return snapshots
+
+        except Exception as e:
+            logger.error(f"Failed to get leaderboard snapshots for server {server_id}: {e}")
+            return {}
+
+    async def get_leaderboard_snapshot(self, guild_id: int, server_id: str, category: str,
+                                       window: str = "all_time") -> List[Dict[str, Any]]:
+        """Get the precomputed top-N rankings for one leaderboard category"""
+        snapshots = await self.get_leaderboard_snapshots(guild_id, server_id, [category], window)
+        snapshot = snapshots.get(category)
+        return snapshot.get("rankings", []) if snapshot else []
+
+    # FACTION TAGS (Guild-scoped)
+    FACTION_TAG_CACHE_TTL = 300
+
+    def invalidate_faction_tags(self, guild_id: int):
+        """Drop the cached faction tags for a guild after a faction or membership change"""
+        self._faction_tag_cache.pop(int(guild_id), None)
+
+    async def get_faction_tags(self, guild_id: int, character_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve faction tags for many characters at once.
+
+        Names missing from the guild's cache are resolved with one query against the
+        character -> faction index. Characters without a faction are cached as None.
+
+        Returns:
+            Character name -> faction tag (or faction name when the faction has no tag)
+        """
+        guild_id = int(guild_id)
+        now = time.monotonic()
+
+        cache = self._faction_tag_cache.get(guild_id)
+        if not cache or cache['expires_at'] <= now:
+            cache = {'expires_at': now + self.FACTION_TAG_CACHE_TTL, 'tags': {}}
+            self._faction_tag_cache[guild_id] = cache
+        tags = cache['tags']
+
+        missing = list({name for name in character_names if name and name not in tags})
+        if missing:
+            try:
+                resolved = dict.fromkeys(missing)
+                cursor = self.character_factions.find(
+                    {"guild_id": guild_id, "character_name": {"$in": missing}},
+                    {"_id": 0, "character_name": 1, "faction_tag": 1, "faction_name": 1}
+                )
+                async for entry in cursor:
+                    resolved[entry['character_name']] = entry.get('faction_tag') or entry.get('faction_name')
+                tags.update(resolved)
+
+            except Exception as e:
+                logger.error(f"Failed to resolve faction tags: {e}")
+
+        return {name: tags.get(name) for name in character_names}
+
+    # FACTION INDEX (Guild-scoped)
+    def _faction_stats_pipeline(self, match: Dict[str, Any], pvp_match: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Join character_factions entries to their pvp_data documents, one row per stats document"""
+        conditions = [{"$eq": ["$player_name", "$$character_name"]}]
+        conditions += [{"$eq": ["$" + field, value]} for field, value in pvp_match.items()]
+        return [
+            {"$match": match},
+            {"$lookup": {
+                "from": self.pvp_data.name,
+                "let": {"character_name": "$character_name"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": conditions}}},
+                    {"$project": {
+                        "_id": 0, "kills": 1, "deaths": 1, "suicides": 1,
+                        "total_distance": 1, "longest_streak": 1
+                    }}
+                ],
+                "as": "stats"
+            }},
+            {"$unwind": "$stats"}
+        ]
+
+    async def backfill_player_name_keys(self, batch_size: int = 1000):
+        """Add player_name_key to pvp_data and linked_character_keys to players where missing"""
+        try:
+            updated = 0
+
+            operations = []
+            cursor = self.pvp_data.find({"player_name_key": {"$exists": False}}, {"player_name": 1})
+            async for doc in cursor:
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"player_name_key": self.player_name_key(doc.get("player_name", ""))}}
+                ))
+                if len(operations) >= batch_size:
+                    await self.pvp_data.bulk_write(operations, ordered=False)
+                    updated += len(operations)
+                    operations = []
+            if operations:
+                await self.pvp_data.bulk_write(operations, ordered=False)
+                updated += len(operations)
+
+            operations = []
+            cursor = self.players.find({"linked_character_keys": {"$exists": False}}, {"linked_characters": 1})
+            async for doc in cursor:
+                keys = sorted({self.player_name_key(name) for name in doc.get("linked_characters", [])})
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"linked_character_keys": keys}}))
+                if len(operations) >= batch_size:
+                    await self.players.bulk_write(operations, ordered=False)
+                    updated += len(operations)
+                    operations = []
+            if operations:
+                await self.players.bulk_write(operations, ordered=False)
+                updated += len(operations)
+
+            if updated:
+                logger.info(f"🔤 Backfilled normalized player name keys on {updated} documents")
+
+        except Exception as e:
+            logger.error(f"Failed to backfill player name keys: {e}")
+
+    async def rebuild_faction_index(self, guild_id: Optional[int] = None):
+        """Rebuild the character -> faction index from factions and linked players"""
+        try:
+            match = {"guild_id": int(guild_id)} if guild_id is not None else {}
+            pipeline = [
+                {"$match": match},
+                {"$unwind": "$members"},
+                {"$lookup": {
+                    "from": self.players.name,
+                    "let": {"guild_id": "$guild_id", "discord_id": "$members"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$and": [
+                            {"$eq": ["$guild_id", "$$guild_id"]},
+                            {"$eq": ["$discord_id", "$$discord_id"]}
+                        ]}}},
+                        {"$project": {"_id": 0, "linked_characters": 1}}
+                    ],
+                    "as": "player"
+                }},
+                {"$unwind": "$player"},
+                {"$unwind": "$player.linked_characters"},
+                {"$group": {
+                    "_id": {"guild_id": "$guild_id", "character_name": "$player.linked_characters"},
+                    "discord_id": {"$first": "$members"},
+                    "faction_id": {"$first": "$_id"},
+                    "faction_name": {"$first": {"$ifNull": ["$faction_name", "$name"]}},
+                    "faction_tag": {"$first": "$faction_tag"}
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "guild_id": "$_id.guild_id",
+                    "character_name": "$_id.character_name",
+                    "discord_id": 1,
+                    "faction_id": 1,
+                    "faction_name": 1,
+                    "faction_tag": 1
+                }}
+            ]
+            entries = await self.factions.aggregate(pipeline).to_list(length=None)
+
+            await self.character_factions.delete_many(match)
+            if entries:
+                await self.character_factions.insert_many(entries, ordered=False)
+
+            if guild_id is not None:
+                self.invalidate_faction_tags(guild_id)
+                self.mark_guild_leaderboards_dirty(guild_id)
+            else:
+                self._faction_tag_cache.clear()
+            logger.info(f"Rebuilt character faction index ({len(entries)} characters)")
+
+        except Exception as e:
+            logger.error(f"Failed to rebuild character faction index: {e}")
+
+    async def sync_faction_member(self, guild_id: int, discord_id: int):
+        """Rewrite one member's character -> faction index entries after a link or membership change"""
+        try:
+            guild_id = int(guild_id)
+            discord_id = int(discord_id)
+
+            player = await self.players.find_one(
+                {"guild_id": guild_id, "discord_id": discord_id}, {"linked_characters": 1}
+            )
+            faction = await self.factions.find_one(
+                {"guild_id": guild_id, "members": discord_id},
+                {"faction_name": 1, "name": 1, "faction_tag": 1}
+            )
+
+            operations = [DeleteMany({"guild_id": guild_id, "discord_id": discord_id})]
+            if player and faction:
+                for character_name in player.get("linked_characters", []):
+                    operations.append(ReplaceOne(
+                        {"guild_id": guild_id, "character_name": character_name},
+                        {
+                            "guild_id": guild_id,
+                            "character_name": character_name,
+                            "discord_id": discord_id,
+                            "faction_id": faction["_id"],
+                            "faction_name": faction.get("faction_name") or faction.get("name"),
+                            "faction_tag": faction.get("faction_tag")
+                        },
+                        upsert=True
+                    ))
+
+            # Ordered so the member's old entries are removed before the new ones land
+            await self.character_factions.bulk_write(operations, ordered=True)
+            self.invalidate_faction_tags(guild_id)
+            self.mark_guild_leaderboards_dirty(guild_id)
+
+        except Exception as e:
+            logger.error(f"Failed to sync faction index for member {discord_id}: {e}")
+
+    async def get_faction_stats(self, guild_id: int, faction_id: Any) -> Dict[str, Any]:
+        """
+        Get combined PvP totals for a faction across all servers in one aggregation.
+
+        Returns:
+            Dictionary with total_kills, total_deaths, total_suicides, total_distance, best_streak
+        """
+        guild_id = int(guild_id)
+        pipeline = self._faction_stats_pipeline(
+            {"guild_id": guild_id, "faction_id": faction_id},
+            {"guild_id": guild_id}
+        ) + [
+            {"$group": {
+                "_id": None,
+                "total_kills": {"$sum": "$stats.kills"},
+                "total_deaths": {"$sum": "$stats.deaths"},
+                "total_suicides": {"$sum": "$stats.suicides"},
+                "total_distance": {"$sum": "$stats.total_distance"},
+                "best_streak": {"$max": "$stats.longest_streak"}
+            }},
+            {"$project": {"_id": 0}}
+        ]
+
+        results = await self.character_factions.aggregate(pipeline).to_list(length=1)
+        totals = {
+            "total_kills": 0, "total_deaths": 0, "total_suicides": 0,
+            "total_distance": 0.0, "best_streak": 0
+        }
+        if results:
+            totals.update({key: value for key, value in results[0].items() if value is not None})
+        return totals
+
     # LOG PARSER SUPPORT METHODS
     async def get_active_premium_servers(self) -> List[Dict[str, Any]]:
         """Get all active premium servers for log parser"""
@@ -1087,7 +2177,7 @@ class DatabaseManager:
                 server_id = premium_doc.get("server_id")
 
                 # Find the guild config to get server name
-                guild_config = await self.guilds.find_one({"guild_id": guild_id})
+                guild_config = await self.get_guild(guild_id)
                 if guild_config:
                     servers = guild_config.get("servers", [])
                     for server in servers:
@@ -1233,6 +2323,47 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to save parser state for {server_id}: {e}")
 
+    async def save_parser_states(self, states: List[Tuple[int, str, Dict[str, Any]]],
+                                 parser_type: str = "log_parser") -> bool:
+        """
+        Save several parser states in one unordered bulk_write.
+
+        Args:
+            states: (guild_id, server_id, state_data) tuples
+            parser_type: Parser owning the states
+
+        Returns:
+            False if the batch could not be written and should be retried
+        """
+        try:
+            if not states:
+                return True
+
+            now = datetime.now(timezone.utc)
+            operations = []
+            for guild_id, server_id, state_data in states:
+                filter_doc = {
+                    "guild_id": int(guild_id),
+                    "server_id": str(server_id).strip(),
+                    "parser_type": parser_type
+                }
+                operations.append(ReplaceOne(
+                    filter_doc,
+                    {**filter_doc, "last_updated": now, **state_data},
+                    upsert=True
+                ))
+
+            await self.parser_states.bulk_write(operations, ordered=False)
+            logger.debug(f"Saved {len(operations)} {parser_type} states")
+            return True
+
+        except BulkWriteError as e:
+            logger.error(f"Parser state bulk write had {len(e.details.get('writeErrors', []))} errors")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save parser states: {e}")
+            return False
+
     async def get_all_parser_states(self, guild_id: int, parser_type: str = "log_parser") -> Dict[str, Dict[str, Any]]:
         """Get all parser states for a guild"""
         try:
@@ -1250,6 +2381,17 @@ class DatabaseManager:
             logger.error(f"Failed to get all parser states: {e}")
             return {}
 
+    async def delete_parser_state(self, guild_id: int, server_id: str, parser_type: str = "log_parser"):
+        """Delete parser state for a specific server"""
+        try:
+            await self.parser_states.delete_many({
+                "guild_id": int(guild_id),
+                "server_id": str(server_id),
+                "parser_type": parser_type
+            })
+        except Exception as e:
+            logger.error(f"Failed to delete parser state for {server_id}: {e}")
+
     async def update_server_config(self, guild_id: int, server_id: str, config_updates: Dict[str, Any]) -> bool:
         """Update server configuration in guild document"""
         try:
@@ -1263,6 +2405,7 @@ class DatabaseManager:
                     "$currentDate": {"last_updated": True}
                 }
             )
+            self.invalidate_guild(guild_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to update server config: {e}")
@@ -1359,6 +2502,81 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to remove player session: {e}")
 
+    async def write_player_sessions(self, changes: List[Tuple[int, str, str, Optional[Dict[str, Any]]]]) -> bool:
+        """
+        Apply a batch of player session changes in one unordered bulk_write.
+
+        Args:
+            changes: (guild_id, server_id, player_id, session_data) tuples, where
+                session_data None removes the session
+
+        Returns:
+            False if the batch could not be written and should be retried
+        """
+        try:
+            if not changes:
+                return True
+
+            now = datetime.now(timezone.utc)
+            operations = []
+            for guild_id, server_id, player_id, session_data in changes:
+                filter_doc = {
+                    "guild_id": int(guild_id),
+                    "server_id": str(server_id),
+                    "player_id": str(player_id)
+                }
+                if session_data is None:
+                    operations.append(DeleteMany(filter_doc))
+                else:
+                    operations.append(ReplaceOne(
+                        filter_doc,
+                        {**filter_doc, "last_updated": now, **session_data},
+                        upsert=True
+                    ))
+
+            await self.player_sessions.bulk_write(operations, ordered=False)
+            logger.debug(f"Wrote {len(operations)} player session changes")
+            return True
+
+        except BulkWriteError as e:
+            # Unordered: everything except the reported errors was applied
+            logger.error(f"Player session bulk write had {len(e.details.get('writeErrors', []))} errors")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write player sessions: {e}")
+            return False
+
+    # OUTBOUND MESSAGE JOURNAL
+
+    async def journal_outbound_message(self, document: Dict[str, Any]) -> bool:
+        """Persist a queued outbound message until it is acknowledged"""
+        try:
+            await self.outbound_messages.insert_one(document)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to journal outbound message: {e}")
+            return False
+
+    async def acknowledge_outbound_messages(self, journal_ids: List[str]) -> int:
+        """Remove sent or dropped messages from the journal"""
+        try:
+            if not journal_ids:
+                return 0
+            result = await self.outbound_messages.delete_many({"_id": {"$in": journal_ids}})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"Failed to acknowledge outbound messages: {e}")
+            return 0
+
+    async def load_outbound_messages(self) -> List[Dict[str, Any]]:
+        """Get every unacknowledged outbound message in queue order"""
+        try:
+            cursor = self.outbound_messages.find({}).sort("queued_at", 1)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"Failed to load outbound messages: {e}")
+            return []
+
     async def cleanup_stale_sessions(self, max_age_hours: int = 24):
         """Clean up old player sessions"""
         try:
@@ -6,15 +6,19 @@ Handles full historical data parsing and refresh operations
 import asyncio
 import logging
 import stat
+import time
+from collections import deque
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import aiofiles
-import asyncssh
 import discord
 from discord.ext import commands
 
+from bot.utils.sftp_pool import get_sftp_pool
+
 from .killfeed_parser import KillfeedParser
 
 logger = logging.getLogger(__name__)
@@ -25,7 +29,8 @@ class HistoricalParser:
     - Triggered manually via /server refresh <server_id>
     - Or automatically 30s after /server add
     - Clears PvP data from that server
-    - Parses all .csv files in order
+    - Streams all .csv files in order, fetching a few concurrently
+    - Ingests kill events in bulk chunks
     - Updates a single progress embed every 30s in the invoking channel
     - Does not emit killfeed embeds
     """
@@ -34,138 +39,126 @@ class HistoricalParser:
         self.bot = bot
         self.killfeed_parser = KillfeedParser(bot)
         self.active_refreshes: Dict[str, bool] = {}  # Track active refresh operations
-
-    async def get_all_csv_files(self, server_config: Dict[str, Any]) -> List[str]:
-        """Get all CSV files for historical parsing"""
+        self.fetch_concurrency = 4  # Concurrent CSV downloads per refresh
+        self.flush_chunk_size = 5000  # Kill events per insert_many/bulk_write flush
+
+    async def stream_csv_files(self, server_config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream CSV files for historical parsing in chronological order.
+
+        Yields one dict per file with its path, mtime, size in bytes, decoded
+        lines and its index out of the total number of files. The newest file is
+        cut at its last newline: its unterminated last row (still being written)
+        is left out, and 'boundary' is the byte offset the live parser resumes at.
+        """
         try:
             if self.bot.dev_mode:
-                return await self.get_dev_csv_files()
+                async for item in self.stream_dev_csv_files():
+                    yield item
             else:
-                return await self.get_sftp_csv_files(server_config)
+                async for item in self.stream_sftp_csv_files(server_config):
+                    yield item
 
         except Exception as e:
-            logger.error(f"Failed to get CSV files: {e}")
-            return []
+            logger.error(f"Failed to stream CSV files: {e}")
+
+    def _decode_csv_lines(self, data: bytes) -> List[str]:
+        """Decode a CSV file body into its non-empty lines"""
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            # Try alternative encoding
+            text = data.decode('latin-1')
+        return [line.strip() for line in text.splitlines() if line.strip()]
+
+    async def _fetch_in_order(self, csv_files: List[Tuple[str, float, int]],
+                              fetch: Callable[[str], Awaitable[bytes]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch files concurrently but yield them in their original order.
+
+        At most fetch_concurrency downloads run at once and only a small window of
+        files is prefetched ahead of the consumer, so memory stays bounded by the
+        window rather than by the whole history.
+        """
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+
+        async def bounded_fetch(path: str) -> bytes:
+            async with semaphore:
+                return await fetch(path)
+
+        files = iter(csv_files)
+        pending = deque()
+        for csv_file in islice(files, self.fetch_concurrency * 2):
+            pending.append((csv_file, asyncio.create_task(bounded_fetch(csv_file[0]))))
+
+        index = 0
+        try:
+            while pending:
+                (filepath, mtime, size), task = pending.popleft()
+                index += 1
+                next_file = next(files, None)
+                if next_file:
+                    pending.append((next_file, asyncio.create_task(bounded_fetch(next_file[0]))))
+
+                try:
+                    data = await task
+                except FileNotFoundError:
+                    logger.warning(f"CSV file not found: {filepath}")
+                    continue
+                except PermissionError:
+                    logger.warning(f"Permission denied reading CSV file: {filepath}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to read CSV file {filepath}: {str(e)}")
+                    continue
 
-    async def get_dev_csv_files(self) -> List[str]:
-        """Get all CSV files from dev_data directory"""
+                boundary = len(data)
+                if index == len(csv_files):
+                    # Newest file, the game may still be appending to it
+                    _, boundary = self.killfeed_parser._split_csv_chunk(data)
+
+                lines = self._decode_csv_lines(data[:boundary])
+                logger.debug(f"Found {len(lines)} valid lines in {filepath}")
+                yield {
+                    'path': filepath,
+                    'mtime': mtime,
+                    'size': len(data),
+                    'boundary': boundary,
+                    'lines': lines,
+                    'index': index,
+                    'total': len(csv_files)
+                }
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def is_refreshing(self, guild_id: int, server_id: str) -> bool:
+        """Check if a historical refresh is running for a server"""
+        return self.active_refreshes.get(f"{guild_id}_{server_id}", False)
+
+    async def stream_dev_csv_files(self) -> AsyncIterator[Dict[str, Any]]:
+        """Stream all CSV files from dev_data directory"""
         try:
             csv_path = Path('./dev_data/csv')
             csv_files = list(csv_path.glob('*.csv'))
 
             if not csv_files:
                 logger.warning("No CSV files found in dev_data/csv/")
-                return []
-
-            all_lines = []
+                return
 
             # Sort files by name (assuming chronological naming)
             csv_files.sort()
 
-            for csv_file in csv_files:
-                async with aiofiles.open(csv_file, 'r') as f:
-                    content = await f.read()
-                    all_lines.extend(content.splitlines())
+            async def read_file(path: str) -> bytes:
+                async with aiofiles.open(path, 'rb') as f:
+                    return await f.read()
 
-            return all_lines
+            files = [(str(f), f.stat().st_mtime, f.stat().st_size) for f in csv_files]
+            async for item in self._fetch_in_order(files, read_file):
+                yield item
 
         except Exception as e:
             logger.error(f"Failed to read dev CSV files: {e}")
-            return []
-
-    async def get_sftp_connection(self, server_config: Dict[str, Any]) -> Optional[asyncssh.SSHClientConnection]:
-        """Get or create SFTP connection with enhanced error handling and compatibility"""
-        try:
-            import os
-
-            # Get SFTP credentials with proper fallbacks
-            server_id = str(server_config.get('_id', 'unknown'))
-            sftp_host = server_config.get('host') or server_config.get('sftp_host', '')
-            sftp_port = int(server_config.get('port') or server_config.get('sftp_port', 22))
-            sftp_username = server_config.get('username') or server_config.get('sftp_username', '')
-            sftp_password = server_config.get('password') or server_config.get('sftp_password', '')
-
-            # Log connection attempt
-            logger.info(f"Attempting SFTP connection to {sftp_host}:{sftp_port} for server {server_id}")
-
-            # Validate credentials
-            if not sftp_host:
-                logger.error(f"Missing SFTP host for server {server_id}")
-                return None
-
-            if not sftp_username or not sftp_password:
-                logger.error(f"Missing SFTP credentials for server {server_id}")
-                return None
-
-            # Enhanced connection with multiple retry attempts
-            max_retries = 3
-            for attempt in range(1, max_retries + 1):
-                try:
-                    # Configure connection options with legacy support by default
-                    options = {
-                        'username': sftp_username,
-                        'password': sftp_password,
-                        'known_hosts': None,  # Skip host key verification
-                        'client_keys': None,  # No client keys needed with password auth
-                        'preferred_auth': 'password,keyboard-interactive',
-                        'kex_algs': [
-                            'diffie-hellman-group14-sha256',
-                            'diffie-hellman-group16-sha512',
-                            'diffie-hellman-group18-sha512',
-                            'diffie-hellman-group14-sha1',
-                            'diffie-hellman-group1-sha1',
-                            'diffie-hellman-group-exchange-sha256',
-                            'diffie-hellman-group-exchange-sha1'
-                        ],
-                        'encryption_algs': [
-                            'aes256-ctr', 'aes192-ctr', 'aes128-ctr',
-                            'aes256-cbc', 'aes192-cbc', 'aes128-cbc',
-                            '3des-cbc', 'blowfish-cbc'
-                        ],
-                        'mac_algs': [
-                            'hmac-sha2-256', 'hmac-sha2-512',
-                            'hmac-sha1'
-                        ]
-                    }
-
-                    # Establish connection with timeout
-                    logger.debug(f"Connection attempt {attempt}/{max_retries} to {sftp_host}:{sftp_port}")
-                    conn = await asyncio.wait_for(
-                        asyncssh.connect(sftp_host, port=sftp_port, **options),
-                        timeout=45  # Overall operation timeout
-                    )
-
-                    logger.info(f"Successfully connected to SFTP server {sftp_host} for server {server_id}")
-                    return conn
-
-                except asyncio.TimeoutError:
-                    logger.warning(f"SFTP connection timed out (attempt {attempt}/{max_retries})")
-                except asyncssh.DisconnectError as e:
-                    logger.warning(f"SFTP server disconnected: {e} (attempt {attempt}/{max_retries})")
-                except Exception as e:
-                    if 'auth' in str(e).lower():
-                        logger.error(f"SFTP authentication failed with provided credentials")
-                        # No point retrying with same credentials
-                        return None
-                    else:
-                        logger.warning(f"SFTP connection error: {e} (attempt {attempt}/{max_retries})")
-                except asyncssh.Error as e:
-                    logger.warning(f"SFTP connection error: {e} (attempt {attempt}/{max_retries})")
-                except Exception as e:
-                    logger.warning(f"Unexpected error connecting to SFTP: {str(e)} (attempt {attempt}/{max_retries})")
-
-                # Apply exponential backoff between retries
-                if attempt < max_retries:
-                    delay = 2 ** attempt  # 2, 4, 8 seconds
-                    logger.debug(f"Retrying in {delay} seconds...")
-                    await asyncio.sleep(delay)
-
-            logger.error(f"Failed to connect to SFTP server after {max_retries} attempts")
-            return None
-
-        except Exception as e:
-            logger.error(f"Failed to get SFTP connection: {e}")
-            return None
 
     async def clear_previous_data(self, guild_id: int, server_id: str):
         """Clear previous entries and reset tracking before historical parsing"""
@@ -173,33 +166,27 @@ class HistoricalParser:
             # Clear all PvP data for this server
             await self.bot.db_manager.clear_server_pvp_data(guild_id, server_id)
 
-            # Reset killfeed parser tracking for this server
-            server_key = f"{guild_id}_{server_id}"
-            if server_key in self.killfeed_parser.parsed_lines:
-                self.killfeed_parser.parsed_lines[server_key] = set()
-            if server_key in self.killfeed_parser.last_file_position:
-                self.killfeed_parser.last_file_position[server_key] = 0
+            # Reset the persisted killfeed cursor for this server (on the live parser when running)
+            live_parser = getattr(self.bot, 'killfeed_parser', None) or self.killfeed_parser
+            await live_parser.reset_file_cursor(guild_id, server_id)
 
-            logger.info(f"Cleared previous data and reset line tracking for server {server_id}")
+            logger.info(f"Cleared previous data and reset killfeed cursor for server {server_id}")
 
         except Exception as e:
             logger.error(f"Failed to clear previous data for server {server_id}: {e}")
 
-    async def get_sftp_csv_files(self, server_config: Dict[str, Any]) -> List[str]:
-        """Get all CSV files from SFTP server for historical parsing using AsyncSSH"""
+    async def stream_sftp_csv_files(self, server_config: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream all CSV files from SFTP server for historical parsing over the shared pooled client"""
         try:
-            conn = await self.get_sftp_connection(server_config)
-            if not conn:
-                return []
-
             server_id = str(server_config.get('_id', 'unknown'))
             sftp_host = server_config.get('host')
             # Use consistent path pattern with _id (same as killfeed parser)
             remote_path = f"./{sftp_host}_{server_id}/actual1/deathlogs/"
 
-            all_lines = []
+            async with get_sftp_pool().sftp_session(server_config) as sftp:
+                if not sftp:
+                    return
 
-            async with conn.start_sftp_client() as sftp:
                 # Enhanced recursive file discovery with robust error handling
                 csv_files = []
 
@@ -216,13 +203,13 @@ class HistoricalParser:
                             stat_result = await sftp.stat(path)
                             mtime = getattr(stat_result, 'mtime', datetime.now().timestamp())
                             filename = path.split('/')[-1]
-                            
+
                             if filename not in unique_files or mtime > unique_files[filename][1]:
-                                unique_files[filename] = (path, mtime)
+                                unique_files[filename] = (path, mtime, stat_result.size or 0)
                                 logger.debug(f"Found CSV file: {path}")
                         except Exception as e:
                             logger.warning(f"Error processing CSV file {path}: {e}")
-                            
+
                     # Convert to list
                     csv_files = list(unique_files.values())
                 except Exception as e:
@@ -230,62 +217,22 @@ class HistoricalParser:
 
                 if not csv_files:
                     logger.warning(f"No CSV files found in {remote_path}")
-                    return []
+                    return
 
                 # Sort by modification time (chronological order for historical parser)
                 csv_files.sort(key=lambda x: x[1])
+                logger.info(f"Streaming {len(csv_files)} CSV files in chronological order "
+                            f"({self.fetch_concurrency} concurrent downloads)")
+
+                async def read_file(path: str) -> bytes:
+                    async with sftp.open(path, 'rb') as f:
+                        return await f.read()
 
-                # Download and read all files with improved robust handling
-                logger.info(f"Processing {len(csv_files)} CSV files in chronological order")
-                for filepath, timestamp in csv_files:
-                    try:
-                        # Log file processing start with timestamp
-                        readable_time = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                        logger.debug(f"Processing file {filepath} (modified: {readable_time})")
-
-                        # Use chunked reading for large files to prevent memory issues
-                        buffer_size = 1024 * 1024  # 1MB buffer
-                        file_content = ""
-
-                        async with sftp.open(filepath, 'r') as f:
-                            while True:
-                                chunk = await f.read(buffer_size)
-                                if not chunk:
-                                    break
-
-                                # Handle binary data if needed
-                                if isinstance(chunk, bytes):
-                                    try:
-                                        chunk = chunk.decode('utf-8')
-                                    except UnicodeDecodeError:
-                                        try:
-                                            # Try alternative encoding
-                                            chunk = chunk.decode('latin-1')
-                                        except Exception:
-                                            logger.warning(f"Failed to decode content in {filepath}")
-                                            continue
-
-                                file_content += chunk
-
-                        # Process file content line by line
-                        valid_lines = [line.strip() for line in file_content.splitlines() if line.strip()]
-                        logger.debug(f"Found {len(valid_lines)} valid lines in {filepath}")
-                        all_lines.extend(valid_lines)
-
-                    except FileNotFoundError:
-                        logger.warning(f"CSV file not found: {filepath}")
-                    except PermissionError:
-                        logger.warning(f"Permission denied reading CSV file: {filepath}")
-                    except Exception as e:
-                        logger.error(f"Failed to read CSV file {filepath}: {str(e)}")
-
-                logger.info(f"Successfully processed {len(all_lines)} total log lines from {len(csv_files)} files")
-
-                return all_lines
+                async for item in self._fetch_in_order(csv_files, read_file):
+                    yield item
 
         except Exception as e:
             logger.error(f"Failed to fetch SFTP files for historical parsing: {e}")
-            return []
 
     async def clear_server_data(self, guild_id: int, server_id: str):
         """Clear all PvP data for a server before historical refresh"""
@@ -302,6 +249,8 @@ class HistoricalParser:
                 "server_id": server_id
             })
 
+            self.bot.db_manager.mark_leaderboard_dirty(guild_id, server_id)
+
             logger.info(f"Cleared PvP data for server {server_id} in guild {guild_id}")
 
         except Exception as e:
@@ -309,12 +258,14 @@ class HistoricalParser:
 
     async def update_progress_embed(self, channel: Optional[discord.TextChannel], 
                                    embed_message: discord.Message,
-                                   current: int, total: int, server_id: str):
+                                   current: int, total: int, server_id: str,
+                                   lines_processed: int = 0, lines_per_second: float = 0.0):
         """Update progress embed every 30 seconds - FIXED INTEGRATION ERROR"""
         try:
             # Safety check - if no channel is provided, just log progress
             if not channel:
-                logger.info(f"Progress update for server {server_id}: {current}/{total} events ({(current/total*100) if total > 0 else 0:.1f}%)")
+                logger.info(f"Progress update for server {server_id}: {current}/{total} files ({(current/total*100) if total > 0 else 0:.1f}%), "
+                            f"{lines_processed:,} lines at {lines_per_second:,.0f} lines/s")
                 return
 
             progress_percent = (current / total * 100) if total > 0 else 0
@@ -331,10 +282,16 @@ class HistoricalParser:
 
             embed.add_field(
                 name="Progress",
-                value=f"```{progress_bar}```\n{current:,} / {total:,} events ({progress_percent:.1f}%)",
+                value=f"```{progress_bar}```\n{current:,} / {total:,} files ({progress_percent:.1f}%)",
                 inline=False
             )
 
+            embed.add_field(
+                name="Throughput",
+                value=f"{lines_processed:,} lines • {lines_per_second:,.0f} lines/s",
+                inline=True
+            )
+
             embed.add_field(
                 name="Status",
                 value="🔄 Processing historical kill events...",
@@ -396,7 +353,7 @@ class HistoricalParser:
         """Refresh historical data for a server"""
         refresh_key = ""
         try:
-            server_id = server_config.get('server_id', 'unknown')
+            server_id = str(server_config.get('_id', server_config.get('server_id', 'unknown')))
             refresh_key = f"{guild_id}_{server_id}"
 
             # Check if refresh is already running
@@ -424,80 +381,78 @@ class HistoricalParser:
             # Clear existing data
             await self.clear_server_data(guild_id, server_id)
 
-            # Get all CSV files
-            lines = await self.get_all_csv_files(server_config)
-
-            if not lines:
-                logger.warning(f"No historical data found for server {server_id}")
-                self.active_refreshes[refresh_key] = False
-                return False
-
-            total_lines = len(lines)
             processed_count = 0
+            lines_processed = 0
+            files_seen = 0
+            last_file = None
+            pending_events: List[Dict[str, Any]] = []
+            refresh_started = time.monotonic()
             last_update_time = datetime.now()
 
-            # Process each line
-            for i, line in enumerate(lines):
-                if not line.strip():
-                    continue
+            # Stream files as they are fetched and flush kill events in bulk chunks
+            async for csv_file in self.stream_csv_files(server_config):
+                files_seen += 1
+                last_file = csv_file
 
-                # Parse kill event (but don't send embeds)
-                kill_data = await self.killfeed_parser.parse_csv_line(line)
-                if kill_data:
-                    # Add to database without sending embeds
-                    await self.bot.db_manager.add_kill_event(guild_id, server_id, kill_data)
+                for line in csv_file['lines']:
+                    lines_processed += 1
+
+                    # Parse kill event (but don't send embeds)
+                    kill_data = await self.killfeed_parser.parse_csv_line(line)
+                    if not kill_data:
+                        continue
 
-                    # Update stats using proper MongoDB update syntax
                     # Skip entries with null/empty player names
                     if not kill_data['killer'] or not kill_data['victim']:
                         logger.warning(f"Skipping entry with null player name: {kill_data}")
                         continue
 
-                    if not kill_data['is_suicide']:
-                        # Update killer stats atomically
-                        await self.bot.db_manager.pvp_data.update_one(
-                            {
-                                "guild_id": guild_id,
-                                "server_id": server_id,
-                                "player_name": kill_data['killer']
-                            },
-                            {
-                                "$inc": {"kills": 1},
-                                "$setOnInsert": {"deaths": 0, "suicides": 0}
-                            },
-                            upsert=True
-                        )
-
-                    # Update victim stats atomically
-                    update_field = "suicides" if kill_data['is_suicide'] else "deaths"
-                    await self.bot.db_manager.pvp_data.update_one(
-                        {
-                            "guild_id": guild_id,
-                            "server_id": server_id,
-                            "player_name": kill_data['victim']
-                        },
-                        {
-                            "$inc": {update_field: 1},
-                            "$setOnInsert": {"kills": 0}
-                        },
-                        upsert=True
-                    )
-
-                    processed_count += 1
+                    pending_events.append(kill_data)
+                    if len(pending_events) >= self.flush_chunk_size:
+                        processed_count += len(await self.bot.db_manager.ingest_kill_events(guild_id, server_id, pending_events))
+                        pending_events = []
 
                 # Update progress embed every 30 seconds
                 current_time = datetime.now()
                 if embed_message and (current_time - last_update_time).total_seconds() >= 30:
-                    await self.update_progress_embed(channel, embed_message, i + 1, total_lines, server_id)
+                    elapsed = max(time.monotonic() - refresh_started, 0.001)
+                    await self.update_progress_embed(
+                        channel, embed_message, csv_file['index'], csv_file['total'], server_id,
+                        lines_processed, lines_processed / elapsed
+                    )
                     last_update_time = current_time
 
+            if pending_events:
+                processed_count += len(await self.bot.db_manager.ingest_kill_events(guild_id, server_id, pending_events))
+
+            if not files_seen:
+                logger.warning(f"No historical data found for server {server_id}")
+                self.active_refreshes[refresh_key] = False
+                return False
+
+            # Hand the live killfeed over at the last complete row the refresh read
+            if last_file:
+                live_parser = getattr(self.bot, 'killfeed_parser', None) or self.killfeed_parser
+                live_cursor = await live_parser.get_file_cursor(guild_id, server_id)
+                if (live_cursor.get('file_path') == last_file['path']
+                        and live_cursor.get('byte_offset', 0) >= last_file['boundary']):
+                    logger.debug(f"Live killfeed cursor already at byte {live_cursor['byte_offset']} of {last_file['path']}, keeping it")
+                else:
+                    await live_parser.save_file_cursor(guild_id, server_id, {
+                        'file_path': last_file['path'],
+                        'byte_offset': last_file['boundary'],
+                        'file_size': last_file['size'],
+                        'file_mtime': last_file['mtime']
+                    })
+
             # Complete the refresh
             duration = (datetime.now() - start_time).total_seconds()
 
             if embed_message:
                 await self.complete_progress_embed(embed_message, server_id, processed_count, duration)
 
-            logger.info(f"Historical refresh completed for server {server_id}: {processed_count} events in {duration:.1f}s")
+            logger.info(f"Historical refresh completed for server {server_id}: {processed_count} events in {duration:.1f}s "
+                        f"({lines_processed / max(duration, 0.001):,.0f} lines/s)")
 
             self.active_refreshes[refresh_key] = False
             return True
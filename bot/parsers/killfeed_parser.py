@@ -3,21 +3,23 @@ Emerald's Killfeed - Killfeed Parser (PHASE 2)
 Parses CSV files for kill events and generates embeds
 """
 
-import asyncio
+import functools
 import logging
 import os
 import csv
 import hashlib
-import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import aiofiles
 import discord
-import asyncssh
 from discord.ext import commands
 
+from bot.utils.server_scheduler import ServerTaskScheduler, server_job
+from bot.utils.sftp_pool import get_sftp_pool
+from bot.utils.timestamp_parser import parse_deadside_timestamp
+
 logger = logging.getLogger(__name__)
 
 class KillfeedParser:
@@ -25,19 +27,19 @@ class KillfeedParser:
     KILLFEED PARSER (FREE)
     - Runs every 300 seconds
     - SFTP path: ./{host}_{serverID}/actual1/deathlogs/*/*.csv
-    - Loads most recent file only
-    - Tracks and skips previously parsed lines
+    - Tails the most recent file from a persisted per-server byte cursor
     - Suicides normalized (killer == victim, Suicide_by_relocation → Menu Suicide)
     - Emits killfeed embeds with distance, weapon, styled headers
     """
 
     def __init__(self, bot):
         self.bot = bot
-        self.parsed_lines: Dict[str, Set[str]] = {}  # Track parsed lines per server
-        self.last_file_position: Dict[str, int] = {}  # Track file position per server
-        self.sftp_pool: Dict[str, Dict[str, Any]] = {}  # SFTP connection pool with metadata
-        self.pool_cleanup_timeout = 300  # 5 minutes idle timeout
-        self.connection_health_checks: Dict[str, float] = {}  # Last health check times
+        self.file_cursors: Dict[str, Dict[str, Any]] = {}  # Persisted file/byte cursor per server
+
+        # Per-server jobs run concurrently, bounded globally and per SFTP host
+        self.server_scheduler = ServerTaskScheduler(
+            "Killfeed parser", max_concurrency=8, per_host_limit=2, server_timeout=240
+        )
 
     async def parse_csv_line(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse a single CSV line into kill event data"""
@@ -57,19 +59,11 @@ class KillfeedParser:
             killer = killer.strip()
             victim = victim.strip()
 
-            # Parse timestamp - handle multiple formats
-            try:
-                # Try format: 2025.04.30-00.16.49
-                timestamp = datetime.strptime(timestamp_str, '%Y.%m.%d-%H.%M.%S')
-                timestamp = timestamp.replace(tzinfo=timezone.utc)
-            except ValueError:
-                try:
-                    # Try format: 2025-04-30 00:16:49
-                    timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                    timestamp = timestamp.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    # Fallback to current time
-                    timestamp = datetime.utcnow().replace(tzinfo=timezone.utc)
+            # Parse timestamp - 2025.04.30-00.16.49 or 2025-04-30 00:16:49
+            timestamp = parse_deadside_timestamp(timestamp_str)
+            if timestamp is None:
+                # Fallback to current time
+                timestamp = datetime.utcnow().replace(tzinfo=timezone.utc)
 
             # Normalize suicide events
             is_suicide = killer == victim or weapon.lower() == 'suicide_by_relocation'
@@ -109,115 +103,20 @@ class KillfeedParser:
             logger.error(f"Failed to parse CSV line '{line}': {e}")
             return None
 
-    async def get_sftp_connection(self, server_config: Dict[str, Any]) -> Optional[asyncssh.SSHClientConnection]:
-        """Get or create SFTP connection with health checks and pooling"""
+    async def get_sftp_csv_files(self, server_config: Dict[str, Any],
+                                 cursor: Dict[str, Any]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """Get CSV rows appended since the cursor over the shared pooled SFTP client"""
         try:
-            sftp_host = server_config.get('host')
-            sftp_port = server_config.get('port', 22)
-            sftp_username = server_config.get('username')
-            sftp_password = server_config.get('password')
-
-            if not all([sftp_host, sftp_username, sftp_password]):
-                logger.warning(f"SFTP credentials not configured for server {server_config.get('_id', 'unknown')}")
-                return None
-
-            pool_key = f"{sftp_host}:{sftp_port}:{sftp_username}"
-            current_time = time.time()
-
-            # Check if connection exists and health check
-            if pool_key in self.sftp_pool:
-                pool_entry = self.sftp_pool[pool_key]
-                conn = pool_entry['connection']
-                last_used = pool_entry.get('last_used', 0)
-
-                # Check if connection is stale (> 5 minutes unused)
-                if current_time - last_used > 300:
-                    try:
-                        if not conn.is_closed():
-                            conn.close()
-                    except Exception:
-                        pass
-                    del self.sftp_pool[pool_key]
-                else:
-                    # Health check every 60 seconds
-                    last_health_check = self.connection_health_checks.get(pool_key, 0)
-                    if current_time - last_health_check > 60:
-                        try:
-                            if not conn.is_closed():
-                                # Simple health check - try to get server version
-                                await asyncio.wait_for(conn.get_server_version(), timeout=5)
-                                self.connection_health_checks[pool_key] = current_time
-                                pool_entry['last_used'] = current_time
-                                return conn
-                        except Exception:
-                            pass
-                        # Health check failed, remove connection
-                        try:
-                            if not conn.is_closed():
-                                conn.close()
-                        except Exception:
-                            pass
-                        del self.sftp_pool[pool_key]
-                        if pool_key in self.connection_health_checks:
-                            del self.connection_health_checks[pool_key]
-                    else:
-                        # Recent health check passed
-                        pool_entry['last_used'] = current_time
-                        return conn
-
-            # Create new connection with retry/backoff
-            for attempt in range(3):
-                try:
-                    conn = await asyncio.wait_for(
-                        asyncssh.connect(
-                            sftp_host, 
-                            username=sftp_username, 
-                            password=sftp_password, 
-                            port=sftp_port, 
-                            known_hosts=None,
-                            server_host_key_algs=['ssh-rsa', 'rsa-sha2-256', 'rsa-sha2-512'],
-                            kex_algs=['diffie-hellman-group14-sha256', 'diffie-hellman-group16-sha512', 'ecdh-sha2-nistp256', 'ecdh-sha2-nistp384', 'ecdh-sha2-nistp521'],
-                            encryption_algs=['aes128-ctr', 'aes192-ctr', 'aes256-ctr', 'aes128-gcm@openssh.com', 'aes256-gcm@openssh.com'],
-                            mac_algs=['hmac-sha2-256', 'hmac-sha2-512', 'hmac-sha1']
-                        ),
-                        timeout=30
-                    )
-                    self.sftp_pool[pool_key] = {
-                        'connection': conn,
-                        'last_used': current_time,
-                        'created_at': current_time
-                    }
-                    self.connection_health_checks[pool_key] = current_time
-                    logger.info(f"Created SFTP connection to {sftp_host}")
-                    return conn
-
-                except (asyncio.TimeoutError, asyncssh.Error) as e:
-                    # Sanitize error message to prevent credential exposure
-                    safe_error = str(e).replace(sftp_password, "***").replace(sftp_username, "***")
-                    logger.warning(f"SFTP connection attempt {attempt + 1} failed: {safe_error}")
-                    if attempt < 2:
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Failed to get SFTP connection: {e}")
-            return None
-
-    async def get_sftp_csv_files(self, server_config: Dict[str, Any]) -> List[str]:
-        """Get CSV files from SFTP server using AsyncSSH with connection pooling"""
-        try:
-            conn = await self.get_sftp_connection(server_config)
-            if not conn:
-                return []
-
             server_id = str(server_config.get('_id', 'unknown'))
             sftp_host = server_config.get('host')
             # Fix directory resolution logic to correctly combine host and _id into path
             remote_path = f"./{sftp_host}_{server_id}/actual1/deathlogs/"
             logger.info(f"Using SFTP CSV path: {remote_path} for server {server_id} on host {sftp_host}")
 
-            async with conn.start_sftp_client() as sftp:
+            async with get_sftp_pool().sftp_session(server_config) as sftp:
+                if not sftp:
+                    return [], None
+
                 csv_files = []
                 # Use consistent path pattern
                 pattern = f"./{sftp_host}_{server_id}/actual1/deathlogs/**/*.csv"
@@ -233,7 +132,7 @@ class KillfeedParser:
                             try:
                                 stat_result = await sftp.stat(path)
                                 mtime = getattr(stat_result, 'mtime', datetime.now().timestamp())
-                                csv_files.append((path, mtime))
+                                csv_files.append((path, mtime, stat_result.size or 0))
                                 seen_paths.add(path)
                                 logger.debug(f"Found CSV file: {path}")
                             except Exception as e:
@@ -243,83 +142,164 @@ class KillfeedParser:
 
                 if not csv_files:
                     logger.warning(f"No CSV files found in {remote_path}")
-                    return []
+                    return [], None
 
-                # Sort by modification time, get most recent
-                csv_files.sort(key=lambda x: x[1], reverse=True)
-                most_recent_file = csv_files[0][0]
+                # Sort by modification time, oldest first
+                csv_files.sort(key=lambda x: x[1])
+
+                async def read_range(path: str, offset: int, length: int) -> bytes:
+                    async with sftp.open(path, 'rb') as f:
+                        return await f.read(length, offset)
 
-                # Read file content
                 try:
-                    async with sftp.open(most_recent_file, 'r') as f:
-                        file_content = await f.read()
-                        return [line.strip() for line in file_content.splitlines() if line.strip()]
+                    return await self._tail_csv_files(csv_files, cursor, read_range)
                 except Exception as e:
-                    logger.error(f"Failed to read CSV file {most_recent_file}: {e}")
-                    return []
+                    logger.error(f"Failed to read CSV file {csv_files[-1][0]}: {e}")
+                    return [], None
 
         except Exception as e:
             logger.error(f"Failed to fetch SFTP CSV files: {e}")
-            return []
+            return [], None
 
-    async def get_dev_csv_files(self) -> List[str]:
-        """Get CSV files from attached_assets and dev_data directories for testing"""
+    async def get_dev_csv_files(self, cursor: Dict[str, Any]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """Get CSV rows appended since the cursor from attached_assets and dev_data directories for testing"""
         try:
             # Check attached_assets first
             attached_csv = Path('./attached_assets/2025.04.30-00.00.00.csv')
             if attached_csv.exists():
-                async with aiofiles.open(attached_csv, 'r') as f:
-                    content = await f.read()
-                    return [line.strip() for line in content.splitlines() if line.strip()]
-
-            # Fallback to dev_data
-            csv_path = Path('./dev_data/csv')
-            if csv_path.exists():
-                csv_files = list(csv_path.glob('*.csv'))
-                if csv_files:
-                    most_recent = max(csv_files, key=lambda f: f.stat().st_mtime)
-                    async with aiofiles.open(most_recent, 'r') as f:
-                        content = await f.read()
-                        return [line.strip() for line in content.splitlines() if line.strip()]
-
-            logger.warning("No CSV files found in attached_assets or dev_data/csv/")
-            return []
+                csv_paths = [attached_csv]
+            else:
+                # Fallback to dev_data
+                csv_path = Path('./dev_data/csv')
+                csv_paths = list(csv_path.glob('*.csv')) if csv_path.exists() else []
+
+            if not csv_paths:
+                logger.warning("No CSV files found in attached_assets or dev_data/csv/")
+                return [], None
+
+            csv_files = []
+            for path in csv_paths:
+                stat_result = path.stat()
+                csv_files.append((str(path), stat_result.st_mtime, stat_result.st_size))
+            csv_files.sort(key=lambda x: x[1])
+
+            async def read_range(path: str, offset: int, length: int) -> bytes:
+                async with aiofiles.open(path, 'rb') as f:
+                    await f.seek(offset)
+                    return await f.read(length)
+
+            return await self._tail_csv_files(csv_files, cursor, read_range)
 
         except Exception as e:
             logger.error(f"Failed to read dev CSV files: {e}")
-            return []
+            return [], None
+
+    def _split_csv_chunk(self, data: bytes, final: bool = False) -> Tuple[List[str], int]:
+        """Split a raw CSV byte range into lines, holding back an unterminated last row
+
+        Returns the non-empty lines and the number of bytes consumed. When final is
+        set (the file has been superseded) the trailing row is consumed as well.
+        """
+        end = len(data) if final else data.rfind(b'\n') + 1
+        if end <= 0:
+            return [], 0
+
+        text = data[:end].decode('utf-8', errors='replace')
+        return [line.strip() for line in text.splitlines() if line.strip()], end
+
+    async def _tail_csv_files(self, csv_files: List[Tuple[str, float, int]], cursor: Dict[str, Any],
+                              read_range: Callable[[str, int, int], Awaitable[bytes]]) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Read the rows appended since the cursor across the killfeed CSV files.
+
+        Args:
+            csv_files: (path, mtime, size) for every CSV, oldest first
+            cursor: Persisted cursor with file_path and byte_offset
+            read_range: Coroutine reading (path, offset, length) -> bytes
+
+        Returns:
+            Tuple of new lines and the cursor to persist
+        """
+        newest_path, newest_mtime, newest_size = csv_files[-1]
+        lines: List[str] = []
+
+        if not cursor.get('file_path'):
+            # No cursor yet - history belongs to the historical parser, start at the live edge
+            logger.info(f"No killfeed cursor for {newest_path}, starting at end of file ({newest_size} bytes)")
+            return lines, {
+                'file_path': newest_path,
+                'byte_offset': newest_size,
+                'file_size': newest_size,
+                'file_mtime': newest_mtime
+            }
 
-    async def process_kill_event(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]):
-        """Process a kill event and update database with proper streak and distance tracking"""
-        try:
-            # Add kill event to database
-            await self.bot.db_manager.add_kill_event(guild_id, server_id, kill_data)
+        offset = cursor.get('byte_offset', 0)
 
-            if kill_data['is_suicide']:
-                # Handle suicide - reset streak and increment suicide count
-                logger.debug(f"Processing suicide for {kill_data['victim']} in server {server_id}")
+        if cursor['file_path'] != newest_path:
+            # New CSVs were started - drain what is left of the cursor's file, then
+            # every file started after it, before tailing the newest one
+            position = next((i for i, f in enumerate(csv_files) if f[0] == cursor['file_path']), None)
+            if position is not None:
+                superseded = [(csv_files[position], offset)]
+                superseded += [(f, 0) for f in csv_files[position + 1:-1]]
+            else:
+                # The cursor's file is gone, read whatever was started after it
+                cursor_mtime = cursor.get('file_mtime')
+                superseded = [(f, 0) for f in csv_files[:-1] if cursor_mtime is not None and f[1] > cursor_mtime]
+                logger.warning(f"Killfeed cursor file {cursor['file_path']} no longer listed, "
+                               f"reading {len(superseded)} newer files in full")
+
+            for (path, _, size), start in superseded:
+                if size > start:
+                    data = await read_range(path, start, size - start)
+                    drained, _ = self._split_csv_chunk(data, final=True)
+                    lines.extend(drained)
+                    logger.debug(f"Drained {len(drained)} rows from superseded file {path}")
+            offset = 0
+        elif newest_size < offset:
+            logger.warning(f"Killfeed file {newest_path} shrank below cursor ({newest_size} < {offset}), rereading")
+            offset = 0
+
+        if newest_size > offset:
+            data = await read_range(newest_path, offset, newest_size - offset)
+            new_lines, consumed = self._split_csv_chunk(data)
+            lines.extend(new_lines)
+            offset += consumed
+
+        return lines, {
+            'file_path': newest_path,
+            'byte_offset': offset,
+            'file_size': newest_size,
+            'file_mtime': newest_mtime
+        }
+
+    async def get_file_cursor(self, guild_id: int, server_id: str) -> Dict[str, Any]:
+        """Get the persisted killfeed cursor for a server"""
+        server_key = f"{guild_id}_{server_id}"
+        if server_key not in self.file_cursors:
+            state = await self.bot.db_manager.get_parser_state(guild_id, server_id, "killfeed_parser")
+            self.file_cursors[server_key] = {
+                key: state[key] for key in ('file_path', 'byte_offset', 'file_size', 'file_mtime') if key in state
+            }
+        return self.file_cursors[server_key]
 
-                # Reset victim's current streak to 0 and increment suicides
-                await self.bot.db_manager.update_pvp_stats(
-                    guild_id, server_id, kill_data['victim'],
-                    {"suicides": 1}
-                )
-                # Reset streak separately
-                await self.bot.db_manager.reset_player_streak(guild_id, server_id, kill_data['victim'])
+    async def save_file_cursor(self, guild_id: int, server_id: str, cursor: Dict[str, Any]):
+        """Persist the killfeed cursor for a server"""
+        self.file_cursors[f"{guild_id}_{server_id}"] = cursor
+        await self.bot.db_manager.save_parser_state(guild_id, server_id, dict(cursor), "killfeed_parser")
 
-            else:
-                # Handle actual PvP kill - proper streak and distance tracking
-                logger.info(f"Processing kill: {kill_data['killer']} -> {kill_data['victim']} in server {server_id}")
+    async def reset_file_cursor(self, guild_id: int, server_id: str):
+        """Forget the killfeed cursor so the next run restarts at the live edge"""
+        self.file_cursors.pop(f"{guild_id}_{server_id}", None)
+        await self.bot.db_manager.delete_parser_state(guild_id, server_id, "killfeed_parser")
 
-                # Update killer: increment kills and streak
-                await self.bot.db_manager.increment_player_kill(
-                    guild_id, server_id, kill_data.get('distance', 0)
-                )
+    async def process_kill_event(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]):
+        """Process a single kill event and update database with proper streak and distance tracking"""
+        try:
+            if not await self.bot.db_manager.ingest_kill_events(guild_id, server_id, [kill_data]):
+                return  # Already stored and posted
 
-                # Update victim: increment deaths and reset streak
-                await self.bot.db_manager.increment_player_death(
-                    guild_id, server_id, kill_data['victim']
-                )
+            await self.check_bounties(guild_id, [kill_data])
 
             # Send killfeed embed using EmbedFactory
             await self.send_killfeed_embed(guild_id, server_id, kill_data)
@@ -327,6 +307,24 @@ class KillfeedParser:
         except Exception as e:
             logger.error(f"Failed to process kill event: {e}")
 
+    async def check_bounties(self, guild_id: int, kill_events: List[Dict[str, Any]]):
+        """Claim bounties on kill victims, only kills matching the in-memory bounty index reach the database"""
+        try:
+            bounties_cog = None
+            for kill_data in kill_events:
+                if kill_data.get('is_suicide'):
+                    continue
+                if not self.bot.db_manager.match_active_bounties(guild_id, kill_data['victim']):
+                    continue
+
+                bounties_cog = bounties_cog or self.bot.get_cog('Bounties')
+                if not bounties_cog:
+                    return
+                await bounties_cog.check_bounty_claims(guild_id, kill_data['killer'], kill_data['victim'])
+
+        except Exception as e:
+            logger.error(f"Failed to check bounties: {e}")
+
     async def send_killfeed_embed(self, guild_id: int, server_id: str, kill_data: Dict[str, Any]):
         """Send killfeed embed to designated channel using themed EmbedFactory"""
         try:
@@ -419,71 +417,79 @@ class KillfeedParser:
         except Exception as e:
             logger.error(f"Failed to send killfeed embed: {e}")
 
-    async def parse_server_killfeed(self, guild_id: int, server_config: Dict[str, Any]):
-        """Parse killfeed for a single server"""
+    async def parse_server_killfeed(self, guild_id: int, server_config: Dict[str, Any]) -> int:
+        """Parse killfeed for a single server, returning the number of new events"""
         try:
             server_id = str(server_config.get('_id', 'unknown'))
             server_name = server_config.get('name', f'Server {server_id}')
 
-            # Get CSV lines with source indication
+            # The historical refresh owns the server's data and hands the cursor back when done
+            historical_parser = getattr(self.bot, 'historical_parser', None)
+            if historical_parser and historical_parser.is_refreshing(guild_id, server_id):
+                logger.debug(f"⏸️ {server_name}: historical refresh running, skipping live killfeed")
+                return 0
+
+            cursor = await self.get_file_cursor(guild_id, server_id)
+
+            # Get CSV lines appended since the cursor with source indication
             if self.bot.dev_mode:
                 logger.debug(f"🛠️ DEV MODE: Reading local CSV files for {server_name}")
-                lines = await self.get_dev_csv_files()
+                lines, new_cursor = await self.get_dev_csv_files(cursor)
                 source_info = "local files"
             else:
                 host = server_config.get('host', 'unknown')
                 logger.debug(f"🚀 PROD MODE: Reading SFTP CSV files from {host} for {server_name}")
-                lines = await self.get_sftp_csv_files(server_config)
+                lines, new_cursor = await self.get_sftp_csv_files(server_config, cursor)
                 source_info = f"SFTP ({host})"
 
-            if not lines:
+            if new_cursor is None:
                 logger.warning(f"📊 No CSV data found for {server_name} from {source_info}")
-                return
-
-            # Track processed lines for this server
-            server_key = f"{guild_id}_{server_id}"
-            if server_key not in self.parsed_lines:
-                self.parsed_lines[server_key] = set()
+                return 0
 
-            # Count different event types
             new_events = 0
-            pvp_kills = 0
-            suicides = 0
-            skipped_duplicates = 0
 
-            logger.debug(f"📊 Processing {len(lines)} total lines from {source_info} for {server_name}")
+            logger.debug(f"📊 Processing {len(lines)} new lines from {source_info} for {server_name}")
 
+            kill_events = []
             for line in lines:
-                if not line.strip():
-                    continue
-
-                if line in self.parsed_lines[server_key]:
-                    skipped_duplicates += 1
-                    continue
-
                 kill_data = await self.parse_csv_line(line)
                 if kill_data:
-                    await self.process_kill_event(guild_id, server_id, kill_data)
-                    self.parsed_lines[server_key].add(line)
-                    new_events += 1
-
-                    # Track event types for better reporting
-                    if kill_data['is_suicide']:
-                        suicides += 1
-                    else:
-                        pvp_kills += 1
+                    kill_events.append(kill_data)
+
+            stored_events = []
+            if kill_events:
+                # One insert_many + one bulk_write for the whole batch. A failure raises
+                # before the cursor moves, so the same rows are read again next cycle.
+                # Rows stored by an earlier cycle whose cursor save failed
+                # are left out of stored_events, so they are not posted twice
+                stored_events = await self.bot.db_manager.ingest_kill_events(guild_id, server_id, kill_events)
+
+            # Advance the cursor only once the rows are stored
+            if new_cursor != cursor:
+                await self.save_file_cursor(guild_id, server_id, new_cursor)
+
+            if stored_events:
+                await self.check_bounties(guild_id, stored_events)
+                for kill_data in stored_events:
+                    await self.send_killfeed_embed(guild_id, server_id, kill_data)
+                new_events = len(stored_events)
+
+            # Count different event types for better reporting
+            suicides = sum(1 for kill_data in stored_events if kill_data['is_suicide'])
+            pvp_kills = new_events - suicides
 
             # Detailed logging with event breakdown
             if new_events > 0:
                 logger.info(f"✅ {server_name}: {new_events} new events ({pvp_kills} kills, {suicides} suicides)")
-                if skipped_duplicates > 0:
-                    logger.debug(f"📊 {server_name}: Skipped {skipped_duplicates} duplicate entries")
             else:
-                logger.info(f"📊 {server_name}: No new events ({len(lines)} total lines, {skipped_duplicates} already processed)")
+                logger.info(f"📊 {server_name}: No new events (cursor at byte {new_cursor['byte_offset']} of {new_cursor['file_path']})")
+
+            return new_events
 
         except Exception as e:
             server_name = server_config.get('name', f'Server {server_config.get("_id", "unknown")}')
             logger.error(f"❌ Failed to parse killfeed for {server_name}: {e}")
+            return 0
 
     async def run_killfeed_parser(self):
         """Run killfeed parser for all configured servers"""
@@ -502,8 +508,7 @@ class KillfeedParser:
                 logger.info("📊 No guilds found in database")
                 return
 
-            total_servers = 0
-            total_events = 0
+            jobs = []
 
             for guild_doc in guilds_list:
                 guild_id = guild_doc['guild_id']
@@ -514,28 +519,19 @@ class KillfeedParser:
                     logger.debug(f"📊 No servers configured for guild {guild_name}")
                     continue
 
-                logger.info(f"📡 Processing {len(servers)} servers for guild: {guild_name}")
+                logger.info(f"📡 Queueing {len(servers)} servers for guild: {guild_name}")
 
                 for server_config in servers:
-                    try:
-                        events_before = sum(len(lines) for lines in self.parsed_lines.values())
-                        await self.parse_server_killfeed(guild_id, server_config)
-                        events_after = sum(len(lines) for lines in self.parsed_lines.values())
-
-                        server_events = events_after - events_before
-                        total_events += server_events
-                        total_servers += 1
-
-                        server_name = server_config.get('name', 'Unknown')
-                        if server_events > 0:
-                            logger.info(f"✅ {server_name}: {server_events} new kill events processed")
-                        else:
-                            logger.info(f"📊 {server_name}: No new events")
-
-                    except Exception as e:
-                        server_name = server_config.get('name', 'Unknown')
-                        logger.error(f"❌ Failed to parse {server_name}: {e}")
-                        continue
+                    jobs.append(server_job(
+                        server_config.get('name', 'Unknown'),
+                        server_config.get('host', 'unknown'),
+                        functools.partial(self.parse_server_killfeed, guild_id, server_config)
+                    ))
+
+            # Servers run concurrently so one slow SFTP host no longer delays the rest
+            results = await self.server_scheduler.run_all(jobs)
+            total_servers = sum(1 for result in results if result['status'] == 'ok')
+            total_events = sum(result['result'] or 0 for result in results)
 
             # Final summary with mode and statistics
             logger.info(f"🎉 Killfeed parser completed in {mode} mode")
@@ -552,32 +548,12 @@ class KillfeedParser:
                 'interval',
                 seconds=300,  # 5 minutes
                 id='killfeed_parser',
-                replace_existing=True
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
             )
             logger.info("Killfeed parser scheduled (every 300 seconds)")
 
         except Exception as e:
             logger.error(f"Failed to schedule killfeed parser: {e}")
 
-    async def cleanup_sftp_connections(self):
-        """Clean up idle SFTP connections with enhanced attribute validation"""
-        try:
-            for pool_key, pool_entry in list(self.sftp_pool.items()):
-                try:
-                    conn = pool_entry.get('connection') if isinstance(pool_entry, dict) else pool_entry
-                    if hasattr(conn, 'is_closed') and conn.is_closed():
-                        del self.sftp_pool[pool_key]
-                        logger.debug(f"Cleaned up closed SFTP connection: {pool_key}")
-                    elif hasattr(conn, '_transport') and hasattr(conn._transport, 'is_closing') and conn._transport.is_closing():
-                        del self.sftp_pool[pool_key]
-                        logger.debug(f"Cleaned up closing SFTP connection: {pool_key}")
-                    elif hasattr(conn, 'is_client') and not conn.is_client():
-                        del self.sftp_pool[pool_key]
-                        logger.debug(f"Cleaned up non-client SFTP connection: {pool_key}")
-                except Exception as conn_error:
-                    # If we can't check the connection state, remove it
-                    logger.warning(f"Removing problematic SFTP connection {pool_key}: {conn_error}")
-                    if pool_key in self.sftp_pool:
-                        del self.sftp_pool[pool_key]
-        except Exception as e:
-            logger.error(f"Failed to cleanup SFTP connections: {e}")
\ No newline at end of file
@@ -1,22 +1,48 @@
 import asyncio
+import functools
 import logging
 import os
 import re
-import time
 import hashlib
+import urllib.parse
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Set, Tuple
 from pathlib import Path
 
 import discord
-import asyncssh
 from motor.motor_asyncio import AsyncIOMotorClient
 
 # Import EmbedFactory for themed messaging
 from bot.utils.embed_factory import EmbedFactory
+from bot.utils.server_scheduler import ServerTaskScheduler, server_job
+from bot.utils.asset_registry import get_asset_registry
+from bot.utils.player_presence import PlayerPresence
+from bot.utils.sftp_pool import get_sftp_pool
+from bot.utils.timestamp_parser import parse_deadside_timestamp
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1000)
+def _clean_player_name(raw_name: str, player_id: str) -> str:
+    """Decode and validate a player name from a log line (bounded LRU cache)"""
+    # Clean and decode the player name
+    try:
+        decoded_name = urllib.parse.unquote(raw_name)
+        clean_name = decoded_name.replace('+', ' ').strip()
+        final_name = clean_name if clean_name else raw_name.strip()
+    except Exception:
+        final_name = raw_name.strip()
+
+    # Validate the resolved name
+    if not final_name or len(final_name) < 2:
+        final_name = f"Player{player_id[:8].upper()}"
+
+    # Reject numeric-only names
+    if final_name.replace('.', '').replace('-', '').isdigit():
+        final_name = f"Player{player_id[:8].upper()}"
+
+    return final_name
+
 class UnifiedLogParser:
     """
     BULLETPROOF UNIFIED LOG PARSER
@@ -31,25 +57,26 @@ class UnifiedLogParser:
 
         # Bulletproof state dictionaries with proper isolation
         self.file_states: Dict[str, Dict[str, Any]] = {}
-        self.player_sessions: Dict[str, Dict[str, Any]] = {}
-        self.sftp_connections: Dict[str, asyncssh.SSHClientConnection] = {}
+        self.dirty_file_states: Set[str] = set()  # Server keys changed since the last state save
+        self.presence = PlayerPresence()  # Online/queued players per (guild, server)
         self.last_log_position: Dict[str, int] = {}
-        self.player_lifecycle: Dict[str, Dict[str, Any]] = {}
         self.server_status: Dict[str, Dict[str, Any]] = {}
         self.log_file_hashes: Dict[str, str] = {}
 
-        # Player name resolution cache
-        self.player_name_cache: Dict[str, str] = {}
-
         # Compile patterns once for efficiency
         self.patterns = self._compile_patterns()
         self.mission_mappings = self._get_mission_mappings()
 
         # Configuration parameters with memory bounds
-        self.max_cache_size = 1000  # Max entries in player_name_cache (reduced)
-        self.max_lifecycle_entries = 2000  # Max entries in player_lifecycle (reduced)
-        self.max_session_entries = 2000  # Max entries in player_sessions (reduced)
+        self.max_lifecycle_entries = 2000  # Max lifecycle entries across all servers
+        self.max_session_entries = 2000  # Max session entries across all servers
         self.cleanup_interval = 300  # Cleanup every 5 minutes
+        self.log_head_sample_size = 1024  # Leading bytes hashed to detect log rotation
+
+        # Per-server jobs run concurrently, bounded globally and per SFTP host
+        self.server_scheduler = ServerTaskScheduler(
+            "Unified log parser", max_concurrency=8, per_host_limit=2, server_timeout=150
+        )
 
         # Load state on startup
         asyncio.create_task(self._load_persistent_state())
@@ -106,9 +133,73 @@ class UnifiedLogParser:
             'trader_arrival': re.compile(r'LogSFPS:.*trader.*arrived', re.IGNORECASE),
 
             # Timestamp
-            'timestamp': re.compile(r'\[(\d{4}\.\d{2}\.\d{2}-\d{2}\.\d{2}\.\d{2}:\d{3})\]')
+            'timestamp': re.compile(r'\[(\d{4}\.\d{2}\.\d{2}-\d{2}\.\d{2}\.\d{2}:\d{3})\]'),
+
+            # Lines without a LogSFPS/LogNet/LogOnline tag only carry these two events
+            'untagged_event': re.compile(
+                r'playersmaxcount\s*(?P<sep>[=:])\s*(?P<max_players>\d+)'
+                r'|(?P<helicrash>Helicrash.*spawned.*location.*X=[\d\.-]+.*Y=[\d\.-]+)',
+                re.IGNORECASE
+            )
         }
 
+    def _classify_line(self, line: str) -> Optional[Tuple[str, re.Match]]:
+        """Classify a log line in a single pass
+
+        A plain substring check on the log category (LogSFPS:, LogNet:,
+        LogOnline:, UChannel::Close) picks the candidate event first, so each
+        line runs at most the one or two regexes that can match it.
+
+        Returns (event_type, match) or None for lines that carry no event.
+        """
+        patterns = self.patterns
+
+        if 'LogSFPS:' in line:
+            if ' Mission ' in line:
+                match = patterns['mission_state_change'].search(line)
+                if match:
+                    return 'mission', match
+            if 'NewVehicle_' in line:
+                match = patterns['vehicle_spawn'].search(line)
+                if match:
+                    return 'vehicle_spawn', match
+                match = patterns['vehicle_delete'].search(line)
+                if match:
+                    return 'vehicle_delete', match
+
+            lowered = line.lower()
+            if 'airdrop' in lowered:
+                match = patterns['airdrop_flying'].search(line)
+                if match:
+                    return 'airdrop', match
+            if 'heli' in lowered:
+                match = patterns['helicrash_event'].search(line) or patterns['helicrash_crash'].search(line)
+                if match:
+                    return 'helicrash', match
+            if 'trader' in lowered:
+                match = patterns['trader_arrival'].search(line)
+                if match:
+                    return 'trader', match
+            return None
+
+        if 'LogNet:' in line:
+            if 'Join request' in line:
+                match = patterns['player_queue_join'].search(line)
+                return ('queue', match) if match else None
+            if 'UChannel::Close' in line:
+                match = patterns['player_disconnect'].search(line)
+                return ('disconnect', match) if match else None
+            return None
+
+        if 'LogOnline:' in line:
+            match = patterns['player_registered'].search(line)
+            return ('join', match) if match else None
+
+        match = patterns['untagged_event'].search(line)
+        if match:
+            return ('helicrash', match) if match.group('helicrash') else ('max_players', match)
+        return None
+
     def _get_mission_mappings(self) -> Dict[str, str]:
         """Mission ID to readable name mappings"""
         return {
@@ -155,128 +246,128 @@ class UnifiedLogParser:
         """Determine mission difficulty level using EmbedFactory"""
         return EmbedFactory.get_mission_level(mission_id)
 
-    async def get_sftp_connection(self, server_config: Dict[str, Any]) -> Optional[asyncssh.SSHClientConnection]:
-        """
-        Get or create bulletproof SFTP connection with retry logic and connection pooling.
+    def _plan_log_read(self, file_state: Dict[str, Any], size: int, head: bytes,
+                       inode: Optional[int] = None) -> Tuple[int, bool]:
+        """Decide where to resume reading Deadside.log from
 
-        Args:
-            server_config: Dictionary containing host, port, username, password
-
-        Returns:
-            AsyncSSH connection object or None if connection fails
-
-        Raises:
-            ConnectionError: If all connection attempts fail
+        Returns (start_offset, rotated). A stored offset is only trusted when the
+        file still carries the same identity: it must not have shrunk below the
+        offset, its leading bytes must hash the same and, where the filesystem
+        exposes one, the inode must match.
         """
-        try:
-            host = server_config.get('host')
-            port = server_config.get('port', 22)
-            username = server_config.get('username')
-            password = server_config.get('password')
+        offset = file_state.get('byte_offset')
+        if offset is None or not file_state.get('cold_start_complete', False):
+            return 0, False
+
+        if size < offset:
+            logger.info(f"🔁 Log truncated ({size} < {offset} bytes) - treating as rotated")
+            return 0, True
+
+        stored_inode = file_state.get('file_inode')
+        if inode is not None and stored_inode is not None and inode != stored_inode:
+            logger.info("🔁 Log inode changed - treating as rotated")
+            return 0, True
+
+        head_length = file_state.get('head_length', 0)
+        stored_hash = file_state.get('head_hash')
+        if stored_hash and head_length:
+            if len(head) < head_length or hashlib.sha1(head[:head_length]).hexdigest() != stored_hash:
+                logger.info("🔁 Log head changed - treating as rotated")
+                return 0, True
+
+        return offset, False
+
+    def _legacy_byte_offset(self, data: bytes, line_count: int) -> int:
+        """Translate a legacy line_count state into a byte offset"""
+        offset = 0
+        for _ in range(line_count):
+            newline = data.find(b'\n', offset)
+            if newline == -1:
+                return len(data)
+            offset = newline + 1
+        return offset
+
+    def _build_log_read(self, data: bytes, start: int, size: int,
+                        head: bytes, mtime: Optional[int], inode: Optional[int],
+                        rotated: bool) -> Dict[str, Any]:
+        """Cut the read range at the last complete line and describe the new file identity"""
+        last_newline = data.rfind(b'\n')
+        complete = data[:last_newline + 1] if last_newline != -1 else b''
+        head_sample = head[:self.log_head_sample_size]
 
-            if not all([host, username, password]):
-                logger.warning(f"Missing SFTP credentials for {server_config.get('_id')}")
-                return None
-
-            # Use port from config with validation
-            if not isinstance(port, int) or port <= 0:
-                port = 22  # Default SSH port
-
-            connection_key = f"{host}:{port}:{username}"
+        return {
+            'content': complete.decode('utf-8', errors='replace'),
+            'rotated': rotated,
+            'state': {
+                'byte_offset': start + len(complete),
+                'file_size': size,
+                'file_mtime': mtime,
+                'file_inode': inode,
+                'head_length': len(head_sample),
+                'head_hash': hashlib.sha1(head_sample).hexdigest() if head_sample else None
+            }
+        }
 
-            # Check existing connection
-            if connection_key in self.sftp_connections:
-                conn = self.sftp_connections[connection_key]
-                try:
-                    if not conn.is_closed():
-                        return conn
-                    else:
-                        del self.sftp_connections[connection_key]
-                except:
-                    del self.sftp_connections[connection_key]
+    async def get_log_content(self, server_config: Dict[str, Any],
+                              file_state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the unread tail of Deadside.log with SFTP priority and local fallback.
 
-            # Create new connection with bulletproof settings
-            for attempt in range(3):
-                try:
-                    conn = await asyncio.wait_for(
-                        asyncssh.connect(
-                            host,
-                            username=username,
-                            password=password,
-                            port=port,
-                            known_hosts=None,
-                            server_host_key_algs=['ssh-rsa', 'rsa-sha2-256', 'rsa-sha2-512'],
-                            kex_algs=['diffie-hellman-group14-sha256', 'diffie-hellman-group16-sha512', 'ecdh-sha2-nistp256', 'ecdh-sha2-nistp384', 'ecdh-sha2-nistp521'],
-                            encryption_algs=['aes128-ctr', 'aes192-ctr', 'aes256-ctr', 'aes128-gcm@openssh.com', 'aes256-gcm@openssh.com'],
-                            mac_algs=['hmac-sha2-256', 'hmac-sha1']
-                        ),
-                        timeout=30
-                    )
-                    self.sftp_connections[connection_key] = conn
-                    logger.info(f"✅ SFTP connected to {host}:{port}")
-                    return conn
-
-                except asyncio.TimeoutError as e:
-                    logger.warning(f"SFTP timeout on attempt {attempt + 1} to {host}:{port}")
-                    if attempt < 2:
-                        await asyncio.sleep(2 ** attempt)
-                except asyncssh.Error as e:
-                    # Sanitize error to prevent credential exposure
-                    safe_error = str(e).replace(str(password) if password else "", "***").replace(str(username) if username else "", "***")
-                    logger.warning(f"SSH error on attempt {attempt + 1}: {safe_error}")
-                    if attempt < 2:
-                        await asyncio.sleep(2 ** attempt)
-                except ConnectionError as e:
-                    logger.warning(f"Connection error on attempt {attempt + 1} to {host}:{port}")
-                    if attempt < 2:
-                        await asyncio.sleep(2 ** attempt)
-
-            logger.error(f"❌ Failed to connect to SFTP {host}:{port}")
-            return None
+        Only the bytes appended since the stored byte_offset are transferred. The
+        file is re-read from the start when no offset is known yet or when the
+        log was truncated or replaced since the offset was recorded.
 
-        except Exception as e:
-            logger.error(f"SFTP connection error: {e}")
-            return None
+        Args:
+            server_config: Dictionary containing host, port, username, password
+            file_state: Persisted parser state for this server (byte_offset, head_hash, ...)
 
-    async def get_log_content(self, server_config: Dict[str, Any]) -> Optional[str]:
-        """Get log content with SFTP priority and local fallback"""
+        Returns:
+            Dict with 'content' (complete new lines), 'rotated' and the 'state'
+            fields to persist, or None if the log could not be read
+        """
         try:
+            file_state = file_state or {}
             server_id = str(server_config.get('_id', 'unknown'))
             host = server_config.get('host', 'unknown')
+            legacy_lines = file_state.get('line_count', 0) if 'byte_offset' not in file_state else 0
 
-            # Try SFTP first
-            conn = await self.get_sftp_connection(server_config)
-            if conn:
-                try:
-                    remote_path = f"./{host}_{server_id}/Logs/Deadside.log"
-                    logger.info(f"📡 Reading SFTP: {remote_path}")
+            # Try SFTP first, over the shared pooled client
+            try:
+                async with get_sftp_pool().sftp_session(server_config) as sftp:
+                    if sftp:
+                        remote_path = f"./{host}_{server_id}/Logs/Deadside.log"
+                        logger.info(f"📡 Reading SFTP: {remote_path}")
 
-                    async with conn.start_sftp_client() as sftp:
                         try:
-                            await sftp.stat(remote_path)
-                            async with sftp.open(remote_path, 'r') as f:
-                                content = await f.read()
-                                logger.info(f"✅ SFTP read {len(content)} bytes")
-                                return content
+                            attrs = await sftp.stat(remote_path)
+                            size = attrs.size or 0
+                            async with sftp.open(remote_path, 'rb') as f:
+                                head = await f.read(min(self.log_head_sample_size, size), 0) if size else b''
+                                start, rotated = self._plan_log_read(file_state, size, head)
+
+                                if legacy_lines and file_state.get('cold_start_complete', False):
+                                    # One-off migration from line-count state to a byte offset
+                                    data = await f.read(size, 0) if size else b''
+                                    start = self._legacy_byte_offset(data, legacy_lines)
+                                    data = data[start:]
+                                else:
+                                    data = await f.read(size - start, start) if size > start else b''
+
+                            logger.info(f"✅ SFTP read {len(data)} bytes (offset {start}/{size})")
+                            return self._build_log_read(
+                                data, start, size, head, attrs.mtime, None, rotated
+                            )
                         except FileNotFoundError:
                             logger.warning(f"Remote file not found: {remote_path}")
 
-                except Exception as e:
-                    logger.error(f"SFTP read failed: {e}")
+            except Exception as e:
+                logger.error(f"SFTP read failed: {e}")
 
             # Fallback to local file
             local_path = f'./{host}_{server_id}/Logs/Deadside.log'
             logger.info(f"📁 Fallback to local: {local_path}")
 
-            if os.path.exists(local_path):
-                try:
-                    with open(local_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        logger.info(f"✅ Local read {len(content)} bytes")
-                        return content
-                except Exception as e:
-                    logger.error(f"Local read failed: {e}")
-            else:
+            if not os.path.exists(local_path):
                 # Create test file for development
                 logger.info(f"Creating test log file at {local_path}")
                 test_dir = os.path.dirname(local_path)
@@ -287,11 +378,35 @@ class UnifiedLogParser:
 [2025.05.30-12.20.20:000] LogOnline: Warning: Player |abc123def456 successfully registered!
 [2025.05.30-12.20.30:000] LogSFPS: Mission GA_Airport_mis_01_SFPSACMission switched to IN_PROGRESS
 [2025.05.30-12.25.00:000] LogSFPS: Mission GA_Airport_mis_01_SFPSACMission switched to COMPLETED
-[2025.05.30-12.25.15:000] UChannel::Close: Sending CloseBunch UniqueId: EOS:|abc123def456"""
+[2025.05.30-12.25.15:000] UChannel::Close: Sending CloseBunch UniqueId: EOS:|abc123def456
+"""
 
                 with open(local_path, 'w', encoding='utf-8') as f:
                     f.write(test_content)
-                return test_content
+
+            try:
+                stat_result = os.stat(local_path)
+                size = stat_result.st_size
+                with open(local_path, 'rb') as f:
+                    head = f.read(self.log_head_sample_size)
+                    start, rotated = self._plan_log_read(file_state, size, head, stat_result.st_ino)
+
+                    if legacy_lines and file_state.get('cold_start_complete', False):
+                        f.seek(0)
+                        data = f.read(size)
+                        start = self._legacy_byte_offset(data, legacy_lines)
+                        data = data[start:]
+                    else:
+                        f.seek(start)
+                        data = f.read(max(size - start, 0))
+
+                logger.info(f"✅ Local read {len(data)} bytes (offset {start}/{size})")
+                return self._build_log_read(
+                    data, start, size, head,
+                    int(stat_result.st_mtime), stat_result.st_ino, rotated
+                )
+            except Exception as e:
+                logger.error(f"Local read failed: {e}")
 
             return None
 
@@ -305,100 +420,70 @@ class UnifiedLogParser:
         if not content:
             return embeds
 
-        lines = content.splitlines()
-        server_key = f"{guild_id}_{server_id}"
+        lines_to_process = content.splitlines()
 
-        # Get current state
-        file_state = self.file_states.get(server_key, {})
-        last_processed = file_state.get('line_count', 0)
-
-        # Determine what to process
-        if cold_start or last_processed == 0:
+        if cold_start:
             # Cold start: process all lines to rebuild accurate state
-            lines_to_process = lines
-            logger.info(f"🧊 Cold start: processing {len(lines)} lines to rebuild player state")
-
-            # Clear any existing sessions for this server during cold start
-            server_session_keys = [k for k in self.player_sessions.keys() if k.startswith(f"{guild_id}_")]
-            for session_key in server_session_keys:
-                session_data = self.player_sessions.get(session_key, {})
-                if session_data.get('server_id') == server_id:
-                    del self.player_sessions[session_key]
+            logger.info(f"🧊 Cold start: processing {len(lines_to_process)} lines to rebuild player state")
 
-            # Clear lifecycle data for this server
-            server_lifecycle_keys = [k for k in self.player_lifecycle.keys() if k.startswith(f"{guild_id}_")]
-            for lifecycle_key in server_lifecycle_keys:
-                del self.player_lifecycle[lifecycle_key]
+            # Clear existing sessions and lifecycle data for this server only
+            self.presence.reset_server(guild_id, server_id)
+            if hasattr(self.bot, 'session_store'):
+                self.bot.session_store.reset_server(int(guild_id), server_id)
 
             logger.info(f"🧹 Cleared existing session state for cold start")
         else:
-            # Hot start: process only new lines
-            if last_processed < len(lines):
-                lines_to_process = lines[last_processed:]
-                logger.info(f"🔥 Hot start: processing {len(lines_to_process)} new lines")
-            else:
-                logger.info("📊 No new lines to process")
-                return embeds
-
-        # Update state immediately
-        self.file_states[server_key] = {
-            'line_count': len(lines),
-            'last_updated': datetime.now(timezone.utc).isoformat(),
-            'cold_start_complete': True
-        }
-        await self._save_persistent_state()
+            # Hot start: content only holds lines appended since the last run
+            logger.info(f"🔥 Hot start: processing {len(lines_to_process)} new lines")
 
         # Track voice channel updates needed and player events for sequential processing
         voice_channel_needs_update = False
         player_events = []
+        log_events = []  # Non-player events in log order, handled after player events
         extracted_max_players = None
-        extracted_server_name = None
-
-        # Server info patterns
-        self.server_info_patterns = {
-            'start': re.compile(r'Server started\. Port: (\d+), QueryPort: (\d+)', re.IGNORECASE),
-            'map': re.compile(r'Map: (.+)', re.IGNORECASE),
-            'max_players': re.compile(r'playersmaxcount:\s*(\d+)', re.IGNORECASE),
-        }
-
-        # Extract server configuration during both cold start and hot start
-        for line in lines_to_process:
-            # Extract MaxPlayerCount
-            max_player_match = self.patterns['max_player_count'].search(line)
-            if max_player_match:
-                try:
-                    extracted_max_players = int(max_player_match.group(1))
-                    logger.info(f"📊 Extracted MaxPlayerCount: {extracted_max_players} for server {server_id}")
-                    # Store immediately when found
-                    await self._update_server_info(guild_id, server_id, extracted_max_players)
-                except ValueError:
-                    pass
 
-        # First pass: collect all player events with timestamps for sequential processing
+        # Single pass: classify every line once, collecting player events with
+        # timestamps for sequential processing
         player_event_dedup = {}  # Track events per player to prevent duplicates
 
         for line in lines_to_process:
             try:
+                classified = self._classify_line(line)
+                if not classified:
+                    continue
+
+                event_type, match = classified
+
+                if event_type == 'max_players':
+                    try:
+                        extracted_max_players = int(match.group('max_players'))
+                    except ValueError:
+                        continue
+
+                    if match.group('sep') == '=':
+                        logger.info(f"📊 Extracted MaxPlayerCount: {extracted_max_players} for server {server_id}")
+                        # Store immediately when found
+                        await self._update_server_info(guild_id, server_id, extracted_max_players)
+                    else:
+                        log_events.append(classified)
+                    continue
+
+                if event_type not in ('queue', 'join', 'disconnect'):
+                    log_events.append(classified)
+                    continue
+
                 # Extract timestamp from line for ordering
                 timestamp_match = self.patterns['timestamp'].search(line)
                 line_timestamp = timestamp_match.group(1) if timestamp_match else None
 
-                # Parse timestamp for proper ordering
-                parsed_timestamp = None
-                if line_timestamp:
-                    try:
-                        # Convert format "2025.05.30-12.20.00:000" to datetime
-                        dt_str = line_timestamp.replace('.', '-').replace(':', '.')
-                        parsed_timestamp = datetime.strptime(dt_str, "%Y-%m-%d-%H.%M.%S.%f")
-                    except:
-                        parsed_timestamp = datetime.now(timezone.utc)
-                else:
+                # Parse timestamp for proper ordering ("2025.05.30-12.20.00:000", UTC)
+                parsed_timestamp = parse_deadside_timestamp(line_timestamp) if line_timestamp else None
+                if parsed_timestamp is None:
                     parsed_timestamp = datetime.now(timezone.utc)
 
                 # Queue event - Extract EosID, Player Name, and Platform
-                queue_match = self.patterns['player_queue_join'].search(line)
-                if queue_match:
-                    groups = queue_match.groups()
+                if event_type == 'queue':
+                    groups = match.groups()
                     player_id = groups[0]
                     player_name = groups[1] if len(groups) > 1 else "Unknown"
                     platform = groups[2] if len(groups) > 2 and groups[2] else "Unknown"
@@ -408,7 +493,6 @@ class UnifiedLogParser:
                         platform = platform.split(":")[0]
 
                     # Clean and decode the player name
-                    import urllib.parse
                     try:
                         decoded_name = urllib.parse.unquote(player_name)
                         clean_name = decoded_name.replace('+', ' ').strip()
@@ -429,32 +513,14 @@ class UnifiedLogParser:
                             'line': line
                         }
 
-                # Join event - Player successfully registered
-                register_match = self.patterns['player_registered'].search(line)
-                if register_match:
-                    player_id = register_match.group(1)
-
-                    # Add join event
-                    event_key = f"join_{player_id}"
-                    if event_key not in player_event_dedup or parsed_timestamp > player_event_dedup[event_key]['timestamp']:
-                        player_event_dedup[event_key] = {
-                            'type': 'join',
-                            'player_id': player_id,
-                            'timestamp': parsed_timestamp,
-                            'line_timestamp': line_timestamp,
-                            'line': line
-                        }
-
-                # Disconnect event - Player disconnected
-                disconnect_match = self.patterns['player_disconnect'].search(line)
-                if disconnect_match:
-                    player_id = disconnect_match.group(1)
+                # Join event - Player successfully registered / Disconnect event - Player disconnected
+                else:
+                    player_id = match.group(1)
 
-                    # Add disconnect event
-                    event_key = f"disconnect_{player_id}"
+                    event_key = f"{event_type}_{player_id}"
                     if event_key not in player_event_dedup or parsed_timestamp > player_event_dedup[event_key]['timestamp']:
                         player_event_dedup[event_key] = {
-                            'type': 'disconnect',
+                            'type': event_type,
                             'player_id': player_id,
                             'timestamp': parsed_timestamp,
                             'line_timestamp': line_timestamp,
@@ -480,39 +546,22 @@ class UnifiedLogParser:
         for event in player_events:
             try:
                 player_id = event['player_id']
-                lifecycle_key = f"{guild_id}_{player_id}"
-                session_key = f"{guild_id}_{player_id}"
 
                 if event['type'] == 'queue':
                     # Update lifecycle with queue information
-                    self.player_lifecycle[lifecycle_key] = {
-                        'name': event['player_name'],
-                        'platform': event['platform'],
-                        'state': 'queued',
-                        'queued_at': event['timestamp'].isoformat()
-                    }
+                    self.presence.queue(
+                        guild_id, server_id, player_id,
+                        event['player_name'], event['platform'], event['timestamp'].isoformat()
+                    )
                     logger.debug(f"👤 Player queued: {player_id} -> '{event['player_name']}' on {event['platform']}")
 
                 elif event['type'] == 'join':
                     # Get player data from lifecycle (if available from queue event)
-                    lifecycle_data = self.player_lifecycle.get(lifecycle_key, {})
-                    player_name = lifecycle_data.get('name', f"Player{player_id[:8].upper()}")
-                    platform = lifecycle_data.get('platform', 'Unknown')
-
-                    # Update lifecycle state
-                    if lifecycle_key in self.player_lifecycle:
-                        self.player_lifecycle[lifecycle_key]['state'] = 'joined'
-                        self.player_lifecycle[lifecycle_key]['joined_at'] = event['timestamp'].isoformat()
-                    else:
-                        # Player joined without queue data - create minimal record
-                        self.player_lifecycle[lifecycle_key] = {
-                            'name': player_name,
-                            'platform': platform,
-                            'state': 'joined',
-                            'joined_at': event['timestamp'].isoformat()
-                        }
+                    lifecycle_data = self.presence.get_lifecycle(guild_id, server_id, player_id)
+                    player_name = lifecycle_data.get('name') or f"Player{player_id[:8].upper()}"
+                    platform = lifecycle_data.get('platform') or 'Unknown'
 
-                    # Track active session
+                    # Track active session (joining without queue data creates a minimal lifecycle record)
                     session_data = {
                         'player_id': player_id,
                         'player_name': player_name,
@@ -522,13 +571,11 @@ class UnifiedLogParser:
                         'joined_at': event['timestamp'].isoformat(),
                         'status': 'online'
                     }
-                    self.player_sessions[session_key] = session_data
+                    self.presence.join(guild_id, server_id, player_id, session_data)
 
-                    # Persist to database with proper error handling
-                    if hasattr(self.bot, 'db_manager'):
-                        await self.bot.db_manager.save_player_session(
-                            int(guild_id), server_id, player_id, session_data
-                        )
+                    # Persisted in bulk by the write-behind session store
+                    if hasattr(self.bot, 'session_store'):
+                        self.bot.session_store.save(int(guild_id), server_id, player_id, session_data)
 
                     # Mark voice channel for update
                     voice_channel_needs_update = True
@@ -548,8 +595,8 @@ class UnifiedLogParser:
 
                 elif event['type'] == 'disconnect':
                     # Only process disconnect if player was previously joined
-                    lifecycle_data = self.player_lifecycle.get(lifecycle_key, {})
-                    session_data = self.player_sessions.get(session_key, {})
+                    lifecycle_data = self.presence.get_lifecycle(guild_id, server_id, player_id)
+                    session_data = self.presence.get_session(guild_id, server_id, player_id)
 
                     # Check if player was actually online before processing disconnect
                     if (lifecycle_data.get('state') == 'joined' or 
@@ -558,21 +605,12 @@ class UnifiedLogParser:
                         player_name = lifecycle_data.get('name') or session_data.get('player_name', f"Player{player_id[:8].upper()}")
                         platform = lifecycle_data.get('platform') or session_data.get('platform', 'Unknown')
 
-                        # Update lifecycle state
-                        if lifecycle_key in self.player_lifecycle:
-                            self.player_lifecycle[lifecycle_key]['state'] = 'disconnected'
-                            self.player_lifecycle[lifecycle_key]['disconnected_at'] = event['timestamp'].isoformat()
-
-                        # Update session status
-                        if session_key in self.player_sessions:
-                            self.player_sessions[session_key]['status'] = 'offline'
-                            self.player_sessions[session_key]['left_at'] = event['timestamp'].isoformat()
+                        # Update lifecycle state and session status
+                        self.presence.disconnect(guild_id, server_id, player_id, event['timestamp'].isoformat())
 
-                        # Remove from database (player is offline)
-                        if hasattr(self.bot, 'db_manager'):
-                            await self.bot.db_manager.remove_player_session(
-                                int(guild_id), server_id, player_id
-                            )
+                        # Remove from database (player is offline) on the next session flush
+                        if hasattr(self.bot, 'session_store'):
+                            self.bot.session_store.remove(int(guild_id), server_id, player_id)
 
                         # Mark voice channel for update
                         voice_channel_needs_update = True
@@ -596,100 +634,81 @@ class UnifiedLogParser:
                 logger.error(f"Error processing player event {event.get('type', 'unknown')} for {player_id}: {e}")
                 continue
 
-        # Second pass: process non-player events with deduplication
+        # Then process non-player events in log order with deduplication
         processed_events = set()  # Track processed events to prevent duplicates
 
-        for line in lines_to_process:
+        for event_type, match in log_events:
             try:
 
                 # Check for server info updates
-                if 'playersmaxcount:' in line:
-                    match = self.server_info_patterns['max_players'].search(line)
-                    if match:
-                        max_players = int(match.group(1))
-                        extracted_max_players = max_players
-                        logger.info(f"📊 Updated max players for server {server_id}: {max_players}")
-                        # Update database immediately
-                        if hasattr(self.bot, 'db_manager'):
-                            await self.bot.db_manager.servers.update_one(
-                                {"guild_id": int(guild_id), "server_id": server_id},
-                                {"$set": {"max_players": max_players}},
-                                upsert=True
-                            )
+                if event_type == 'max_players':
+                    max_players = int(match.group('max_players'))
+                    logger.info(f"📊 Updated max players for server {server_id}: {max_players}")
+                    # Update database immediately
+                    if hasattr(self.bot, 'db_manager'):
+                        await self.bot.db_manager.servers.update_one(
+                            {"guild_id": int(guild_id), "server_id": server_id},
+                            {"$set": {"max_players": max_players}},
+                            upsert=True
+                        )
 
-                # Mission events - ONLY READY missions of level 3+ with deduplication
-                mission_match = self.patterns['mission_state_change'].search(line)
-                if mission_match:
-                    mission_id, state = mission_match.groups()
+                # Embeds for the remaining events are only created on hot start
+                elif cold_start:
+                    continue
 
-                    if not cold_start:
-                        # Only process READY missions of level 3 or higher
-                        if state == 'READY':
-                            mission_level = self.get_mission_level(mission_id)
-                            if mission_level >= 3:
-                                # Create unique event key to prevent duplicates
-                                event_key = f"mission_{mission_id}_{state}"
-                                if event_key not in processed_events:
-                                    processed_events.add(event_key)
-                                    embed = await self.create_mission_embed(mission_id, state)
-                                    if embed:
-                                        embeds.append(embed)
+                # Mission events - ONLY READY missions of level 3+ with deduplication
+                elif event_type == 'mission':
+                    mission_id, state = match.groups()
+
+                    # Only process READY missions of level 3 or higher
+                    if state == 'READY':
+                        mission_level = self.get_mission_level(mission_id)
+                        if mission_level >= 3:
+                            # Create unique event key to prevent duplicates
+                            event_key = f"mission_{mission_id}_{state}"
+                            if event_key not in processed_events:
+                                processed_events.add(event_key)
+                                embed = await self.create_mission_embed(mission_id, state)
+                                if embed:
+                                    embeds.append(embed)
 
                 # Airdrop events - ONLY flying state with deduplication
-                airdrop_flying_match = self.patterns['airdrop_flying'].search(line)
-                if airdrop_flying_match:
-                    if not cold_start:
-                        event_key = f"airdrop_flying_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
-                        if event_key not in processed_events:
-                            processed_events.add(event_key)
-                            embed = await self.create_airdrop_embed()
-                            if embed:
-                                embeds.append(embed)
+                elif event_type == 'airdrop':
+                    event_key = f"airdrop_flying_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
+                    if event_key not in processed_events:
+                        processed_events.add(event_key)
+                        embed = await self.create_airdrop_embed()
+                        if embed:
+                            embeds.append(embed)
 
                 # Helicrash events - ONLY crash/ready state with deduplication
-                helicrash_match = self.patterns['helicrash_event'].search(line) or self.patterns['helicrash_crash'].search(line)
-                if helicrash_match:
-                    if not cold_start:
-                        event_key = f"helicrash_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
-                        if event_key not in processed_events:
-                            processed_events.add(event_key)
-                            embed = await self.create_helicrash_embed()
-                            if embed:
-                                embeds.append(embed)
+                elif event_type == 'helicrash':
+                    event_key = f"helicrash_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
+                    if event_key not in processed_events:
+                        processed_events.add(event_key)
+                        embed = await self.create_helicrash_embed()
+                        if embed:
+                            embeds.append(embed)
 
                 # Trader events - ONLY arrival/ready state with deduplication
-                trader_arrival_match = self.patterns['trader_arrival'].search(line)
-                if trader_arrival_match:
-                    if not cold_start:
-                        event_key = f"trader_arrival_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
-                        if event_key not in processed_events:
-                            processed_events.add(event_key)
-                            embed = await self.create_trader_embed()
-                            if embed:
-                                embeds.append(embed)
+                elif event_type == 'trader':
+                    event_key = f"trader_arrival_{datetime.now().strftime('%H:%M')}"  # Dedupe by minute
+                    if event_key not in processed_events:
+                        processed_events.add(event_key)
+                        embed = await self.create_trader_embed()
+                        if embed:
+                            embeds.append(embed)
 
                 # Vehicle events with deduplication
-                vehicle_spawn_match = self.patterns['vehicle_spawn'].search(line)
-                if vehicle_spawn_match:
-                    vehicle_type = vehicle_spawn_match.group(1)
-                    if not cold_start:
-                        event_key = f"vehicle_spawn_{vehicle_type}_{datetime.now().strftime('%H:%M')}"
-                        if event_key not in processed_events:
-                            processed_events.add(event_key)
-                            embed = await self.create_vehicle_embed('spawn', vehicle_type)
-                            if embed:
-                                embeds.append(embed)
-
-                vehicle_delete_match = self.patterns['vehicle_delete'].search(line)
-                if vehicle_delete_match:
-                    vehicle_type = vehicle_delete_match.group(1)
-                    if not cold_start:
-                        event_key = f"vehicle_delete_{vehicle_type}_{datetime.now().strftime('%H:%M')}"
-                        if event_key not in processed_events:
-                            processed_events.add(event_key)
-                            embed = await self.create_vehicle_embed('delete', vehicle_type)
-                            if embed:
-                                embeds.append(embed)
+                elif event_type in ('vehicle_spawn', 'vehicle_delete'):
+                    vehicle_type = match.group(1)
+                    action = 'spawn' if event_type == 'vehicle_spawn' else 'delete'
+                    event_key = f"{event_type}_{vehicle_type}_{datetime.now().strftime('%H:%M')}"
+                    if event_key not in processed_events:
+                        processed_events.add(event_key)
+                        embed = await self.create_vehicle_embed(action, vehicle_type)
+                        if embed:
+                            embeds.append(embed)
 
             except Exception as e:
                 logger.error(f"Error processing line: {e}")
@@ -697,7 +716,7 @@ class UnifiedLogParser:
 
         # Update voice channel once at the end if needed
         if voice_channel_needs_update:
-            await self.update_voice_channel(str(guild_id))
+            await self.update_voice_channel(str(guild_id), server_id)
 
         if not cold_start:
             logger.info(f"🔍 Generated {len(embeds)} events")
@@ -765,8 +784,8 @@ class UnifiedLogParser:
         # Vehicle embeds are suppressed per task requirements
         return None
 
-    async def update_voice_channel(self, guild_id: str):
-        """ADVANCED voice channel update with server name, counts, and queue info"""
+    async def update_voice_channel(self, guild_id: str, server_id: Optional[str] = None):
+        """Publish live player and queue counts to the voice channel updater, for one server or the whole guild"""
         try:
             # Convert guild_id to int with better validation
             if isinstance(guild_id, str):
@@ -782,159 +801,25 @@ class UnifiedLogParser:
             else:
                 guild_id_int = guild_id
 
-            # Count active players with better key validation
-            guild_prefix = f"{guild_id}_"
-            active_players = 0
-            queued_players = 0
-
-            for key, session in self.player_sessions.items():
-                if key.startswith(guild_prefix) and isinstance(session, dict) and session.get('status') == 'online':
-                    active_players += 1
-
-            # Count queued players (those in 'queued' state but not joined)
-            for key, lifecycle in self.player_lifecycle.items():
-                if key.startswith(guild_prefix) and lifecycle.get('state') == 'queued':
-                    queued_players += 1
-
-            logger.debug(f"Counted {active_players} active players and {queued_players} queued for guild {guild_id_int}")
-
-            # Get guild config with validation
-            if not hasattr(self.bot, 'db_manager') or not self.bot.db_manager:
-                logger.warning("Database manager not available for voice channel update")
-                return
-
-            guild_config = await self.bot.db_manager.get_guild(guild_id_int)
-            if not guild_config:
-                logger.debug(f"No guild config found for {guild_id_int}")
-                return
-
-            # Get server info for display
-            servers = guild_config.get('servers', [])
-            server_name = "Unknown Server"
-            max_players = 60  # Default
-
-            if servers:
-                # Use first server's info for display (most common case is single server)
-                primary_server = servers[0]
-                server_name = primary_server.get('name', 'Server').replace(' Server', '').replace(' EU', '').replace(' US', '')
-
-                # Try to get MaxPlayerCount from database first, then fallback to config
-                try:
-                    stored_max_players = await self._get_server_max_players(guild_id_int, str(primary_server.get('_id', '')))
-                    if stored_max_players and stored_max_players > 0:
-                        max_players = stored_max_players
-                        logger.debug(f"Using database MaxPlayerCount: {max_players}")
-                    else:
-                        max_players = primary_server.get('max_players', 60)
-                        logger.debug(f"Using config max_players: {max_players} (no database value found)")
-                except Exception as e:
-                    logger.warning(f"Failed to get stored max players: {e}")
-                    max_players = primary_server.get('max_players', 60)
-
-            # Find voice channel ID with comprehensive mapping
-            voice_channel_id = None
-
-            # Method 1: Check server_channels (new format)
-            server_channels = guild_config.get('server_channels', {})
-            for server_key, channels in server_channels.items():
-                if isinstance(channels, dict):
-                    # Try multiple voice channel key names
-                    for voice_key in ['voice_count', 'playercountvc', 'playercount']:
-                        if voice_key in channels:
-                            voice_channel_id = channels[voice_key]
-                            logger.debug(f"Found voice channel {voice_channel_id} as {voice_key} in server {server_key}")
-                            break
-                    if voice_channel_id:
-                        break
-
-            # Method 2: Check channels (legacy format)
-            if not voice_channel_id:
-                legacy_channels = guild_config.get('channels', {})
-                if isinstance(legacy_channels, dict):
-                    for voice_key in ['voice_count', 'playercountvc', 'playercount']:
-                        if voice_key in legacy_channels:
-                            voice_channel_id = legacy_channels[voice_key]
-                            logger.debug(f"Found legacy voice channel {voice_channel_id} as {voice_key}")
-                            break
-
-            # Method 3: Check if any servers have voice channels configured
-            if not voice_channel_id:
-                for server in servers:
-                    server_id = str(server.get('_id', ''))
-                    if server_id in server_channels:
-                        channels = server_channels[server_id]
-                        if isinstance(channels, dict):
-                            for voice_key in ['voice_count', 'playercountvc', 'playercount']:
-                                if voice_key in channels:
-                                    voice_channel_id = channels[voice_key]
-                                    logger.debug(f"Found voice channel {voice_channel_id} in server {server_id}")
-                                    break
-                        if voice_channel_id:
-                            break
-
-            if not voice_channel_id:
-                logger.debug(f"No voice channel configured for guild {guild_id_int}")
-                return
-
-            # Update the channel with rate limit protection
-            guild = self.bot.get_guild(guild_id_int)
-            if not guild:
-                logger.warning(f"Guild {guild_id_int} not found")
-                return
-
-            voice_channel = guild.get_channel(voice_channel_id)
-            if not voice_channel:
-                logger.warning(f"Voice channel {voice_channel_id} not found in guild {guild_id_int}")
+            updater = getattr(self.bot, 'voice_channel_updater', None)
+            if not updater:
+                logger.debug("Voice channel updater not available")
                 return
 
-            if voice_channel.type != discord.ChannelType.voice:
-                logger.warning(f"Channel {voice_channel_id} is not a voice channel")
-                return
-
-            # Determine status emoji based on player count
-            status_emoji = "🟢"  # Green for healthy
-            if active_players == 0:
-                status_emoji = "🔴"  # Red for empty
-            elif active_players >= max_players * 0.8:
-                status_emoji = "🟡"  # Yellow for near full
-            elif active_players >= max_players:
-                status_emoji = "🔴"  # Red for full
-
-            # Build voice channel name with specified format
-            queue_text = f" | {queued_players} in Queue" if queued_players > 0 else ""
-            new_name = f"{status_emoji} {server_name} | {active_players}/{max_players}{queue_text}"
-
-            # Ensure name fits Discord's 100 character limit
-            if len(new_name) > 100:
-                # Truncate server name if needed
-                max_server_name_length = 100 - len(f"{status_emoji}  | {active_players}/{max_players}{queue_text}")
-                if max_server_name_length > 0:
-                    truncated_server_name = server_name[:max_server_name_length]
-                    new_name = f"{status_emoji} {truncated_server_name} | {active_players}/{max_players}{queue_text}"
-                else:
-                    # Fallback to simple format
-                    new_name = f"{status_emoji} Players: {active_players}/{max_players}"
-
-            if voice_channel.name != new_name:
-                try:
-                    # Direct voice channel update - no rate limiter needed for voice channels
-                    await voice_channel.edit(name=new_name)
-                    logger.info(f"✅ Voice channel updated to: {new_name}")
-
-                except discord.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        logger.warning(f"Rate limited updating voice channel: {e}")
-                    else:
-                        logger.error(f"HTTP error updating voice channel: {e}")
-                except Exception as edit_error:
-                    logger.error(f"Error editing voice channel: {edit_error}")
+            if server_id is None:
+                guild_config = await self.bot.db_manager.get_guild(guild_id_int)
+                server_ids = [str(server.get('_id', '')) for server in guild_config.get('servers', [])] if guild_config else []
             else:
-                logger.debug(f"Voice channel already has correct name: {new_name}")
+                server_ids = [str(server_id)]
+
+            for sid in server_ids:
+                active_players = self.presence.online_count(guild_id_int, sid)
+                queued_players = self.presence.queued_count(guild_id_int, sid)
+                logger.debug(f"Counted {active_players} active players and {queued_players} queued for server {sid}")
+                await updater.publish(guild_id_int, sid, active_players, queued_players)
 
         except Exception as e:
             logger.error(f"Voice channel update failed: {e}")
-            import traceback
-            logger.error(f"Voice channel update traceback: {traceback.format_exc()}")
 
     async def get_channel_for_type(self, guild_id: int, server_id: str, channel_type: str) -> Optional[int]:
         """Get channel ID with bulletproof fallback"""
@@ -1015,38 +900,16 @@ class UnifiedLogParser:
                 channel = self.bot.get_channel(channel_id)
                 if channel:
                     try:
-                        # Send embeds directly without rebuilding to preserve data
-                        if embed_type == 'connection':
-                            # The embed already has the correct data, just send it with proper file
-                            connections_file = discord.File("./assets/Connections.png", filename="Connections.png")
-                            embed.set_thumbnail(url="attachment://Connections.png")
-                            final_embed = embed
-                            file_attachment = connections_file
-
-                        elif embed_type == 'mission':
-                            # The mission embed already has correct data, just add thumbnail
-                            mission_file = discord.File("./assets/Mission.png", filename="Mission.png")
-                            embed.set_thumbnail(url="attachment://Mission.png")
-                            final_embed = embed
-                            file_attachment = mission_file
-
-                        else:
-                            # For other embed types, send directly with appropriate thumbnail
-                            if embed_type == 'airdrop':
-                                asset_file = discord.File("./assets/Airdrop.png", filename="Airdrop.png")
-                                embed.set_thumbnail(url="attachment://Airdrop.png")
-                            elif embed_type == 'helicrash':
-                                asset_file = discord.File("./assets/Helicrash.png", filename="Helicrash.png")
-                                embed.set_thumbnail(url="attachment://Helicrash.png")
-                            elif embed_type == 'trader':
-                                asset_file = discord.File("./assets/Trader.png", filename="Trader.png")
-                                embed.set_thumbnail(url="attachment://Trader.png")
-                            else:
-                                asset_file = discord.File("./assets/main.png", filename="main.png")
-                                embed.set_thumbnail(url="attachment://main.png")
-
-                            final_embed = embed
-                            file_attachment = asset_file
+                        # Send embeds directly without rebuilding to preserve data, only the thumbnail is set
+                        asset_names = {
+                            'connection': "Connections.png",
+                            'mission': "Mission.png",
+                            'airdrop': "Airdrop.png",
+                            'helicrash': "Helicrash.png",
+                            'trader': "Trader.png"
+                        }
+                        final_embed = embed
+                        file_attachment = get_asset_registry().thumbnail(embed, asset_names.get(embed_type, "main.png"))
 
                         # Set priority for rate limiter
                         from bot.utils.advanced_rate_limiter import MessagePriority
@@ -1090,16 +953,37 @@ class UnifiedLogParser:
                 logger.warning(f"❌ Invalid server config: {server_name}")
                 return
 
-            # Get log content
-            content = await self.get_log_content(server)
-            if not content:
+            server_key = f"{guild_id}_{server_id}"
+            file_state = self.file_states.get(server_key, {})
+
+            # Read only the bytes appended since the stored offset
+            log_read = await self.get_log_content(server, file_state)
+            if log_read is None:
                 logger.warning(f"❌ No log content for {server_name}")
                 return
 
-            # Determine if cold start
-            server_key = f"{guild_id}_{server_id}"
-            file_state = self.file_states.get(server_key, {})
-            is_cold_start = not file_state.get('cold_start_complete', False)
+            # Cold start on first run or when the log file was replaced
+            is_cold_start = not file_state.get('cold_start_complete', False) or log_read['rotated']
+            if log_read['rotated']:
+                logger.info(f"🔁 {server_name}: Deadside.log was rotated, rebuilding state from the new file")
+
+            content = log_read['content']
+            new_line_count = content.count('\n')
+            previous_lines = 0 if is_cold_start else file_state.get('line_count', 0)
+
+            # Update state before parsing so a failed parse never replays the same range
+            self.file_states[server_key] = {
+                **log_read['state'],
+                'line_count': previous_lines + new_line_count,
+                'last_updated': datetime.now(timezone.utc).isoformat(),
+                'cold_start_complete': True
+            }
+            self.last_log_position[server_key] = log_read['state']['byte_offset']
+            self.dirty_file_states.add(server_key)
+
+            if not content:
+                logger.info(f"📊 {server_name}: No new lines to process")
+                return
 
             # Parse content with server context
             embeds = await self.parse_log_content(content, str(guild_id), server_id, is_cold_start, server_name)
@@ -1154,7 +1038,7 @@ class UnifiedLogParser:
                 logger.info("No guilds found")
                 return
 
-            total_processed = 0
+            jobs = []
 
             for guild_doc in guilds_list:
                 guild_id = guild_doc.get('guild_id')
@@ -1172,16 +1056,25 @@ class UnifiedLogParser:
                 if not servers:
                     continue
 
-                logger.info(f"📡 Processing {len(servers)} servers for {guild_name}")
+                logger.info(f"📡 Queueing {len(servers)} servers for {guild_name}")
 
                 for server in servers:
-                    try:
-                        await self.parse_server_logs(guild_id, server)
-                        total_processed += 1
-                    except Exception as e:
-                        logger.error(f"Server parse error: {e}")
+                    jobs.append(server_job(
+                        f"{server.get('name', 'Unknown')} ({guild_id})",
+                        server.get('host', 'unknown'),
+                        functools.partial(self.parse_server_logs, guild_id, server)
+                    ))
+
+            # Servers run concurrently so one slow SFTP host no longer delays the rest
+            results = await self.server_scheduler.run_all(jobs)
+            total_processed = sum(1 for result in results if result['status'] == 'ok')
+
+            # Write this cycle's file states, joins and disconnects in one bulk write each
+            await self.save_persistent_state()
+            if hasattr(self.bot, 'session_store'):
+                await self.bot.session_store.flush()
 
-            logger.info(f"✅ Parser completed: {total_processed} servers processed")
+            logger.info(f"✅ Parser completed: {total_processed}/{len(jobs)} servers processed")
 
         except Exception as e:
             logger.error(f"Parser run failed: {e}")
@@ -1189,62 +1082,39 @@ class UnifiedLogParser:
     async def _resolve_player_name(self, raw_name: str, player_id: str) -> str:
         """Enhanced player name resolution with caching and validation"""
         try:
-            # Check cache first
-            cache_key = f"{player_id}_{raw_name}"
-            if cache_key in self.player_name_cache:
-                return self.player_name_cache[cache_key]
-
-            # Clean and decode the player name
-            import urllib.parse
-            try:
-                decoded_name = urllib.parse.unquote(raw_name)
-                clean_name = decoded_name.replace('+', ' ').strip()
-                final_name = clean_name if clean_name else raw_name.strip()
-            except Exception:
-                final_name = raw_name.strip()
-
-            # Validate the resolved name
-            if not final_name or len(final_name) < 2:
-                final_name = f"Player{player_id[:8].upper()}"
-
-            # Reject numeric-only names
-            if final_name.replace('.', '').replace('-', '').isdigit():
-                final_name = f"Player{player_id[:8].upper()}"
-
-            # Cache the result with expiration
-            self.player_name_cache[cache_key] = final_name
-
-            # Clean old cache entries (keep only last 1000)
-            if len(self.player_name_cache) > 1000:
-                old_keys = list(self.player_name_cache.keys())[:-500]
-                for old_key in old_keys:
-                    del self.player_name_cache[old_key]
-
-            return final_name
+            return _clean_player_name(raw_name, player_id)
 
         except Exception as e:
             logger.error(f"Failed to resolve player name: {e}")
             return f"Player{player_id[:8].upper()}"
 
-    async def _save_persistent_state(self):
-        """Save parser state to database"""
+    async def save_persistent_state(self):
+        """Save changed parser states to database in one bulk write"""
         try:
             if not hasattr(self.bot, 'db_manager') or not self.bot.db_manager:
                 return
 
-            for server_key, state_data in self.file_states.items():
-                try:
-                    # Extract guild_id and server_id from key
-                    parts = server_key.split('_', 1)
-                    if len(parts) == 2:
-                        guild_id = int(parts[0])
-                        server_id = parts[1]
-
-                        await self.bot.db_manager.save_parser_state(
-                            guild_id, server_id, state_data, "unified_log_parser"
-                        )
-                except Exception as e:
-                    logger.error(f"Failed to save state for {server_key}: {e}")
+            if not self.dirty_file_states:
+                return
+
+            dirty, self.dirty_file_states = self.dirty_file_states, set()
+            states = []
+            for server_key in dirty:
+                state_data = self.file_states.get(server_key)
+                if state_data is None:
+                    continue  # Reset since it was marked
+
+                # Extract guild_id and server_id from key
+                parts = server_key.split('_', 1)
+                if len(parts) == 2:
+                    states.append((int(parts[0]), parts[1], state_data))
+
+            if not await self.bot.db_manager.save_parser_states(states, "unified_log_parser"):
+                # Retry on the next save with whatever state is current then
+                self.dirty_file_states |= dirty
+                return
+
+            logger.debug(f"💾 Saved parser state for {len(states)} servers")
 
         except Exception as e:
             logger.error(f"Failed to save persistent state: {e}")
@@ -1285,8 +1155,7 @@ class UnifiedLogParser:
                             for session in active_sessions:
                                 player_id = session.get('player_id')
                                 if player_id:
-                                    session_key = f"{guild_id}_{player_id}"
-                                    self.player_sessions[session_key] = {
+                                    session_data = {
                                         'player_id': player_id,
                                         'player_name': session.get('player_name', f"Player{player_id[:8].upper()}"),
                                         'platform': session.get('platform', 'Unknown'),
@@ -1295,6 +1164,9 @@ class UnifiedLogParser:
                                         'joined_at': session.get('joined_at', datetime.now(timezone.utc).isoformat()),
                                         'status': 'online'
                                     }
+                                    self.presence.restore_session(guild_id, server_id, player_id, session_data)
+                                    if hasattr(self.bot, 'session_store'):
+                                        self.bot.session_store.restore(guild_id, server_id, player_id, dict(session_data))
                                     session_count += 1
 
                         except Exception as e:
@@ -1318,6 +1190,9 @@ class UnifiedLogParser:
                 return
 
             if max_players:
+                if hasattr(self.bot, 'voice_channel_updater'):
+                    self.bot.voice_channel_updater.set_max_players(int(guild_id), server_id, max_players)
+
                 # Store max_players in a server_info collection or similar
                 await self.bot.db_manager.save_parser_state(
                     int(guild_id), server_id, 
@@ -1329,25 +1204,6 @@ class UnifiedLogParser:
         except Exception as e:
             logger.error(f"Failed to update server info: {e}")
 
-    async def _get_server_max_players(self, guild_id: int, server_id: str) -> Optional[int]:
-        """Get stored max_players for server"""
-        try:
-            if not hasattr(self.bot, 'db_manager') or not self.bot.db_manager:
-                return None
-
-            server_info = await self.bot.db_manager.get_parser_state(
-                guild_id, server_id, "server_info"
-            )
-
-            if server_info and 'max_players' in server_info:
-                return server_info['max_players']
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Failed to get server max players: {e}")
-            return None
-
     async def _schedule_periodic_cleanup(self):
         """Schedule periodic cleanup of memory structures"""
         while True:
@@ -1360,102 +1216,15 @@ class UnifiedLogParser:
     async def _cleanup_memory_structures(self):
         """Clean up memory structures to prevent memory leaks"""
         try:
-            current_time = time.time()
+            # Drop lifecycle entries idle for an hour and offline sessions older than 30 minutes
+            removed = self.presence.prune(3600, 1800)
 
-            # Clean up player lifecycle (remove entries older than 1 hour)
-            lifecycle_cutoff = current_time - 3600
-            to_remove = []
-
-            for key, lifecycle in self.player_lifecycle.items():
-                try:
-                    # Check various timestamp fields
-                    timestamps = [
-                        lifecycle.get('queued_at'),
-                        lifecycle.get('joined_at'),
-                        lifecycle.get('disconnected_at')
-                    ]
-
-                    latest_activity = 0
-                    for ts in timestamps:
-                        if ts:
-                            try:
-                                if isinstance(ts, str):
-                                    ts_dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                                    latest_activity = max(latest_activity, ts_dt.timestamp())
-                            except Exception:
-                                pass
-
-                    if latest_activity > 0 and latest_activity < lifecycle_cutoff:
-                        to_remove.append(key)
-
-                except Exception as e:
-                    logger.error(f"Error checking lifecycle entry {key}: {e}")
-                    to_remove.append(key)
-
-            for key in to_remove:
-                del self.player_lifecycle[key]
-
-            # Clean up player sessions (remove offline players older than 30 minutes)
-            session_cutoff = current_time - 1800
-            to_remove = []
-
-            for key, session in self.player_sessions.items():
-                try:
-                    if session.get('status') == 'offline':
-                        left_at = session.get('left_at')
-                        if left_at:
-                            try:
-                                if isinstance(left_at, str):
-                                    left_dt = datetime.fromisoformat(left_at.replace('Z', '+00:00'))
-                                    if left_dt.timestamp() < session_cutoff:
-                                        to_remove.append(key)
-                            except Exception:
-                                to_remove.append(key)
-                except Exception as e:
-                    logger.error(f"Error checking session entry {key}: {e}")
-                    to_remove.append(key)
-
-            for key in to_remove:
-                del self.player_sessions[key]
-
-            # Aggressive memory management with bounds checking
-            if len(self.player_name_cache) > self.max_cache_size:
-                # Keep only the most recent entries with safety bounds
-                try:
-                    cache_items = list(self.player_name_cache.items())
-                    keep_count = min(self.max_cache_size // 2, len(cache_items))
-                    self.player_name_cache = dict(cache_items[-keep_count:]) if keep_count > 0 else {}
-                except Exception as e:
-                    logger.error(f"Error cleaning name cache: {e}")
-                    self.player_name_cache.clear()
-
-            if len(self.player_lifecycle) > self.max_lifecycle_entries:
-                # Keep only active and recent entries
-                try:
-                    lifecycle_items = list(self.player_lifecycle.items())
-                    keep_count = min(self.max_lifecycle_entries // 2, len(lifecycle_items))
-                    self.player_lifecycle = dict(lifecycle_items[-keep_count:]) if keep_count > 0 else {}
-                except Exception as e:
-                    logger.error(f"Error cleaning lifecycle: {e}")
-                    self.player_lifecycle.clear()
-
-            if len(self.player_sessions) > self.max_session_entries:
-                # Keep only active sessions
-                try:
-                    active_sessions = {k: v for k, v in self.player_sessions.items() if v.get('status') == 'online'}
-                    if len(active_sessions) < self.max_session_entries:
-                        self.player_sessions = active_sessions
-                    else:
-                        # If too many active sessions, keep most recent
-                        session_items = list(active_sessions.items())
-                        keep_count = min(self.max_session_entries // 2, len(session_items))
-                        self.player_sessions = dict(session_items[-keep_count:]) if keep_count > 0 else {}
-                except Exception as e:
-                    logger.error(f"Error cleaning sessions: {e}")
-                    # Emergency cleanup
-                    self.player_sessions = {k: v for k, v in self.player_sessions.items() if v.get('status') == 'online'}
+            lifecycle_entries, session_entries = self.presence.entry_counts()
+            if lifecycle_entries > self.max_lifecycle_entries or session_entries > self.max_session_entries:
+                # Tighter windows when over bounds, online players are always kept
+                removed += self.presence.prune(600, 0)
 
-            logger.debug(f"Memory cleanup completed: {len(to_remove)} lifecycle entries, cache size: {len(self.player_name_cache)}")
+            logger.debug(f"Memory cleanup completed: {removed} presence entries, name cache size: {_clean_player_name.cache_info().currsize}")
 
         except Exception as e:
             logger.error(f"Failed to cleanup memory structures: {e}")
@@ -1463,29 +1232,21 @@ class UnifiedLogParser:
     def get_parser_status(self) -> Dict[str, Any]:
         """Get parser status"""
         try:
-            active_sessions = sum(1 for session in self.player_sessions.values() if session.get('status') == 'online')
+            active_sessions = self.presence.total_online()
 
             # Calculate active players by guild
-            active_players_by_guild = {}
-            for key, session in self.player_sessions.items():
-                if session.get('status') == 'online':
-                    guild_id = session.get('guild_id', 'unknown')
-                    active_players_by_guild[guild_id] = active_players_by_guild.get(guild_id, 0) + 1
-
-            # Check SFTP connection status
-            active_connections = 0
-            for conn in self.sftp_connections.values():
-                try:
-                    if not conn.is_closed():
-                        active_connections += 1
-                except:
-                    pass
+            active_players_by_guild = {
+                str(guild_id): count for guild_id, count in self.presence.online_by_guild().items()
+            }
+
+            # Connections live in the shared pool
+            pool_stats = get_sftp_pool().get_stats()
 
             return {
                 'active_sessions': active_sessions,
                 'total_tracked_servers': len(self.file_states),
-                'sftp_connections': active_connections,
-                'connection_status': f"{active_connections}/{len(self.sftp_connections)} active",
+                'sftp_connections': pool_stats['active_connections'],
+                'connection_status': f"{pool_stats['active_connections']}/{pool_stats['pooled_connections']} active, {pool_stats['hit_rate']:.0%} reuse",
                 'active_players_by_guild': active_players_by_guild,
                 'status': 'healthy' if active_sessions >= 0 else 'error'
             }
@@ -1500,48 +1261,20 @@ class UnifiedLogParser:
                 'status': 'error'
             }
 
-    async def cleanup_sftp_connections(self):
-        """Clean up idle SFTP connections with enhanced error handling"""
-        try:
-            for conn_key, conn in list(self.sftp_connections.items()):
-                try:
-                    if hasattr(conn, 'is_closed') and conn.is_closed():
-                        del self.sftp_connections[conn_key]
-                        logger.debug(f"Cleaned up closed SFTP connection: {conn_key}")
-                    elif hasattr(conn, '_transport') and hasattr(conn._transport, 'is_closing') and conn._transport.is_closing():
-                        del self.sftp_connections[conn_key] 
-                        logger.debug(f"Cleaned up closing SFTP connection: {conn_key}")
-                except Exception as conn_error:
-                    logger.warning(f"Error checking SFTP connection {conn_key}: {conn_error}")
-                    if conn_key in self.sftp_connections:
-                        del self.sftp_connections[conn_key]
-        except Exception as e:
-            logger.error(f"Failed to cleanup SFTP connections: {e}")
-
     def reset_parser_state(self):
         """Reset all parser state with proper cleanup"""
         try:
             # Clear dictionaries safely
             self.file_states.clear()
-            self.player_sessions.clear()
-            self.player_lifecycle.clear()
+            self.dirty_file_states.clear()
+            self.presence.clear()
             self.last_log_position.clear()
             self.log_file_hashes.clear()
-            self.player_name_cache.clear()
+            _clean_player_name.cache_clear()
 
             if hasattr(self, 'server_status'):
                 self.server_status.clear()
 
-            # Close any open SFTP connections
-            for conn_key, conn in list(self.sftp_connections.items()):
-                try:
-                    if hasattr(conn, 'close') and not conn.is_closed():
-                        conn.close()
-                except Exception as close_error:
-                    logger.warning(f"Error closing SFTP connection: {close_error}")
-
-            self.sftp_connections.clear()
-
             # Force garbage collection
             import gc
             gc.collect()
@@ -1555,11 +1288,7 @@ class UnifiedLogParser:
     def get_active_player_count(self, guild_id: str) -> int:
         """Get active player count for a guild"""
         try:
-            guild_prefix = f"{guild_id}_"
-            return sum(
-                1 for key, session in self.player_sessions.items()
-                if key.startswith(guild_prefix) and isinstance(session, dict) and session.get('status') == 'online'
-            )
+            return self.presence.guild_online_count(guild_id)
         except Exception as e:
             logger.error(f"Error getting active player count: {e}")
             return 0
\ No newline at end of file
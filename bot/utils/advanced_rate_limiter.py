@@ -4,13 +4,17 @@ BULLETPROOF rate limiting with priority queues and batching
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from collections import deque, defaultdict
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 import discord
 
+from bot.utils.message_packer import take_packed_batch_from_heap, build_send_kwargs
+
 class MessagePriority(Enum):
     """Message priority levels"""
     LOW = 1
@@ -20,22 +24,79 @@ class MessagePriority(Enum):
 
 logger = logging.getLogger(__name__)
 
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token if one is available, otherwise return the seconds to wait"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def block(self, seconds: float):
+        """Hold every send for `seconds` (global 429)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
 class AdvancedRateLimiter:
     """
-    Advanced rate limiter with priority queues and error recovery
+    Event-driven send scheduler:
+    - One priority heap per channel, higher priority first then FIFO
+    - A worker task per channel with queued messages, started on enqueue and exiting when drained
+    - Per-channel rate-limit bucket, seeded with Discord's message limit and corrected from 429 headers
+    - A global token bucket shared by every channel
+    - Queued embeds are packed up to 10 per message
+    - A full channel queue makes callers wait for space (backpressure) before anything is dropped
+    - With an OutboundJournal, queued messages are persisted and replayed after a restart
     """
 
-    def __init__(self, bot):
+    # Discord allows 5 messages per 5 seconds per channel and 50 requests per second globally
+    CHANNEL_BUCKET_LIMIT = 5
+    CHANNEL_BUCKET_WINDOW = 5.0
+    GLOBAL_RATE = 50
+    MAX_RETRIES = 3
+    LATENCY_SMOOTHING = 0.2
+    BACKPRESSURE_TIMEOUT = 60.0
+
+    def __init__(self, bot, journal=None):
         self.bot = bot
-        self.channel_queues: Dict[int, List[Dict[str, Any]]] = {}
-        self.processing_locks: Dict[int, asyncio.Lock] = {}
+        self.journal = journal
+        self.channel_queues: Dict[int, List[Tuple[int, int, Dict[str, Any]]]] = {}
         self.last_send_times: Dict[int, datetime] = {}
         self.error_counts: Dict[int, int] = {}
+        self.channel_buckets: Dict[int, Dict[str, Any]] = {}
+        self.channel_metrics: Dict[int, Dict[str, Any]] = {}
         self.max_queue_size = 50  # Per channel
         self.max_error_count = 5
 
-        # Start background processor
-        asyncio.create_task(self._background_processor())
+        self.global_bucket = TokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._space_available: Dict[int, asyncio.Event] = {}
+        self._sequence = itertools.count()
 
     async def queue_message(self, channel_id: int, embed: discord.Embed = None, 
                           file: discord.File = None, content: str = None,
@@ -58,47 +119,20 @@ class AdvancedRateLimiter:
                     logger.warning(f"No permission to send messages in channel {channel_id}")
                     return False
 
-            message_data = {
-                'channel_id': channel_id,
-                'content': content,
-                'embed': embed,
-                'file': file,
-                'priority': priority,
-                'timestamp': datetime.now(timezone.utc),
-                'attempts': 0
-            }
+            # Backpressure: wait for the worker to make room instead of dropping
+            if len(self.channel_queues.get(channel_id, [])) >= self.max_queue_size:
+                await self._wait_for_space(channel_id)
 
-            # Initialize channel queue if needed
-            if channel_id not in self.channel_queues:
-                self.channel_queues[channel_id] = []
-                self.processing_locks[channel_id] = asyncio.Lock()
-                self.error_counts[channel_id] = 0
-
-            # Check queue size limits
-            if len(self.channel_queues[channel_id]) >= self.max_queue_size:
-                logger.warning(f"Queue full for channel {channel_id}, dropping oldest message")
-                self.channel_queues[channel_id].pop(0)
-
-            # Create message entry
-            message_entry = {
-                'embed': embed,
-                'file': file,
-                'content': content,
-                'priority': priority,
-                'timestamp': datetime.now(timezone.utc),
-                'retries': 0
-            }
+            queue = self.channel_queues.setdefault(channel_id, [])
+            if len(queue) >= self.max_queue_size:
+                dropped = self._drop_lowest_priority(channel_id)
+                await self._acknowledge([dropped])
 
-            # Insert based on priority
-            queue = self.channel_queues[channel_id]
-            insert_pos = len(queue)
+            journal_id = None
+            if self.journal:
+                journal_id = await self.journal.record(channel_id, embed, file, content, priority.value)
 
-            for i, existing_msg in enumerate(queue):
-                if existing_msg['priority'].value < priority.value:
-                    insert_pos = i
-                    break
-
-            queue.insert(insert_pos, message_entry)
+            self._enqueue(channel_id, embed, file, content, priority, journal_id)
 
             logger.debug(f"Queued {priority.value} priority message for channel {channel_id}")
             return True
@@ -107,6 +141,133 @@ class AdvancedRateLimiter:
             logger.error(f"Failed to queue message: {e}")
             return False
 
+    def _enqueue(self, channel_id: int, embed: Optional[discord.Embed], file: Optional[discord.File],
+                 content: Optional[str], priority: MessagePriority, journal_id: Optional[str] = None):
+        """Push a message onto the channel heap and wake the channel worker"""
+        self.error_counts.setdefault(channel_id, 0)
+        metrics = self._get_metrics(channel_id)
+
+        message_entry = {
+            'embed': embed,
+            'file': file,
+            'content': content,
+            'priority': priority,
+            'timestamp': datetime.now(timezone.utc),
+            'queued_at': time.monotonic(),
+            'sequence': next(self._sequence),
+            'journal_id': journal_id,
+            'retries': 0
+        }
+        self._push(channel_id, message_entry)
+        metrics['max_depth'] = max(metrics['max_depth'], len(self.channel_queues[channel_id]))
+        self._start_worker(channel_id)
+
+    def _start_worker(self, channel_id: int):
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._channel_worker(channel_id))
+
+    async def _wait_for_space(self, channel_id: int):
+        """Block the caller until the channel queue has room or the backpressure timeout passes"""
+        metrics = self._get_metrics(channel_id)
+        metrics['backpressure_waits'] += 1
+        self._start_worker(channel_id)
+
+        event = self._space_available.setdefault(channel_id, asyncio.Event())
+        deadline = time.monotonic() + self.BACKPRESSURE_TIMEOUT
+        while len(self.channel_queues.get(channel_id, [])) >= self.max_queue_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Queue for channel {channel_id} still full after {self.BACKPRESSURE_TIMEOUT:.0f}s of backpressure")
+                return
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _acknowledge(self, entries: List[Optional[Dict[str, Any]]]):
+        """Remove sent or dropped messages from the journal"""
+        if self.journal:
+            await self.journal.acknowledge([entry.get('journal_id') for entry in entries if entry])
+
+    async def replay_journal(self) -> int:
+        """
+        Re-queue messages journaled before the last shutdown.
+
+        Returns:
+            Number of messages replayed
+        """
+        if not self.journal:
+            return 0
+
+        replayed = 0
+        orphaned = []
+        for message in await self.journal.load():
+            if not self.bot.get_channel(message['channel_id']):
+                orphaned.append(message)
+                continue
+
+            try:
+                priority = MessagePriority(message['priority'])
+            except ValueError:
+                priority = MessagePriority.NORMAL
+
+            self._enqueue(message['channel_id'], message['embed'], message['file'],
+                          message['content'], priority, message['journal_id'])
+            replayed += 1
+
+        await self._acknowledge(orphaned)
+        logger.info(f"📬 Replayed {replayed} journaled messages ({len(orphaned)} for missing channels discarded)")
+        return replayed
+
+    def _push(self, channel_id: int, message_entry: Dict[str, Any]):
+        heapq.heappush(
+            self.channel_queues.setdefault(channel_id, []),
+            (-message_entry['priority'].value, message_entry['sequence'], message_entry)
+        )
+
+    def _drop_lowest_priority(self, channel_id: int) -> Dict[str, Any]:
+        """Drop the oldest of the lowest-priority queued messages"""
+        queue = self.channel_queues[channel_id]
+        lowest = max(queue, key=lambda item: (item[0], -item[1]))
+        queue.remove(lowest)
+        heapq.heapify(queue)
+        self._get_metrics(channel_id)['dropped'] += 1
+        logger.warning(f"Queue full for channel {channel_id}, dropping oldest {lowest[2]['priority'].name} message")
+        return lowest[2]
+
+    def _get_metrics(self, channel_id: int) -> Dict[str, Any]:
+        metrics = self.channel_metrics.get(channel_id)
+        if metrics is None:
+            metrics = {
+                'sent_messages': 0,
+                'sends': 0,
+                'dropped': 0,
+                'backpressure_waits': 0,
+                'max_depth': 0,
+                'last_latency': None,
+                'avg_latency': None,
+                'max_latency': 0.0
+            }
+            self.channel_metrics[channel_id] = metrics
+        return metrics
+
+    def _record_latency(self, channel_id: int, batch: List[Dict[str, Any]]):
+        """Record enqueue-to-delivery latency for a sent batch"""
+        metrics = self._get_metrics(channel_id)
+        now = time.monotonic()
+        for message_entry in batch:
+            latency = now - message_entry['queued_at']
+            metrics['last_latency'] = latency
+            metrics['max_latency'] = max(metrics['max_latency'], latency)
+            if metrics['avg_latency'] is None:
+                metrics['avg_latency'] = latency
+            else:
+                metrics['avg_latency'] += self.LATENCY_SMOOTHING * (latency - metrics['avg_latency'])
+        metrics['sent_messages'] += len(batch)
+        metrics['sends'] += 1
+
     async def _validate_channel(self, channel_id: int) -> bool:
         """Validate that a channel exists and is accessible"""
         try:
@@ -129,109 +290,179 @@ class AdvancedRateLimiter:
             logger.error(f"Channel validation failed for {channel_id}: {e}")
             return False
 
-    async def _background_processor(self):
-        """Background task to process queued messages"""
-        while True:
-            try:
-                await asyncio.sleep(1)  # Check every second
-
-                for channel_id in list(self.channel_queues.keys()):
-                    try:
-                        await self._process_channel_queue(channel_id)
-                    except Exception as e:
-                        logger.error(f"Error processing queue for channel {channel_id}: {e}")
-                        # Increment error count and disable channel if too many errors
-                        self.error_counts[channel_id] = self.error_counts.get(channel_id, 0) + 1
-                        if self.error_counts[channel_id] > self.max_error_count:
-                            logger.warning(f"Disabling channel {channel_id} due to excessive errors")
-                            del self.channel_queues[channel_id]
-                            if channel_id in self.processing_locks:
-                                del self.processing_locks[channel_id]
-                            if channel_id in self.error_counts:
-                                del self.error_counts[channel_id]
-
-            except Exception as e:
-                logger.error(f"Background processor error: {e}")
-                await asyncio.sleep(5)  # Wait longer on major errors
+    async def _channel_worker(self, channel_id: int):
+        """Drain one channel's queue as fast as its bucket and the global bucket allow"""
+        try:
+            while self.channel_queues.get(channel_id):
+                await self._wait_for_channel_bucket(channel_id)
+                await self.global_bucket.acquire()
+
+                # Higher priority messages may have arrived while waiting
+                if not self.channel_queues.get(channel_id):
+                    break
+
+                try:
+                    await self._process_channel_queue(channel_id)
+                    space_available = self._space_available.get(channel_id)
+                    if space_available:
+                        space_available.set()
+                except Exception as e:
+                    logger.error(f"Error processing queue for channel {channel_id}: {e}")
+                    # Increment error count and disable channel if too many errors
+                    self.error_counts[channel_id] = self.error_counts.get(channel_id, 0) + 1
+                    if self.error_counts[channel_id] > self.max_error_count:
+                        logger.warning(f"Disabling channel {channel_id} due to excessive errors")
+                        await self._acknowledge([item[2] for item in self.channel_queues.pop(channel_id, [])])
+                        self.error_counts.pop(channel_id, None)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Channel worker error for {channel_id}: {e}")
+        finally:
+            if self._workers.get(channel_id) is asyncio.current_task():
+                del self._workers[channel_id]
+
+    def _get_bucket(self, channel_id: int) -> Dict[str, Any]:
+        bucket = self.channel_buckets.get(channel_id)
+        if bucket is None:
+            bucket = {
+                'bucket': None,
+                'limit': self.CHANNEL_BUCKET_LIMIT,
+                'remaining': self.CHANNEL_BUCKET_LIMIT,
+                'reset_at': 0.0
+            }
+            self.channel_buckets[channel_id] = bucket
+        return bucket
+
+    async def _wait_for_channel_bucket(self, channel_id: int):
+        """Sleep until the channel bucket has a request left, then take it"""
+        bucket = self._get_bucket(channel_id)
+        now = time.monotonic()
+
+        if bucket['remaining'] <= 0 and now < bucket['reset_at']:
+            await asyncio.sleep(bucket['reset_at'] - now)
+            now = time.monotonic()
+
+        if now >= bucket['reset_at']:
+            bucket['remaining'] = bucket['limit']
+            bucket['reset_at'] = now + self.CHANNEL_BUCKET_WINDOW
+
+        bucket['remaining'] -= 1
+
+    def _apply_rate_limit_headers(self, channel_id: int, error: discord.HTTPException) -> float:
+        """
+        Update the channel (or global) bucket from a 429 response.
+
+        Returns:
+            Seconds until the bucket resets
+        """
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        bucket = self._get_bucket(channel_id)
+
+        try:
+            reset_after = float(headers.get('X-RateLimit-Reset-After') or headers.get('Retry-After') or 1.0)
+        except (TypeError, ValueError):
+            reset_after = 1.0
+
+        if headers.get('X-RateLimit-Global') or headers.get('X-RateLimit-Scope') == 'global':
+            self.global_bucket.block(reset_after)
+            logger.warning(f"Global rate limit hit, pausing all sends for {reset_after:.2f}s")
+            return reset_after
+
+        try:
+            if headers.get('X-RateLimit-Limit'):
+                bucket['limit'] = int(headers['X-RateLimit-Limit'])
+            bucket['remaining'] = int(headers.get('X-RateLimit-Remaining', 0))
+        except (TypeError, ValueError):
+            bucket['remaining'] = 0
+        bucket['bucket'] = headers.get('X-RateLimit-Bucket', bucket['bucket'])
+        bucket['reset_at'] = time.monotonic() + reset_after
+        return reset_after
 
     async def _process_channel_queue(self, channel_id: int):
-        """Process messages for a specific channel with rate limiting"""
-        if channel_id not in self.channel_queues or not self.channel_queues[channel_id]:
+        """Send the next packed batch for a channel"""
+        queue = self.channel_queues.get(channel_id)
+        if not queue:
             return
 
-        # Acquire lock for this channel
-        if channel_id not in self.processing_locks:
-            self.processing_locks[channel_id] = asyncio.Lock()
-
-        async with self.processing_locks[channel_id]:
-            # Check rate limit
-            last_send = self.last_send_times.get(channel_id)
-            if last_send:
-                time_since_last = (datetime.now(timezone.utc) - last_send).total_seconds()
-                if time_since_last < 1.0:  # 1 second rate limit
-                    return
+        # Pack as many queued embeds as fit into one message, highest priority first
+        batch = take_packed_batch_from_heap(queue)
 
-            # Get next message
-            message_entry = self.channel_queues[channel_id].pop(0)
+        try:
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                logger.warning(f"Channel {channel_id} not found, dropping {len(batch)} messages")
+                self._get_metrics(channel_id)['dropped'] += len(batch)
+                await self._acknowledge(batch)
+                return
+
+            # Send message
+            await channel.send(**build_send_kwargs(batch))
+            self.last_send_times[channel_id] = datetime.now(timezone.utc)
+            self._record_latency(channel_id, batch)
+            await self._acknowledge(batch)
+
+            # Reset error count on success
+            self.error_counts[channel_id] = 0
+
+            logger.debug(f"Successfully sent {len(batch)} queued messages to channel {channel_id}")
+
+        except discord.HTTPException as e:
+            if e.status == 429:  # Rate limited
+                # Re-queue the batch, the worker waits for the bucket reset
+                reset_after = self._apply_rate_limit_headers(channel_id, e)
+                await self._acknowledge(self._requeue_batch(channel_id, batch))
+                logger.debug(f"Rate limited, re-queued {len(batch)} messages for channel {channel_id} (reset in {reset_after:.2f}s)")
+            elif e.status == 403:  # Forbidden
+                logger.warning(f"No permission to send to channel {channel_id}")
+                self._get_metrics(channel_id)['dropped'] += len(batch)
+                await self._acknowledge(batch)
+            elif e.status == 404:  # Not found
+                logger.warning(f"Channel {channel_id} not found")
+                self._get_metrics(channel_id)['dropped'] += len(batch)
+                await self._acknowledge(batch)
+            else:
+                logger.error(f"HTTP error sending to channel {channel_id}: {e}")
+                self._get_metrics(channel_id)['dropped'] += len(batch)
+                await self._acknowledge(batch)
 
-            try:
-                channel = self.bot.get_channel(channel_id)
-                if not channel:
-                    logger.warning(f"Channel {channel_id} not found, dropping message")
-                    return
-
-                # Prepare send arguments
-                send_kwargs = {}
-                if message_entry['content']:
-                    send_kwargs['content'] = message_entry['content']
-                if message_entry['embed']:
-                    send_kwargs['embed'] = message_entry['embed']
-                if message_entry['file']:
-                    send_kwargs['file'] = message_entry['file']
-
-                # Send message
-                await channel.send(**send_kwargs)
-                self.last_send_times[channel_id] = datetime.now(timezone.utc)
-
-                # Reset error count on success
-                self.error_counts[channel_id] = 0
-
-                logger.debug(f"Successfully sent message to channel {channel_id}")
-
-            except discord.HTTPException as e:
-                if e.status == 429:  # Rate limited
-                    # Re-queue the message with increased retry count
-                    message_entry['retries'] += 1
-                    if message_entry['retries'] < 3:
-                        self.channel_queues[channel_id].insert(0, message_entry)
-                        logger.debug(f"Rate limited, re-queued message for channel {channel_id}")
-                    else:
-                        logger.warning(f"Dropping message for channel {channel_id} after max retries")
-                elif e.status == 403:  # Forbidden
-                    logger.warning(f"No permission to send to channel {channel_id}")
-                elif e.status == 404:  # Not found
-                    logger.warning(f"Channel {channel_id} not found")
-                else:
-                    logger.error(f"HTTP error sending to channel {channel_id}: {e}")
-
-            except Exception as e:
-                logger.error(f"Unexpected error sending to channel {channel_id}: {e}")
-                message_entry['retries'] += 1
-                if message_entry['retries'] < 3:
-                    self.channel_queues[channel_id].insert(0, message_entry)
+        except Exception as e:
+            logger.error(f"Unexpected error sending to channel {channel_id}: {e}")
+            await self._acknowledge(self._requeue_batch(channel_id, batch))
+            raise
+
+    def _requeue_batch(self, channel_id: int, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Put a failed batch back on the heap, dropping entries out of retries.
+
+        Returns:
+            The dropped entries
+        """
+        dropped = []
+        for message_entry in batch:
+            message_entry['retries'] += 1
+            if message_entry['retries'] < self.MAX_RETRIES:
+                self._push(channel_id, message_entry)
+            else:
+                self._get_metrics(channel_id)['dropped'] += 1
+                dropped.append(message_entry)
+                logger.warning(f"Dropping message for channel {channel_id} after max retries")
+        return dropped
 
     async def flush_all_queues(self):
-        """Flush all pending messages immediately"""
+        """Wait for every queued message to be sent (for shutdown)"""
         try:
             logger.info("Flushing all rate limiter queues...")
 
-            for channel_id in list(self.channel_queues.keys()):
-                try:
-                    while self.channel_queues.get(channel_id, []):
-                        await self._process_channel_queue(channel_id)
-                        await asyncio.sleep(0.1)  # Small delay between messages
-                except Exception as e:
-                    logger.error(f"Error flushing queue for channel {channel_id}: {e}")
+            for channel_id, queue in list(self.channel_queues.items()):
+                worker = self._workers.get(channel_id)
+                if queue and (worker is None or worker.done()):
+                    self._workers[channel_id] = asyncio.create_task(self._channel_worker(channel_id))
+
+            workers = list(self._workers.values())
+            if workers:
+                await asyncio.gather(*workers, return_exceptions=True)
 
             logger.info("Rate limiter queue flush completed")
 
@@ -239,24 +470,29 @@ class AdvancedRateLimiter:
             logger.error(f"Error flushing rate limiter queues: {e}")
 
     def get_queue_status(self) -> Dict[str, Any]:
-        """Get current queue status for monitoring"""
+        """Get current queue status and per-channel metrics for monitoring"""
         try:
             total_queued = sum(len(queue) for queue in self.channel_queues.values())
             channel_stats = {}
 
-            for channel_id, queue in self.channel_queues.items():
+            for channel_id, metrics in self.channel_metrics.items():
+                bucket = self.channel_buckets.get(channel_id, {})
                 channel_stats[channel_id] = {
-                    'queued_messages': len(queue),
+                    'queued_messages': len(self.channel_queues.get(channel_id, [])),
                     'error_count': self.error_counts.get(channel_id, 0),
-                    'last_send': self.last_send_times.get(channel_id)
+                    'last_send': self.last_send_times.get(channel_id),
+                    'bucket_remaining': bucket.get('remaining'),
+                    'worker_active': channel_id in self._workers,
+                    **metrics
                 }
 
             return {
                 'total_queued': total_queued,
-                'active_channels': len(self.channel_queues),
+                'active_channels': len(self._workers),
+                'global_tokens': round(self.global_bucket.tokens, 2),
                 'channel_stats': channel_stats
             }
 
         except Exception as e:
             logger.error(f"Error getting queue status: {e}")
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
@@ -0,0 +1,125 @@
+"""
+Emerald's Killfeed - Asset Registry
+Embed thumbnails preloaded into memory, with optional reuse of uploaded CDN URLs
+"""
+
+import io
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class AssetRegistry:
+    """
+    In-memory registry for the PNGs in ./assets:
+    - Files are read from disk once, every send gets a fresh discord.File over the cached bytes
+    - Optionally each asset is uploaded once to a CDN channel and embeds point at that URL,
+      so feed messages carry no attachment at all
+    """
+
+    # Discord signs attachment URLs and they expire after about a day
+    CDN_URL_MAX_AGE = 20 * 3600
+    MAX_FILES_PER_MESSAGE = 10
+
+    def __init__(self, assets_path: Path = Path('./assets')):
+        self.assets_path = assets_path
+        self._assets: Dict[str, bytes] = {}
+        self._cdn_urls: Dict[str, Tuple[str, float]] = {}
+
+    def load(self) -> int:
+        """Read every PNG in the assets directory into memory"""
+        loaded = 0
+        for path in sorted(self.assets_path.glob('*.png')):
+            try:
+                self._assets[path.name] = path.read_bytes()
+                loaded += 1
+            except OSError as e:
+                logger.error(f"Failed to load asset {path.name}: {e}")
+
+        logger.info(f"🖼️ Loaded {loaded} assets into memory")
+        return loaded
+
+    def has(self, name: str) -> bool:
+        """Check if a filename is one of the assets"""
+        return name in self._assets or (self.assets_path / name).is_file()
+
+    def get_bytes(self, name: str) -> Optional[bytes]:
+        """Get an asset's bytes, reading it from disk on first use if it was not preloaded"""
+        data = self._assets.get(name)
+        if data is None:
+            try:
+                data = (self.assets_path / name).read_bytes()
+                self._assets[name] = data
+            except OSError as e:
+                logger.error(f"Asset {name} not found: {e}")
+                return None
+        return data
+
+    def file(self, name: str) -> Optional[discord.File]:
+        """Get a fresh discord.File for an asset (a File can only be sent once)"""
+        data = self.get_bytes(name)
+        if data is None:
+            return None
+        return discord.File(io.BytesIO(data), filename=name)
+
+    def cdn_url(self, name: str) -> Optional[str]:
+        """Get the uploaded URL for an asset while it is still valid"""
+        cached = self._cdn_urls.get(name)
+        if cached and time.monotonic() - cached[1] < self.CDN_URL_MAX_AGE:
+            return cached[0]
+        return None
+
+    def thumbnail(self, embed: discord.Embed, name: str) -> Optional[discord.File]:
+        """
+        Set an asset as the embed thumbnail.
+
+        Returns:
+            The attachment to send with the embed, or None when the CDN URL is used
+        """
+        url = self.cdn_url(name)
+        if url:
+            embed.set_thumbnail(url=url)
+            return None
+
+        embed.set_thumbnail(url=f"attachment://{name}")
+        return self.file(name)
+
+    async def publish(self, channel: discord.abc.Messageable) -> int:
+        """
+        Upload every loaded asset to a channel once and remember the attachment URLs.
+
+        Call again before CDN_URL_MAX_AGE passes to refresh the signed URLs.
+
+        Returns:
+            Number of assets published
+        """
+        names = sorted(self._assets)
+        published = 0
+
+        for start in range(0, len(names), self.MAX_FILES_PER_MESSAGE):
+            batch = names[start:start + self.MAX_FILES_PER_MESSAGE]
+            try:
+                message = await channel.send(files=[self.file(name) for name in batch])
+                uploaded_at = time.monotonic()
+                for attachment in message.attachments:
+                    self._cdn_urls[attachment.filename] = (attachment.url, uploaded_at)
+                    published += 1
+            except Exception as e:
+                logger.error(f"Failed to publish assets {batch}: {e}")
+
+        logger.info(f"☁️ Published {published} assets to CDN")
+        return published
+
+
+_registry: Optional[AssetRegistry] = None
+
+def get_asset_registry() -> AssetRegistry:
+    """Get the process-wide asset registry"""
+    global _registry
+    if _registry is None:
+        _registry = AssetRegistry()
+    return _registry
@@ -11,6 +11,8 @@ from typing import Dict, List, Any, Optional
 from collections import defaultdict, deque
 import discord
 
+from bot.utils.message_packer import take_packed_batch, build_send_kwargs
+
 logger = logging.getLogger(__name__)
 
 class BatchSender:
@@ -20,10 +22,12 @@ class BatchSender:
     - Channel-specific queuing
     - Automatic flushing based on time and count
     - Rate limit awareness
+    - Optional OutboundJournal so queued messages survive a restart
     """
 
-    def __init__(self, bot):
+    def __init__(self, bot, journal=None):
         self.bot = bot
+        self.journal = journal
         
         # Batching configuration
         self.MAX_BATCH_SIZE = 10
@@ -42,12 +46,17 @@ class BatchSender:
                           priority: str = "normal"):
         """Queue a message for batching"""
         try:
+            journal_id = None
+            if self.journal:
+                journal_id = await self.journal.record(channel_id, embed, file, content)
+
             message_data = {
                 'embed': embed,
                 'file': file,
                 'content': content,
                 'priority': priority,
-                'timestamp': time.time()
+                'timestamp': time.time(),
+                'journal_id': journal_id
             }
             
             self.channel_queues[channel_id].append(message_data)
@@ -78,6 +87,7 @@ class BatchSender:
             channel = self.bot.get_channel(channel_id)
             if not channel:
                 logger.warning(f"Channel {channel_id} not found, clearing queue")
+                await self._acknowledge(self.channel_queues[channel_id])
                 self.channel_queues[channel_id].clear()
                 return
             
@@ -85,35 +95,46 @@ class BatchSender:
             self.channel_queues[channel_id].clear()
             self.channel_last_flush[channel_id] = time.time()
             
-            # Send messages with proper rate limiting
-            for message_data in messages:
+            # Send messages packed up to 10 embeds per message
+            pending = messages.copy()
+            sends = 0
+            while pending:
+                batch = take_packed_batch(pending)
+                kwargs = build_send_kwargs(batch)
+                if not kwargs:  # Only send if there's something to send
+                    continue
                 try:
-                    kwargs = {}
-                    if message_data['embed']:
-                        kwargs['embed'] = message_data['embed']
-                    if message_data['file']:
-                        kwargs['file'] = message_data['file']
-                    if message_data['content']:
-                        kwargs['content'] = message_data['content']
-                    
-                    if kwargs:  # Only send if there's something to send
-                        await channel.send(**kwargs)
+                    await channel.send(**kwargs)
+                    sends += 1
+                    await self._acknowledge(batch)
+                    if pending:
                         await asyncio.sleep(0.1)  # Small delay between messages
-                    
+
                 except discord.HTTPException as e:
                     if e.status == 429:  # Rate limited
                         logger.warning(f"Rate limited on channel {channel_id}")
+                        if self.journal:
+                            # Keep journaled messages for the next flush instead of losing them
+                            self.channel_queues[channel_id].extend(batch + pending)
+                            break
                         await asyncio.sleep(1)
                     else:
                         logger.error(f"HTTP error sending message: {e}")
+                        await self._acknowledge(batch)
                 except Exception as e:
                     logger.error(f"Error sending message: {e}")
-            
-            logger.debug(f"Flushed {len(messages)} messages to channel {channel_id}")
+                    await self._acknowledge(batch)
+
+            logger.debug(f"Flushed {len(messages)} messages to channel {channel_id} in {sends} sends")
             
         except Exception as e:
             logger.error(f"Error flushing channel {channel_id}: {e}")
 
+    async def _acknowledge(self, batch: List[Dict[str, Any]]):
+        """Remove sent or dropped messages from the journal"""
+        if self.journal:
+            await self.journal.acknowledge([message_data.get('journal_id') for message_data in batch])
+
     async def _periodic_flush(self):
         """Periodically flush channels based on time"""
         while True:
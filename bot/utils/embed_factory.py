@@ -10,6 +10,8 @@ import logging
 import random
 from typing import Dict, Any, Optional, Tuple
 
+from bot.utils.asset_registry import get_asset_registry
+
 logger = logging.getLogger(__name__)
 
 class EmbedFactory:
@@ -342,8 +344,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            connections_file = discord.File("./assets/Connections.png", filename="Connections.png")
-            embed.set_thumbnail(url="attachment://Connections.png")
+            connections_file = get_asset_registry().thumbnail(embed, "Connections.png")
 
             return embed, connections_file
 
@@ -388,8 +389,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            mission_file = discord.File("./assets/Mission.png", filename="Mission.png")
-            embed.set_thumbnail(url="attachment://Mission.png")
+            mission_file = get_asset_registry().thumbnail(embed, "Mission.png")
 
             return embed, mission_file
 
@@ -416,8 +416,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            airdrop_file = discord.File("./assets/Airdrop.png", filename="Airdrop.png")
-            embed.set_thumbnail(url="attachment://Airdrop.png")
+            airdrop_file = get_asset_registry().thumbnail(embed, "Airdrop.png")
 
             return embed, airdrop_file
 
@@ -444,8 +443,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            helicrash_file = discord.File("./assets/Helicrash.png", filename="Helicrash.png")
-            embed.set_thumbnail(url="attachment://Helicrash.png")
+            helicrash_file = get_asset_registry().thumbnail(embed, "Helicrash.png")
 
             return embed, helicrash_file
 
@@ -472,8 +470,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            trader_file = discord.File("./assets/Trader.png", filename="Trader.png")
-            embed.set_thumbnail(url="attachment://Trader.png")
+            trader_file = get_asset_registry().thumbnail(embed, "Trader.png")
 
             return embed, trader_file
 
@@ -497,8 +494,7 @@ class EmbedFactory:
                     title = random.choice(EmbedFactory.FALLING_TITLES)
                     color = EmbedFactory.COLORS['falling']
                     themed_description = random.choice(EmbedFactory.FALLING_MESSAGES)
-                    asset_file = discord.File("./assets/Falling.png", filename="Falling.png")
-                    thumbnail_url = "attachment://Falling.png"
+                    asset_name = "Falling.png"
                     cause_display = "**Falling** • Physics Lesson"
                     status_display = "**KIA - FALLING**"
                 else:
@@ -506,8 +502,7 @@ class EmbedFactory:
                     title = random.choice(EmbedFactory.SUICIDE_TITLES)
                     color = EmbedFactory.COLORS['suicide']
                     themed_description = random.choice(EmbedFactory.SUICIDE_MESSAGES)
-                    asset_file = discord.File("./assets/Suicide.png", filename="Suicide.png")
-                    thumbnail_url = "attachment://Suicide.png"
+                    asset_name = "Suicide.png"
                     cause_display = "**Menu Suicide** • Non-Combat Loss"
                     status_display = "**KIA - INTERNAL**"
 
@@ -521,7 +516,7 @@ class EmbedFactory:
                 embed.add_field(name=status_display, value=cause_display, inline=True)
                 embed.add_field(name="**INCIDENT REPORT**", value=themed_description, inline=False)
 
-                embed.set_thumbnail(url=thumbnail_url)
+                asset_file = get_asset_registry().thumbnail(embed, asset_name)
 
             else:
                 # PVP KILL EMBED
@@ -544,8 +539,7 @@ class EmbedFactory:
                 kill_message = random.choice(EmbedFactory.KILL_MESSAGES)
                 embed.add_field(name="**COMBAT REPORT**", value=kill_message, inline=False)
 
-                asset_file = discord.File("./assets/Killfeed.png", filename="Killfeed.png")
-                embed.set_thumbnail(url="attachment://Killfeed.png")
+                asset_file = get_asset_registry().thumbnail(embed, "Killfeed.png")
 
             embed.set_footer(text="Powered by Emerald")
 
@@ -579,13 +573,12 @@ class EmbedFactory:
 
             thumbnail_url = embed_data.get('thumbnail_url', 'attachment://Leaderboard.png')
             if 'WeaponStats.png' in thumbnail_url:
-                asset_file = discord.File("./assets/WeaponStats.png", filename="WeaponStats.png")
+                asset_file = get_asset_registry().thumbnail(embed, "WeaponStats.png")
             elif 'Faction.png' in thumbnail_url:
-                asset_file = discord.File("./assets/Faction.png", filename="Faction.png")
+                asset_file = get_asset_registry().thumbnail(embed, "Faction.png")
             else:
-                asset_file = discord.File("./assets/Leaderboard.png", filename="Leaderboard.png")
+                asset_file = get_asset_registry().thumbnail(embed, "Leaderboard.png")
 
-            embed.set_thumbnail(url=thumbnail_url)
             embed.set_footer(text="Powered by Emerald")
 
             return embed, asset_file
@@ -641,8 +634,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            main_file = discord.File("./assets/WeaponStats.png", filename="WeaponStats.png")
-            embed.set_thumbnail(url="attachment://WeaponStats.png")
+            main_file = get_asset_registry().thumbnail(embed, "WeaponStats.png")
 
             return embed, main_file
 
@@ -670,8 +662,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
-            embed.set_thumbnail(url="attachment://Bounty.png")
+            bounty_file = get_asset_registry().thumbnail(embed, "Bounty.png")
 
             return embed, bounty_file
 
@@ -702,8 +693,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            bounty_file = discord.File("./assets/Bounty.png", filename="Bounty.png")
-            embed.set_thumbnail(url="attachment://Bounty.png")
+            bounty_file = get_asset_registry().thumbnail(embed, "Bounty.png")
 
             return embed, bounty_file
 
@@ -730,8 +720,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            faction_file = discord.File("./assets/Faction.png", filename="Faction.png")
-            embed.set_thumbnail(url="attachment://Faction.png")
+            faction_file = get_asset_registry().thumbnail(embed, "Faction.png")
 
             return embed, faction_file
 
@@ -758,8 +747,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
-            embed.set_thumbnail(url="attachment://main.png")
+            main_file = get_asset_registry().thumbnail(embed, "main.png")
 
             return embed, main_file
 
@@ -784,8 +772,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
-            embed.set_thumbnail(url="attachment://main.png")
+            main_file = get_asset_registry().thumbnail(embed, "main.png")
 
             return embed, main_file
 
@@ -806,8 +793,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
-            embed.set_thumbnail(url="attachment://main.png")
+            main_file = get_asset_registry().thumbnail(embed, "main.png")
 
             return embed, main_file
 
@@ -832,8 +818,7 @@ class EmbedFactory:
 
             embed.set_footer(text="Powered by Emerald")
 
-            main_file = discord.File("./assets/main.png", filename="main.png")
-            embed.set_thumbnail(url="attachment://main.png")
+            main_file = get_asset_registry().thumbnail(embed, "main.png")
 
             return embed, main_file
 
@@ -846,12 +831,11 @@ class EmbedFactory:
                 timestamp=datetime.now(timezone.utc)
             )
             try:
-                fallback_file = discord.File("./assets/main.png", filename="main.png")
+                fallback_file = get_asset_registry().file("main.png")
                 return embed, fallback_file
             except Exception as file_error:
                 logger.error(f"Failed to load fallback file: {file_error}")
-                fallback_file = discord.File("./assets/main.png", filename="main.png")
-                return embed, fallback_file
+                return embed, None
 
     # Legacy compatibility methods (unchanged)
     @staticmethod
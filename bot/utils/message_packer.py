@@ -0,0 +1,120 @@
+"""
+Emerald's Killfeed - Message Packer
+Packs queued embeds for one channel into as few Discord messages as the API limits allow
+"""
+
+import heapq
+from typing import Any, Callable, Dict, List, Tuple
+
+from bot.utils.asset_registry import get_asset_registry
+
+# Discord API limits per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_FILES_PER_MESSAGE = 10
+MAX_CONTENT_LENGTH = 2000
+
+def _embed_length(entry: Dict[str, Any]) -> int:
+    embed = entry.get('embed')
+    return len(embed) if embed else 0
+
+def _take_packed(peek: Callable[[], Dict[str, Any]], pop: Callable[[], Dict[str, Any]],
+                 has_more: Callable[[], bool]) -> List[Dict[str, Any]]:
+    registry = get_asset_registry()
+    batch: List[Dict[str, Any]] = []
+    embeds = 0
+    embed_chars = 0
+    asset_names = set()
+    files = 0
+    content_length = 0
+
+    while has_more():
+        entry = peek()
+        entry_embeds = 1 if entry.get('embed') else 0
+        entry_chars = _embed_length(entry)
+        file = entry.get('file')
+        is_asset = file is not None and registry.has(file.filename)
+        new_file = file is not None and not (is_asset and file.filename in asset_names)
+        content = entry.get('content') or ''
+
+        if batch:
+            if embeds + entry_embeds > MAX_EMBEDS_PER_MESSAGE:
+                break
+            if embed_chars + entry_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            if new_file and files >= MAX_FILES_PER_MESSAGE:
+                break
+            if content and content_length + len(content) + 1 > MAX_CONTENT_LENGTH:
+                break
+
+        batch.append(pop())
+        embeds += entry_embeds
+        embed_chars += entry_chars
+        if new_file:
+            files += 1
+            if is_asset:
+                asset_names.add(file.filename)
+        if content:
+            content_length += len(content) + (1 if content_length else 0)
+
+    return batch
+
+def take_packed_batch(queue: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pop the longest run of queued entries from the front of a queue that fits in one message.
+
+    Entries are dicts with optional 'embed', 'file' and 'content' keys. Order is preserved:
+    packing stops at the first entry that would break a limit. At least one entry is
+    always taken, so an oversized entry is still sent on its own.
+
+    Returns:
+        The entries to send together
+    """
+    return _take_packed(lambda: queue[0], lambda: queue.pop(0), lambda: bool(queue))
+
+def take_packed_batch_from_heap(heap: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    """
+    Same as take_packed_batch for a heapq of tuples whose last item is the entry,
+    taking entries in heap order.
+    """
+    return _take_packed(lambda: heap[0][-1], lambda: heapq.heappop(heap)[-1], lambda: bool(heap))
+
+def build_send_kwargs(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build channel.send keyword arguments for a packed batch.
+
+    Asset attachments are de-duplicated by filename: every embed thumbnail pointing
+    at attachment://Killfeed.png resolves to the same single upload. Any other file
+    is its own attachment, even if another one has the same name.
+
+    Called once per send attempt. A sent discord.File is left at the end of its
+    buffer, so assets are rebuilt from the asset registry each time and any other
+    file is rewound, otherwise a retried batch would upload empty attachments.
+    """
+    embeds = [entry['embed'] for entry in batch if entry.get('embed')]
+
+    registry = get_asset_registry()
+    assets = {}
+    files = []
+    for entry in batch:
+        file = entry.get('file')
+        if file is None:
+            continue
+        if registry.has(file.filename):
+            if file.filename not in assets:
+                assets[file.filename] = registry.file(file.filename)
+                files.append(assets[file.filename])
+        else:
+            file.reset()
+            files.append(file)
+
+    contents = [entry['content'] for entry in batch if entry.get('content')]
+
+    kwargs: Dict[str, Any] = {}
+    if contents:
+        kwargs['content'] = "\n".join(contents)
+    if embeds:
+        kwargs['embeds'] = embeds
+    if files:
+        kwargs['files'] = files
+    return kwargs
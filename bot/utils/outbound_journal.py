@@ -0,0 +1,90 @@
+"""
+Emerald's Killfeed - Outbound Message Journal
+Durable copy of queued Discord messages so feed output survives restarts
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import discord
+
+from bot.utils.asset_registry import get_asset_registry
+
+logger = logging.getLogger(__name__)
+
+class OutboundJournal:
+    """
+    Write-ahead journal for outbound messages, stored in MongoDB:
+    - A message is journaled before it is queued in memory
+    - Sent or finally dropped messages are acknowledged with one delete per send
+    - Whatever is still journaled at startup is replayed into the send scheduler
+
+    Embeds are stored as their dict payload. Attachments are stored by filename and
+    rebuilt from the asset registry, which covers every file the feeds attach.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    async def record(self, channel_id: int, embed: Optional[discord.Embed] = None,
+                     file: Optional[discord.File] = None, content: Optional[str] = None,
+                     priority: int = 2) -> Optional[str]:
+        """
+        Journal a message before it is queued.
+
+        Returns:
+            The journal ID to acknowledge once the message is sent, or None if the
+            journal write failed (the message is still queued in memory)
+        """
+        journal_id = uuid.uuid4().hex
+        document = {
+            '_id': journal_id,
+            'channel_id': int(channel_id),
+            'embed': embed.to_dict() if embed else None,
+            'file': file.filename if file else None,
+            'content': content,
+            'priority': priority,
+            'queued_at': datetime.now(timezone.utc)
+        }
+
+        if await self.db_manager.journal_outbound_message(document):
+            return journal_id
+        return None
+
+    async def acknowledge(self, journal_ids: List[Optional[str]]):
+        """Remove delivered (or given up) messages from the journal"""
+        journal_ids = [journal_id for journal_id in journal_ids if journal_id]
+        if journal_ids:
+            await self.db_manager.acknowledge_outbound_messages(journal_ids)
+
+    async def load(self) -> List[Dict[str, Any]]:
+        """
+        Load unacknowledged messages in queue order with their embeds and files rebuilt.
+
+        Returns:
+            Dicts with journal_id, channel_id, embed, file, content and priority
+        """
+        messages = []
+        unreadable = []
+        registry = get_asset_registry()
+
+        for document in await self.db_manager.load_outbound_messages():
+            try:
+                embed = discord.Embed.from_dict(document['embed']) if document.get('embed') else None
+                file = registry.file(document['file']) if document.get('file') else None
+                messages.append({
+                    'journal_id': document['_id'],
+                    'channel_id': document['channel_id'],
+                    'embed': embed,
+                    'file': file,
+                    'content': document.get('content'),
+                    'priority': document.get('priority', 2)
+                })
+            except Exception as e:
+                logger.error(f"Failed to restore journaled message {document.get('_id')}: {e}")
+                unreadable.append(document.get('_id'))
+
+        await self.acknowledge(unreadable)
+        return messages
@@ -0,0 +1,220 @@
+"""
+Emerald's Killfeed - Player Presence
+Per-server online and queue state with constant-time counts
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ServerKey = Tuple[int, str]
+PlayerKey = Tuple[int, str, str]
+
+class PlayerPresence:
+    """
+    Player presence indexed by (guild, server):
+    - lifecycle: player_id -> {name, platform, state, queued_at/joined_at/disconnected_at}
+    - sessions: player_id -> session data, online or recently offline
+    - online / queued: player ID sets, so counts are len() of a set
+    Resetting a server drops its entry, touching no other server.
+
+    Expirable entries (lifecycle records of players not online, offline sessions) are
+    kept in last-touch order with a monotonic timestamp, so pruning pops from the
+    oldest end and costs O(expired).
+    """
+
+    def __init__(self):
+        self.servers: Dict[ServerKey, Dict[str, Any]] = {}
+        self._guild_servers: Dict[int, Set[str]] = {}
+        self._lifecycle_touched: 'OrderedDict[PlayerKey, float]' = OrderedDict()
+        self._offline_touched: 'OrderedDict[PlayerKey, float]' = OrderedDict()
+
+    @staticmethod
+    def _key(guild_id, server_id) -> ServerKey:
+        return int(guild_id), str(server_id)
+
+    def _server(self, guild_id, server_id) -> Dict[str, Any]:
+        key = self._key(guild_id, server_id)
+        server = self.servers.get(key)
+        if server is None:
+            server = {'lifecycle': {}, 'sessions': {}, 'online': set(), 'queued': set()}
+            self.servers[key] = server
+            self._guild_servers.setdefault(key[0], set()).add(key[1])
+        return server
+
+    def _peek(self, guild_id, server_id) -> Optional[Dict[str, Any]]:
+        return self.servers.get(self._key(guild_id, server_id))
+
+    @staticmethod
+    def _touch(touched: 'OrderedDict[PlayerKey, float]', key: PlayerKey):
+        touched[key] = time.monotonic()
+        touched.move_to_end(key)
+
+    # State transitions
+
+    def queue(self, guild_id, server_id, player_id: str, name: str, platform: str, queued_at: str):
+        """Record a join request, the player counts as queued until they join"""
+        server = self._server(guild_id, server_id)
+        server['lifecycle'][player_id] = {
+            'name': name,
+            'platform': platform,
+            'state': 'queued',
+            'queued_at': queued_at
+        }
+        server['queued'].add(player_id)
+        self._touch(self._lifecycle_touched, (*self._key(guild_id, server_id), player_id))
+
+    def join(self, guild_id, server_id, player_id: str, session_data: Dict[str, Any]):
+        """Record a player joining, moving them from queued to online"""
+        server = self._server(guild_id, server_id)
+        lifecycle = server['lifecycle'].get(player_id)
+        if lifecycle is None:
+            lifecycle = {'name': session_data.get('player_name'), 'platform': session_data.get('platform')}
+            server['lifecycle'][player_id] = lifecycle
+        lifecycle['state'] = 'joined'
+        lifecycle['joined_at'] = session_data.get('joined_at')
+
+        server['sessions'][player_id] = session_data
+        server['queued'].discard(player_id)
+        server['online'].add(player_id)
+
+        # Online players never expire
+        key = (*self._key(guild_id, server_id), player_id)
+        self._lifecycle_touched.pop(key, None)
+        self._offline_touched.pop(key, None)
+
+    def disconnect(self, guild_id, server_id, player_id: str, left_at: str):
+        """Record a player leaving, their offline session is kept until pruned"""
+        server = self._server(guild_id, server_id)
+        lifecycle = server['lifecycle'].get(player_id)
+        if lifecycle is not None:
+            lifecycle['state'] = 'disconnected'
+            lifecycle['disconnected_at'] = left_at
+
+        session = server['sessions'].get(player_id)
+        if session is not None:
+            session['status'] = 'offline'
+            session['left_at'] = left_at
+
+        server['online'].discard(player_id)
+        server['queued'].discard(player_id)
+
+        key = (*self._key(guild_id, server_id), player_id)
+        if lifecycle is not None:
+            self._touch(self._lifecycle_touched, key)
+        if session is not None:
+            self._touch(self._offline_touched, key)
+
+    def restore_session(self, guild_id, server_id, player_id: str, session_data: Dict[str, Any]):
+        """Re-add an online session loaded from the database"""
+        server = self._server(guild_id, server_id)
+        server['sessions'][player_id] = session_data
+        server['online'].add(player_id)
+        self._offline_touched.pop((*self._key(guild_id, server_id), player_id), None)
+
+    # Lookups
+
+    def get_lifecycle(self, guild_id, server_id, player_id: str) -> Dict[str, Any]:
+        server = self._peek(guild_id, server_id)
+        return server['lifecycle'].get(player_id, {}) if server else {}
+
+    def get_session(self, guild_id, server_id, player_id: str) -> Dict[str, Any]:
+        server = self._peek(guild_id, server_id)
+        return server['sessions'].get(player_id, {}) if server else {}
+
+    def is_online(self, guild_id, server_id, player_id: str) -> bool:
+        server = self._peek(guild_id, server_id)
+        return bool(server) and player_id in server['online']
+
+    def online_count(self, guild_id, server_id) -> int:
+        server = self._peek(guild_id, server_id)
+        return len(server['online']) if server else 0
+
+    def queued_count(self, guild_id, server_id) -> int:
+        server = self._peek(guild_id, server_id)
+        return len(server['queued']) if server else 0
+
+    def guild_online_count(self, guild_id) -> int:
+        guild_id = int(guild_id)
+        return sum(
+            len(self.servers[(guild_id, server_id)]['online'])
+            for server_id in self._guild_servers.get(guild_id, ())
+        )
+
+    def total_online(self) -> int:
+        return sum(len(server['online']) for server in self.servers.values())
+
+    def online_by_guild(self) -> Dict[int, int]:
+        return {guild_id: self.guild_online_count(guild_id) for guild_id in self._guild_servers}
+
+    def iter_online_sessions(self, guild_id, server_id) -> Iterator[Dict[str, Any]]:
+        server = self._peek(guild_id, server_id)
+        if server:
+            for player_id in server['online']:
+                yield server['sessions'][player_id]
+
+    # Resets and pruning
+
+    def reset_server(self, guild_id, server_id):
+        """Forget all presence for one server (cold start), O(server size)"""
+        key = self._key(guild_id, server_id)
+        server = self.servers.pop(key, None)
+        if server is not None:
+            for player_id in server['lifecycle']:
+                self._lifecycle_touched.pop((*key, player_id), None)
+            for player_id in server['sessions']:
+                self._offline_touched.pop((*key, player_id), None)
+
+            guild_servers = self._guild_servers.get(key[0])
+            if guild_servers:
+                guild_servers.discard(key[1])
+                if not guild_servers:
+                    del self._guild_servers[key[0]]
+
+    def clear(self):
+        self.servers.clear()
+        self._guild_servers.clear()
+        self._lifecycle_touched.clear()
+        self._offline_touched.clear()
+
+    def entry_counts(self) -> Tuple[int, int]:
+        """Expirable (lifecycle, offline session) entries across all servers"""
+        return len(self._lifecycle_touched), len(self._offline_touched)
+
+    def prune(self, lifecycle_max_age: float, session_max_age: float) -> int:
+        """
+        Drop lifecycle records untouched for lifecycle_max_age seconds and offline
+        sessions older than session_max_age seconds. Online players are never dropped,
+        a queue entry that never turned into a join is.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        removed = 0
+
+        lifecycle_cutoff = now - lifecycle_max_age
+        while self._lifecycle_touched:
+            key, touched_at = next(iter(self._lifecycle_touched.items()))
+            if touched_at > lifecycle_cutoff:
+                break
+            self._lifecycle_touched.popitem(last=False)
+            server = self.servers.get(key[:2])
+            if server and server['lifecycle'].pop(key[2], None) is not None:
+                server['queued'].discard(key[2])
+                removed += 1
+
+        session_cutoff = now - session_max_age
+        while self._offline_touched:
+            key, touched_at = next(iter(self._offline_touched.items()))
+            if touched_at > session_cutoff:
+                break
+            self._offline_touched.popitem(last=False)
+            server = self.servers.get(key[:2])
+            if server and server['sessions'].pop(key[2], None) is not None:
+                removed += 1
+
+        return removed
@@ -0,0 +1,87 @@
+"""
+Emerald's Killfeed - Server Task Scheduler
+Runs per-server parser jobs concurrently with global and per-host limits
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class ServerTaskScheduler:
+    """
+    Concurrent per-server job runner for the parsers:
+    - At most max_concurrency servers are processed at once
+    - At most per_host_limit servers share one SFTP host at a time
+    - Every server gets its own deadline, a hung host is skipped for the cycle
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, per_host_limit: int = 2,
+                 server_timeout: float = 120.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.server_timeout = server_timeout
+
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        """Get the semaphore guarding a single SFTP host"""
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one server job under both limits and its own deadline"""
+        label = job.get('label', 'unknown')
+        host = job.get('host') or 'unknown'
+
+        async with self._global_limit:
+            async with self._host_limit(host):
+                started = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(job['run'](), timeout=self.server_timeout)
+                    return {'label': label, 'status': 'ok', 'result': result,
+                            'duration': time.monotonic() - started}
+                except asyncio.TimeoutError:
+                    logger.warning(f"⏱️ {self.name}: {label} on {host} exceeded {self.server_timeout:.0f}s, skipped this cycle")
+                    return {'label': label, 'status': 'timeout', 'result': None,
+                            'duration': time.monotonic() - started}
+                except Exception as e:
+                    logger.error(f"❌ {self.name}: {label} failed: {e}")
+                    return {'label': label, 'status': 'error', 'result': None,
+                            'duration': time.monotonic() - started}
+
+    async def run_all(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run all server jobs concurrently.
+
+        Args:
+            jobs: Dicts with 'label', 'host' and 'run' (a zero-argument coroutine factory)
+
+        Returns:
+            One result dict per job with label, status (ok/timeout/error), result and duration
+        """
+        if not jobs:
+            return []
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(self._run_job(job) for job in jobs))
+
+        timed_out = sum(1 for r in results if r['status'] == 'timeout')
+        failed = sum(1 for r in results if r['status'] == 'error')
+        slowest = max(results, key=lambda r: r['duration'])
+        logger.info(
+            f"⚡ {self.name}: {len(results)} servers in {time.monotonic() - started:.1f}s "
+            f"(slowest {slowest['label']} {slowest['duration']:.1f}s, {timed_out} timed out, {failed} failed)"
+        )
+
+        return results
+
+
+def server_job(label: str, host: str, run: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    """Build a job entry for ServerTaskScheduler.run_all"""
+    return {'label': label, 'host': host, 'run': run}
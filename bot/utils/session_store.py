@@ -0,0 +1,113 @@
+"""
+Emerald's Killfeed - Player Session Store
+Write-behind store for player sessions, flushed to MongoDB in bulk
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[int, str, str]
+
+class PlayerSessionStore:
+    """
+    Write-behind player session store:
+    - Online sessions are held in memory per (guild, server), which is authoritative
+    - Joins and disconnects only mark the player key dirty
+    - Sessions restored from the database at startup are held too, so a cold start reset removes them
+    - Dirty keys are written in one bulk_write per flush (end of parse cycle, timer, shutdown)
+    """
+
+    def __init__(self, db_manager, flush_interval: float = 30):
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval
+
+        self.sessions: Dict[Tuple[int, str], Dict[str, Dict[str, Any]]] = {}
+        self._dirty: Set[SessionKey] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _ensure_flush_task(self):
+        """Start the periodic flush on first write inside the event loop"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._periodic_flush())
+
+    def save(self, guild_id: int, server_id: str, player_id: str, session_data: Dict[str, Any]):
+        """Record an online session, persisted on the next flush"""
+        guild_id, server_id, player_id = int(guild_id), str(server_id), str(player_id)
+        self.sessions.setdefault((guild_id, server_id), {})[player_id] = session_data
+        self._dirty.add((guild_id, server_id, player_id))
+        self._ensure_flush_task()
+
+    def remove(self, guild_id: int, server_id: str, player_id: str):
+        """Drop a session, deleted from the database on the next flush"""
+        guild_id, server_id, player_id = int(guild_id), str(server_id), str(player_id)
+        server_sessions = self.sessions.get((guild_id, server_id))
+        if server_sessions:
+            server_sessions.pop(player_id, None)
+        self._dirty.add((guild_id, server_id, player_id))
+        self._ensure_flush_task()
+
+    def restore(self, guild_id: int, server_id: str, player_id: str, session_data: Dict[str, Any]):
+        """Hold a session loaded from the database, already persisted so it is not marked dirty"""
+        self.sessions.setdefault((int(guild_id), str(server_id)), {})[str(player_id)] = session_data
+
+    def reset_server(self, guild_id: int, server_id: str):
+        """Drop every session of a server (cold start), deleted from the database on the next flush"""
+        guild_id, server_id = int(guild_id), str(server_id)
+        server_sessions = self.sessions.pop((guild_id, server_id), None)
+        if server_sessions:
+            self._dirty.update((guild_id, server_id, player_id) for player_id in server_sessions)
+            self._ensure_flush_task()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._dirty)
+
+    async def flush(self) -> int:
+        """
+        Write all dirty sessions in one bulk_write.
+
+        Returns:
+            Number of session changes written
+        """
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+
+            dirty, self._dirty = self._dirty, set()
+            changes = [
+                (guild_id, server_id, player_id,
+                 self.sessions.get((guild_id, server_id), {}).get(player_id))
+                for guild_id, server_id, player_id in dirty
+            ]
+
+            if not await self.db_manager.write_player_sessions(changes):
+                # Keep them dirty, the latest in-memory state is retried on the next flush
+                self._dirty |= dirty
+                return 0
+
+            logger.debug(f"💾 Flushed {len(changes)} player session changes")
+            return len(changes)
+
+    async def _periodic_flush(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in periodic session flush: {e}")
+
+    async def close(self):
+        """Stop the timer and flush everything still pending (for shutdown)"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        flushed = await self.flush()
+        if self._dirty:
+            logger.warning(f"{len(self._dirty)} player session changes could not be flushed on shutdown")
+        else:
+            logger.info(f"Player session store flushed ({flushed} changes)")
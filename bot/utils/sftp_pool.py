@@ -0,0 +1,329 @@
+"""
+Emerald's Killfeed - Shared SFTP Connection Pool
+One process-wide pool of SSH connections and live SFTP client channels
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import asyncssh
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int, str]
+
+class SFTPConnectionPool:
+    """
+    Process-wide SFTP connection pool shared by every parser:
+    - Keyed by (host, port, username), one SSH session per key
+    - Reuses the live SFTP client channel instead of opening a subsystem per read
+    - Health checks idle channels and evicts connections unused past idle_timeout
+    - Counts borrows from sftp_session, a borrowed connection is never probed or evicted
+    - Tracks hit/miss counts and handshake latency
+    """
+
+    def __init__(self, idle_timeout: float = 300, health_check_interval: float = 60,
+                 connect_timeout: float = 30, max_retries: int = 3):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+
+        self._entries: Dict[PoolKey, Dict[str, Any]] = {}
+        self._locks: Dict[PoolKey, asyncio.Lock] = {}
+        self._janitor: Optional[asyncio.Task] = None
+
+        self.metrics: Dict[str, Any] = {
+            'hits': 0,
+            'misses': 0,
+            'handshakes': 0,
+            'handshake_failures': 0,
+            'evictions': 0,
+            'handshake_latency_total': 0.0,
+            'handshake_latency_max': 0.0
+        }
+
+    @staticmethod
+    def _pool_key(server_config: Dict[str, Any]) -> Optional[PoolKey]:
+        """Build the (host, port, username) key for a server config"""
+        host = server_config.get('host') or server_config.get('sftp_host')
+        username = server_config.get('username') or server_config.get('sftp_username')
+        port = server_config.get('port') or server_config.get('sftp_port') or 22
+
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = 22
+        if port <= 0:
+            port = 22  # Default SSH port
+
+        if not host or not username:
+            return None
+        return (host, port, username)
+
+    def _lock_for(self, key: PoolKey) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def _ensure_janitor(self):
+        """Start the idle eviction task on first use inside the event loop"""
+        if self._janitor is None or self._janitor.done():
+            self._janitor = asyncio.create_task(self._evict_idle_periodically())
+
+    async def _connect(self, key: PoolKey, password: str) -> Optional[asyncssh.SSHClientConnection]:
+        """Open a new SSH connection with retry/backoff, recording handshake latency"""
+        host, port, username = key
+
+        for attempt in range(1, self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                conn = await asyncio.wait_for(
+                    asyncssh.connect(
+                        host,
+                        port=port,
+                        username=username,
+                        password=password,
+                        known_hosts=None,  # Skip host key verification
+                        client_keys=None,  # No client keys needed with password auth
+                        preferred_auth='password,keyboard-interactive',
+                        server_host_key_algs=['ssh-rsa', 'rsa-sha2-256', 'rsa-sha2-512'],
+                        kex_algs=[
+                            'diffie-hellman-group14-sha256', 'diffie-hellman-group16-sha512',
+                            'ecdh-sha2-nistp256', 'ecdh-sha2-nistp384', 'ecdh-sha2-nistp521',
+                            'diffie-hellman-group18-sha512', 'diffie-hellman-group-exchange-sha256',
+                            'diffie-hellman-group14-sha1', 'diffie-hellman-group-exchange-sha1',
+                            'diffie-hellman-group1-sha1'
+                        ],
+                        encryption_algs=[
+                            'aes128-ctr', 'aes192-ctr', 'aes256-ctr',
+                            'aes128-gcm@openssh.com', 'aes256-gcm@openssh.com',
+                            'aes256-cbc', 'aes192-cbc', 'aes128-cbc'
+                        ],
+                        mac_algs=['hmac-sha2-256', 'hmac-sha2-512', 'hmac-sha1']
+                    ),
+                    timeout=self.connect_timeout
+                )
+
+                latency = time.monotonic() - started
+                self.metrics['handshakes'] += 1
+                self.metrics['handshake_latency_total'] += latency
+                self.metrics['handshake_latency_max'] = max(self.metrics['handshake_latency_max'], latency)
+                logger.info(f"✅ SFTP connected to {host}:{port} in {latency:.2f}s")
+                return conn
+
+            except asyncio.TimeoutError:
+                logger.warning(f"SFTP timeout on attempt {attempt}/{self.max_retries} to {host}:{port}")
+            except asyncssh.PermissionDenied:
+                logger.error(f"SFTP authentication failed for {host}:{port}")
+                # No point retrying with same credentials
+                break
+            except (asyncssh.Error, OSError) as e:
+                # Sanitize error to prevent credential exposure
+                safe_error = str(e).replace(password, "***").replace(username, "***")
+                logger.warning(f"SSH error on attempt {attempt}/{self.max_retries} to {host}:{port}: {safe_error}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(2 ** (attempt - 1))  # Exponential backoff
+
+        self.metrics['handshake_failures'] += 1
+        logger.error(f"❌ Failed to connect to SFTP {host}:{port}")
+        return None
+
+    async def _is_healthy(self, entry: Dict[str, Any]) -> bool:
+        """Check a pooled connection, probing the SFTP channel when it has been idle"""
+        conn = entry['connection']
+        if conn.is_closed():
+            return False
+
+        if entry['borrows'] > 0:
+            return True  # In use right now, a probe failing under load must not close it
+
+        if time.monotonic() - entry['last_health_check'] < self.health_check_interval:
+            return True
+
+        try:
+            await asyncio.wait_for(entry['sftp'].realpath('.'), timeout=5)
+            entry['last_health_check'] = time.monotonic()
+            return True
+        except Exception:
+            return False
+
+    def _close_entry(self, entry: Dict[str, Any]):
+        try:
+            entry['sftp'].exit()
+        except Exception:
+            pass
+        try:
+            if not entry['connection'].is_closed():
+                entry['connection'].close()
+        except Exception:
+            pass
+
+    async def get_sftp_client(self, server_config: Dict[str, Any]) -> Optional[asyncssh.SFTPClient]:
+        """
+        Get the pooled SFTP client for a server, connecting on a miss.
+
+        Args:
+            server_config: Dictionary containing host, port, username, password
+
+        Returns:
+            Live SFTP client shared with other callers, or None if connection fails
+        """
+        entry = await self._acquire(server_config)
+        return entry['sftp'] if entry else None
+
+    async def _acquire(self, server_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the pool entry for a server, connecting on a miss"""
+        key = self._pool_key(server_config)
+        password = server_config.get('password') or server_config.get('sftp_password')
+        if not key or not password:
+            logger.warning(f"Missing SFTP credentials for {server_config.get('_id')}")
+            return None
+
+        self._ensure_janitor()
+
+        async with self._lock_for(key):
+            entry = self._entries.get(key)
+            if entry:
+                if await self._is_healthy(entry):
+                    entry['last_used'] = time.monotonic()
+                    self.metrics['hits'] += 1
+                    return entry
+
+                logger.info(f"♻️ Replacing unhealthy SFTP connection to {key[0]}:{key[1]}")
+                self._close_entry(self._entries.pop(key))
+
+            self.metrics['misses'] += 1
+            conn = await self._connect(key, password)
+            if not conn:
+                return None
+
+            try:
+                sftp = await conn.start_sftp_client()
+            except Exception as e:
+                logger.error(f"Failed to start SFTP subsystem on {key[0]}:{key[1]}: {e}")
+                conn.close()
+                return None
+
+            now = time.monotonic()
+            self._entries[key] = {
+                'connection': conn,
+                'sftp': sftp,
+                'created_at': now,
+                'last_used': now,
+                'last_health_check': now,
+                'borrows': 0
+            }
+            return self._entries[key]
+
+    def invalidate(self, server_config: Dict[str, Any]):
+        """Drop a pooled connection after a transport failure"""
+        key = self._pool_key(server_config)
+        entry = self._entries.pop(key, None) if key else None
+        if entry:
+            self._close_entry(entry)
+            logger.debug(f"Invalidated SFTP connection to {key[0]}:{key[1]}")
+
+    @asynccontextmanager
+    async def sftp_session(self, server_config: Dict[str, Any]) -> AsyncIterator[Optional[asyncssh.SFTPClient]]:
+        """
+        Borrow the pooled SFTP client for a block of work.
+
+        The client stays open afterwards. While the block runs the connection counts
+        as borrowed, so neither idle eviction nor another caller's health check closes
+        it. Transport-level failures inside the block evict the connection so the next
+        caller reconnects.
+        """
+        entry = await self._acquire(server_config)
+        if entry is None:
+            yield None
+            return
+
+        entry['borrows'] += 1
+        try:
+            yield entry['sftp']
+        except (asyncssh.ConnectionLost, asyncssh.DisconnectError, asyncssh.ChannelOpenError, ConnectionError):
+            # Only drop the pool's entry if it is still the connection that failed
+            if self._entries.get(self._pool_key(server_config)) is entry:
+                self.invalidate(server_config)
+            raise
+        finally:
+            entry['borrows'] -= 1
+            entry['last_used'] = time.monotonic()
+
+    async def evict_idle(self):
+        """Close connections that have not been used within idle_timeout"""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            closed = False
+            try:
+                closed = entry['connection'].is_closed()
+            except Exception:
+                closed = True
+
+            if not closed and entry['borrows'] > 0:
+                continue  # Still in use by an sftp_session
+
+            if closed or now - entry['last_used'] > self.idle_timeout:
+                self._entries.pop(key, None)
+                self._close_entry(entry)
+                self.metrics['evictions'] += 1
+                logger.debug(f"Evicted idle SFTP connection to {key[0]}:{key[1]}")
+
+    async def _evict_idle_periodically(self):
+        while True:
+            try:
+                await asyncio.sleep(self.health_check_interval)
+                await self.evict_idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error evicting idle SFTP connections: {e}")
+
+    async def close_all(self):
+        """Close every pooled connection (for shutdown)"""
+        if self._janitor and not self._janitor.done():
+            self._janitor.cancel()
+        for key, entry in list(self._entries.items()):
+            self._close_entry(entry)
+        self._entries.clear()
+        logger.info("Closed all pooled SFTP connections")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics for monitoring"""
+        active = 0
+        for entry in self._entries.values():
+            try:
+                if not entry['connection'].is_closed():
+                    active += 1
+            except Exception:
+                pass
+
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        handshakes = self.metrics['handshakes']
+        return {
+            'pooled_connections': len(self._entries),
+            'active_connections': active,
+            'hits': self.metrics['hits'],
+            'misses': self.metrics['misses'],
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+            'handshakes': handshakes,
+            'handshake_failures': self.metrics['handshake_failures'],
+            'avg_handshake_latency': self.metrics['handshake_latency_total'] / handshakes if handshakes else 0.0,
+            'max_handshake_latency': self.metrics['handshake_latency_max'],
+            'evictions': self.metrics['evictions']
+        }
+
+
+_pool: Optional[SFTPConnectionPool] = None
+
+def get_sftp_pool() -> SFTPConnectionPool:
+    """Get the process-wide SFTP connection pool"""
+    global _pool
+    if _pool is None:
+        _pool = SFTPConnectionPool()
+    return _pool
@@ -0,0 +1,52 @@
+"""
+Emerald's Killfeed - Timestamp Parser
+Fast parsing of the fixed Deadside timestamp format used in logs and killfeed CSVs
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+@lru_cache(maxsize=4096)
+def _parse_to_second(prefix: str) -> Optional[datetime]:
+    """Parse the 19-character 'YYYY.MM.DD-HH.MM.SS' part of a timestamp
+
+    Burst logs repeat the same second many times, so results are memoized.
+    The 'YYYY-MM-DD HH:MM:SS' layout used by some CSV exports is accepted too.
+    """
+    date_sep = prefix[4]
+    time_sep = prefix[13]
+    if (date_sep not in '.-' or prefix[7] != date_sep or prefix[10] not in '- '
+            or time_sep not in '.:' or prefix[16] != time_sep):
+        return None
+
+    try:
+        return datetime(
+            int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+            int(prefix[11:13]), int(prefix[14:16]), int(prefix[17:19]),
+            tzinfo=timezone.utc
+        )
+    except ValueError:
+        return None
+
+def parse_deadside_timestamp(value: str) -> Optional[datetime]:
+    """
+    Parse a Deadside timestamp such as '2025.05.30-12.20.00' or '2025.05.30-12.20.00:123'.
+
+    Uses slicing and int conversion instead of strptime.
+
+    Returns:
+        Timezone-aware UTC datetime, or None if the value is not in that format
+    """
+    if len(value) < 19:
+        return None
+
+    parsed = _parse_to_second(value[:19])
+    if parsed is None or len(value) == 19:
+        return parsed
+
+    # Optional fractional part: ':mmm' in logs
+    fraction = value[20:]
+    if value[19] not in ':.' or not fraction.isdigit() or len(fraction) > 6:
+        return None
+    return parsed.replace(microsecond=int(fraction.ljust(6, '0')))
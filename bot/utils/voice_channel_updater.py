@@ -0,0 +1,248 @@
+"""
+Emerald's Killfeed - Voice Channel Updater
+Debounced player-count voice channel renames within Discord's rename budget
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+VOICE_CHANNEL_KEYS = ('voice_count', 'playercountvc', 'playercount')
+
+class VoiceChannelUpdater:
+    """
+    Coalescing updater for the live player-count voice channels:
+    - Parsers publish counts per (guild, server), only the latest desired name per channel is kept
+    - Discord allows 2 renames per channel per 10 minutes, renames are spent from that budget
+    - A rename is only issued when the rendered name differs from the channel's current name
+    - Every server in a guild renames its own configured channel
+    """
+
+    RENAME_LIMIT = 2
+    RENAME_WINDOW = 600.0
+    DEBOUNCE_SECONDS = 5.0
+    DEFAULT_MAX_PLAYERS = 60
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._desired: Dict[int, str] = {}
+        self._rename_times: Dict[int, Deque[float]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._in_flight: Dict[int, asyncio.Task] = {}
+        self._max_players: Dict[Tuple[int, str], Optional[int]] = {}
+        self._server_channels: Dict[Tuple[int, str], int] = {}
+
+    def set_max_players(self, guild_id: int, server_id: str, max_players: int):
+        """Record a server's MaxPlayerCount as parsed from its log"""
+        self._max_players[(int(guild_id), str(server_id))] = max_players
+
+    async def _get_max_players(self, guild_id: int, server_id: str, server_config: Dict[str, Any]) -> int:
+        key = (guild_id, server_id)
+        if key not in self._max_players:
+            stored = None
+            try:
+                server_info = await self.bot.db_manager.get_parser_state(guild_id, server_id, "server_info")
+                if server_info:
+                    stored = server_info.get('max_players')
+            except Exception as e:
+                logger.warning(f"Failed to get stored max players: {e}")
+            self._max_players[key] = stored
+
+        stored = self._max_players[key]
+        if stored and stored > 0:
+            return stored
+        return server_config.get('max_players', self.DEFAULT_MAX_PLAYERS)
+
+    @staticmethod
+    def _resolve_channel_id(guild_config: Dict[str, Any], server_id: str) -> Optional[int]:
+        """
+        Find the voice channel configured for a server.
+
+        Guild-wide settings (the 'default' server entry and the legacy channels map)
+        only apply to the guild's first server, so two servers never share a channel.
+        """
+        server_channels = guild_config.get('server_channels', {})
+        candidates = [server_channels.get(server_id)]
+
+        servers = guild_config.get('servers', [])
+        if servers and str(servers[0].get('_id', '')) == server_id:
+            candidates.append(server_channels.get('default'))
+            candidates.append(guild_config.get('channels'))
+
+        for channels in candidates:
+            if isinstance(channels, dict):
+                for voice_key in VOICE_CHANNEL_KEYS:
+                    if channels.get(voice_key):
+                        return channels[voice_key]
+        return None
+
+    @staticmethod
+    def render_name(server_name: str, active_players: int, queued_players: int, max_players: int) -> str:
+        """Build the voice channel name, within Discord's 100 character limit"""
+        server_name = server_name.replace(' Server', '').replace(' EU', '').replace(' US', '')
+
+        # Determine status emoji based on player count
+        status_emoji = "🟢"  # Green for healthy
+        if active_players == 0:
+            status_emoji = "🔴"  # Red for empty
+        elif active_players >= max_players:
+            status_emoji = "🔴"  # Red for full
+        elif active_players >= max_players * 0.8:
+            status_emoji = "🟡"  # Yellow for near full
+
+        queue_text = f" | {queued_players} in Queue" if queued_players > 0 else ""
+        new_name = f"{status_emoji} {server_name} | {active_players}/{max_players}{queue_text}"
+
+        if len(new_name) > 100:
+            # Truncate server name if needed
+            max_server_name_length = 100 - len(f"{status_emoji}  | {active_players}/{max_players}{queue_text}")
+            if max_server_name_length > 0:
+                new_name = f"{status_emoji} {server_name[:max_server_name_length]} | {active_players}/{max_players}{queue_text}"
+            else:
+                new_name = f"{status_emoji} Players: {active_players}/{max_players}"
+
+        return new_name
+
+    async def publish(self, guild_id: int, server_id: str, active_players: int, queued_players: int):
+        """Record a server's latest player counts, the channel is renamed once budget allows"""
+        try:
+            guild_id, server_id = int(guild_id), str(server_id)
+
+            guild_config = await self.bot.db_manager.get_guild(guild_id)
+            if not guild_config:
+                logger.debug(f"No guild config found for {guild_id}")
+                return
+
+            channel_id = self._resolve_channel_id(guild_config, server_id)
+            if not channel_id:
+                logger.debug(f"No voice channel configured for server {server_id} in guild {guild_id}")
+                return
+            self._server_channels[(guild_id, server_id)] = channel_id
+
+            server_config = next(
+                (server for server in guild_config.get('servers', []) if str(server.get('_id', '')) == server_id),
+                {}
+            )
+            max_players = await self._get_max_players(guild_id, server_id, server_config)
+            new_name = self.render_name(server_config.get('name', 'Server'), active_players, queued_players, max_players)
+
+            channel = self.bot.get_channel(channel_id)
+            if channel and channel.name == new_name:
+                # Counts went back to what is displayed: nothing to spend budget on
+                self._desired.pop(channel_id, None)
+                logger.debug(f"Voice channel already has correct name: {new_name}")
+                return
+
+            self._desired[channel_id] = new_name
+            if channel_id not in self._timers and channel_id not in self._in_flight:
+                self._schedule(channel_id, max(self.DEBOUNCE_SECONDS, self._rename_wait(channel_id)))
+
+        except Exception as e:
+            logger.error(f"Voice channel publish failed for {guild_id}/{server_id}: {e}")
+
+    def _rename_wait(self, channel_id: int) -> float:
+        """Seconds until the channel has a rename left in its budget"""
+        renames = self._rename_times.get(channel_id)
+        if not renames:
+            return 0.0
+
+        now = time.monotonic()
+        while renames and now - renames[0] >= self.RENAME_WINDOW:
+            renames.popleft()
+
+        if len(renames) < self.RENAME_LIMIT:
+            return 0.0
+        return self.RENAME_WINDOW - (now - renames[0])
+
+    def rename_budget(self, guild_id: int, server_id: str) -> Dict[str, Any]:
+        """Get the remaining rename budget of a server's voice channel"""
+        channel_id = self._server_channels.get((int(guild_id), str(server_id)))
+        if channel_id is None:
+            return {'channel_id': None, 'remaining': self.RENAME_LIMIT, 'resets_in': 0.0, 'pending_name': None}
+
+        wait = self._rename_wait(channel_id)
+        return {
+            'channel_id': channel_id,
+            'remaining': self.RENAME_LIMIT - len(self._rename_times.get(channel_id, ())),
+            'resets_in': wait,
+            'pending_name': self._desired.get(channel_id)
+        }
+
+    def _schedule(self, channel_id: int, delay: float):
+        loop = asyncio.get_running_loop()
+        self._timers[channel_id] = loop.call_later(delay, self._start_rename, channel_id)
+
+    def _start_rename(self, channel_id: int):
+        self._timers.pop(channel_id, None)
+        self._in_flight[channel_id] = asyncio.create_task(self._rename(channel_id))
+
+    async def _rename(self, channel_id: int):
+        """Apply the latest desired name, or wait for budget and try again"""
+        retry_after = None
+        try:
+            new_name = self._desired.get(channel_id)
+            if new_name is None:
+                return
+
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                logger.warning(f"Voice channel {channel_id} not found")
+                self._desired.pop(channel_id, None)
+                return
+
+            if channel.type != discord.ChannelType.voice:
+                logger.warning(f"Channel {channel_id} is not a voice channel")
+                self._desired.pop(channel_id, None)
+                return
+
+            if channel.name == new_name:
+                self._desired.pop(channel_id, None)
+                return
+
+            wait = self._rename_wait(channel_id)
+            if wait > 0:
+                retry_after = wait
+                return
+
+            try:
+                await channel.edit(name=new_name)
+                self._rename_times.setdefault(channel_id, deque()).append(time.monotonic())
+                if self._desired.get(channel_id) == new_name:
+                    del self._desired[channel_id]
+                logger.info(f"✅ Voice channel updated to: {new_name}")
+
+            except discord.HTTPException as e:
+                if e.status == 429:  # Rate limited
+                    headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                    try:
+                        retry_after = float(headers.get('Retry-After') or self.RENAME_WINDOW / self.RENAME_LIMIT)
+                    except (TypeError, ValueError):
+                        retry_after = self.RENAME_WINDOW / self.RENAME_LIMIT
+                    logger.warning(f"Rate limited updating voice channel, retrying in {retry_after:.0f}s")
+                else:
+                    logger.error(f"HTTP error updating voice channel: {e}")
+                    self._desired.pop(channel_id, None)
+
+        except Exception as e:
+            logger.error(f"Error editing voice channel {channel_id}: {e}")
+            self._desired.pop(channel_id, None)
+        finally:
+            self._in_flight.pop(channel_id, None)
+            if channel_id in self._desired:
+                # A newer name arrived during the edit, or the budget was spent
+                self._schedule(channel_id, max(retry_after or 0.0, self.DEBOUNCE_SECONDS, self._rename_wait(channel_id)))
+
+    def close(self):
+        """Cancel pending renames (for shutdown)"""
+        self._desired.clear()
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._in_flight.values():
+            task.cancel()
@@ -37,6 +37,7 @@ from bot.models.database import DatabaseManager
 from bot.parsers.killfeed_parser import KillfeedParser
 from bot.parsers.historical_parser import HistoricalParser
 from bot.parsers.unified_log_parser import UnifiedLogParser
+from bot.utils.asset_registry import get_asset_registry
 
 # Load environment variables (optional for Railway)
 load_dotenv()
@@ -307,25 +308,39 @@ class EmeraldKillfeedBot(commands.Bot):
             import traceback
             logger.error(f"Sync traceback: {traceback.format_exc()}")
 
-    async def cleanup_connections(self):
-        """Clean up AsyncSSH connections on shutdown with enhanced error recovery"""
-        try:
-            cleanup_tasks = []
-
-            # Killfeed parser cleanup
-            if hasattr(self, 'killfeed_parser') and self.killfeed_parser:
-                cleanup_tasks.append(self._cleanup_parser_connections(self.killfeed_parser, "killfeed"))
+    async def publish_assets(self):
+        """Upload thumbnails once to the CDN channel so feed embeds can link them instead of attaching"""
+        channel_id = os.getenv('ASSET_CDN_CHANNEL_ID')
+        if not channel_id:
+            return
 
-            # Unified log parser cleanup  
-            if hasattr(self, 'unified_log_parser') and self.unified_log_parser:
-                cleanup_tasks.append(self._cleanup_parser_connections(self.unified_log_parser, "unified_log"))
+        try:
+            channel = self.get_channel(int(channel_id))
+            if not channel:
+                logger.warning(f"⚠️ Asset CDN channel {channel_id} not found - thumbnails stay as attachments")
+                return
 
-            # Execute all cleanup tasks with timeout
-            if cleanup_tasks:
-                await asyncio.wait_for(
-                    asyncio.gather(*cleanup_tasks, return_exceptions=True),
-                    timeout=30
+            await get_asset_registry().publish(channel)
+
+            # Attachment URLs are signed and expire, refresh them well before that
+            if not self.scheduler.get_job('asset_cdn_refresh'):
+                self.scheduler.add_job(
+                    self.publish_assets,
+                    'interval',
+                    hours=12,
+                    id='asset_cdn_refresh',
+                    max_instances=1,
+                    coalesce=True
                 )
+        except Exception as e:
+            logger.error(f"Failed to publish assets: {e}")
+
+    async def cleanup_connections(self):
+        """Clean up AsyncSSH connections on shutdown with enhanced error recovery"""
+        try:
+            # All parsers share one SFTP pool, closing it closes every session
+            from bot.utils.sftp_pool import get_sftp_pool
+            await asyncio.wait_for(get_sftp_pool().close_all(), timeout=30)
 
             # Force cleanup of any remaining connections
             await self._force_cleanup_all_connections()
@@ -352,26 +367,6 @@ class EmeraldKillfeedBot(commands.Bot):
         except Exception as e:
             logger.error(f"Error in force cleanup: {e}")
 
-    async def _cleanup_parser_connections(self, parser, parser_name: str):
-        """Clean up connections for a specific parser"""
-        try:
-            if hasattr(parser, 'cleanup_sftp_connections'):
-                await parser.cleanup_sftp_connections()
-            elif hasattr(parser, 'sftp_connections'):
-                # Generic cleanup for parsers with sftp_connections
-                for pool_key, conn in list(parser.sftp_connections.items()):
-                    try:
-                        if hasattr(conn, 'is_closed') and not conn.is_closed():
-                            conn.close()
-                    except Exception as e:
-                        logger.debug(f"Error closing connection {pool_key}: {e}")
-                parser.sftp_connections.clear()
-
-            logger.debug(f"Cleaned up {parser_name} parser connections")
-
-        except Exception as e:
-            logger.error(f"Failed to cleanup {parser_name} parser connections: {e}")
-
     async def setup_database(self):
         """Setup MongoDB connection"""
         mongo_uri = os.getenv('MONGODB_URI') or os.getenv('MONGO_URI')
@@ -397,13 +392,43 @@ class EmeraldKillfeedBot(commands.Bot):
             await self.db_manager.initialize_indexes()
             logger.info("Database architecture initialized (PHASE 1)")
 
+            # Invalidate cached guild configs on change when the deployment supports change streams
+            self.db_manager.start_guild_change_stream()
+
+            # Premium checks are served from memory after this
+            await self.db_manager.load_premium_entitlements()
+
+            # Kills are checked against bounties from memory after this
+            await self.db_manager.load_active_bounties()
+
+            # Snapshots may predate kills ingested just before the restart
+            await self.db_manager.load_dirty_leaderboards()
+
+            # Optional durable outbound queue: queued feed messages survive restarts
+            outbound_journal = None
+            if os.getenv('DURABLE_OUTBOUND_QUEUE', 'false').lower() == 'true':
+                from bot.utils.outbound_journal import OutboundJournal
+                outbound_journal = OutboundJournal(self.db_manager)
+
             # Initialize batch sender for rate limit management
             from bot.utils.batch_sender import BatchSender
-            self.batch_sender = BatchSender(self)
+            self.batch_sender = BatchSender(self, journal=outbound_journal)
 
             # Initialize advanced rate limiter
             from bot.utils.advanced_rate_limiter import AdvancedRateLimiter
-            self.advanced_rate_limiter = AdvancedRateLimiter(self)
+            self.advanced_rate_limiter = AdvancedRateLimiter(self, journal=outbound_journal)
+
+            # Re-queue anything journaled before the last shutdown
+            if outbound_journal:
+                await self.advanced_rate_limiter.replay_journal()
+
+            # Initialize write-behind player session store
+            from bot.utils.session_store import PlayerSessionStore
+            self.session_store = PlayerSessionStore(self.db_manager)
+
+            # Initialize debounced player-count voice channel updater
+            from bot.utils.voice_channel_updater import VoiceChannelUpdater
+            self.voice_channel_updater = VoiceChannelUpdater(self)
 
             # Initialize parsers (PHASE 2) - Data parsers for killfeed & log events
             self.killfeed_parser = KillfeedParser(self)
@@ -411,7 +436,7 @@ class EmeraldKillfeedBot(commands.Bot):
             self.unified_log_parser = UnifiedLogParser(self)
             # Ensure consistent parser access
             self.log_parser = self.unified_log_parser  # Legacy compatibility
-            logger.info("Parsers initialized (PHASE 2) + Unified Log Parser + Advanced Rate Limiter + Batch Sender")
+            logger.info("Parsers initialized (PHASE 2) + Unified Log Parser + Advanced Rate Limiter + Batch Sender + Session Store")
 
             return True
 
@@ -517,6 +542,21 @@ class EmeraldKillfeedBot(commands.Bot):
                 except Exception as e:
                     logger.error(f"Failed to schedule unified log parser: {e}")
 
+            if self.db_manager:
+                try:
+                    self.scheduler.add_job(
+                        self.db_manager.refresh_dirty_leaderboards,
+                        'interval',
+                        seconds=300,
+                        id='leaderboard_snapshots',
+                        max_instances=1,
+                        coalesce=True,
+                        replace_existing=True
+                    )
+                    logger.info("📊 Leaderboard snapshot refresh scheduled (300s interval)")
+                except Exception as e:
+                    logger.error(f"Failed to schedule leaderboard snapshot refresh: {e}")
+
             # STEP 7: Final status
             if self.user:
                 logger.info("✅ Bot logged in as %s (ID: %s)", self.user.name, self.user.id)
@@ -542,6 +582,10 @@ class EmeraldKillfeedBot(commands.Bot):
                     logger.warning(f"⚠️ Missing required assets: {missing_assets}")
                 else:
                     logger.info("✅ All required assets found")
+
+                # Keep thumbnails in memory so sends never touch the disk
+                get_asset_registry().load()
+                await self.publish_assets()
             else:
                 logger.warning("⚠️ Assets directory not found - creating default structure")
                 self.assets_path.mkdir(exist_ok=True)
@@ -568,9 +612,21 @@ class EmeraldKillfeedBot(commands.Bot):
         """Clean shutdown"""
         logger.info("Shutting down bot...")
 
+        # Save unsaved parser state before the connection cleanup resets it
+        if hasattr(self, 'unified_log_parser') and self.unified_log_parser:
+            await self.unified_log_parser.save_persistent_state()
+
         # Clean up SFTP connections
         await self.cleanup_connections()
 
+        # Flush pending player session writes before the database closes
+        if hasattr(self, 'session_store'):
+            await self.session_store.close()
+
+        # Drop pending voice channel renames
+        if hasattr(self, 'voice_channel_updater'):
+            self.voice_channel_updater.close()
+
         # Flush advanced rate limiter if it exists
         if hasattr(self, 'advanced_rate_limiter'):
             await self.advanced_rate_limiter.flush_all_queues()
@@ -584,7 +640,8 @@ class EmeraldKillfeedBot(commands.Bot):
         if hasattr(self, 'mongo_client') and self.mongo_client:
             try:
                 # Close all database operations gracefully
-                if hasattr(self, 'db_manager'):
+                if hasattr(self, 'db_manager') and self.db_manager:
+                    await self.db_manager.stop_guild_change_stream()
                     # Cancel any pending database operations
                     await asyncio.sleep(0.1)
 
@@ -611,6 +668,14 @@ class EmeraldKillfeedBot(commands.Bot):
                 await self.advanced_rate_limiter.flush_all_queues()
                 logger.info("Advanced rate limiter flushed")
 
+            # Flush pending player session writes and unsaved parser state
+            if hasattr(self, 'session_store'):
+                await self.session_store.close()
+            if hasattr(self, 'voice_channel_updater'):
+                self.voice_channel_updater.close()
+            if hasattr(self, 'unified_log_parser') and self.unified_log_parser:
+                await self.unified_log_parser.save_persistent_state()
+
             # Clean up SFTP connections
             await self.cleanup_connections()
 
@@ -619,6 +684,8 @@ class EmeraldKillfeedBot(commands.Bot):
                 logger.info("Scheduler stopped")
 
             if hasattr(self, 'mongo_client') and self.mongo_client:
+                if self.db_manager:
+                    await self.db_manager.stop_guild_change_stream()
                 self.mongo_client.close()
                 logger.info("MongoDB connection closed")
 